@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# The ASGI profile (settings/asgi.py) serves the async view.
+faculty_view = views.faculty_async if settings.ASYNC_VIEWS else views.faculty
+
 urlpatterns = [
-    path('faculty', views.faculty, name='faculty'),
+    path('faculty', faculty_view, name='faculty'),
 ]
\ No newline at end of file
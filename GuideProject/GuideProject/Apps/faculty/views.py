@@ -5,10 +5,30 @@ This module contains views for faculty management.
 It demonstrates Django view concepts for faculty operations.
 """
 
+import asyncio
+
 from django.shortcuts import render
-from GuideProject.Apps.person.models import Faculty, Student
+from django.template.response import TemplateResponse
+from GuideProject.Apps.person.cache import versioned_cache_page
+from GuideProject.Apps.person.freshness import conditional_page
+from GuideProject.instrumentation import query_budget
+from GuideProject.routers import read_replica
+from GuideProject.Apps.person.models import Faculty
+from GuideProject.Apps.person.stats import astudent_totals, student_totals
+
+DJANGO_CONCEPTS = [
+    'Model relationships (ForeignKey)',
+    'Denormalized counters kept current by signals',
+    'Template context data',
+    'Aggregation and counting',
+    'Function-based views'
+]
 
 
+@read_replica
+@conditional_page()
+@versioned_cache_page
+@query_budget(2)
 def faculty(request):
     """
     Faculty overview page.
@@ -17,36 +37,61 @@ def faculty(request):
     - Function-based views
     - Aggregation and counting
     - Template rendering with context
+    - Version-invalidated page caching
+    - 304 Not Modified for unchanged pages (person.freshness)
     """
     
-    # Get all faculties with related student counts
-    faculties = Faculty.objects.all().prefetch_related('students')
-    
-    # Calculate statistics
-    total_faculties = faculties.count()
-    total_students = Student.objects.filter(is_active=True).count()
+    # Student counts are stored on each Faculty row, so this is one query
+    faculties = Faculty.objects.all()
     
     # Add student count to each faculty
-    faculty_data = []
-    for faculty in faculties:
-        student_count = faculty.students.filter(is_active=True).count()
-        faculty_data.append({
-            'faculty': faculty,
-            'student_count': student_count
-        })
+    faculty_data = [
+        {'faculty': faculty, 'student_count': faculty.active_student_count}
+        for faculty in faculties
+    ]
+    
+    # Calculate statistics
+    total_faculties = len(faculty_data)
+    total_students = student_totals()['active']
     
     context = {
         'page_title': 'Faculty Management',
         'faculty_data': faculty_data,
         'total_faculties': total_faculties,
         'total_students': total_students,
-        'django_concepts': [
-            'Model relationships (ForeignKey)',
-            'QuerySet optimization (prefetch_related)',
-            'Template context data',
-            'Aggregation and counting',
-            'Function-based views'
+        'django_concepts': DJANGO_CONCEPTS,
+    }
+    
+    return render(request, 'faculty/faculty.html', context)
+
+
+@read_replica
+@conditional_page()
+@versioned_cache_page
+@query_budget(2)
+async def faculty_async(request):
+    """
+    Async version of faculty(), routed when ``settings.ASYNC_VIEWS`` is on.
+    
+    This demonstrates:
+    - Async function-based views
+    - Streaming rows with aiterator()
+    - Starting independent queries together with asyncio.gather()
+    """
+    async def load_faculty_data():
+        return [
+            {'faculty': faculty, 'student_count': faculty.active_student_count}
+            async for faculty in Faculty.objects.aiterator()
         ]
+    
+    faculty_data, totals = await asyncio.gather(load_faculty_data(), astudent_totals())
+    
+    context = {
+        'page_title': 'Faculty Management',
+        'faculty_data': faculty_data,
+        'total_faculties': len(faculty_data),
+        'total_students': totals['active'],
+        'django_concepts': DJANGO_CONCEPTS,
     }
     
-    return render(request, 'faculty/faculty.html', context)
\ No newline at end of file
+    return TemplateResponse(request, 'faculty/faculty.html', context)
\ No newline at end of file
@@ -5,8 +5,43 @@ This module configures the Django admin interface for Person models.
 It demonstrates admin customization and management interface best practices.
 """
 
+from django.conf import settings
 from django.contrib import admin
-from .models import Student, Faculty
+from django.contrib.auth import get_permission_codename
+from django.urls import reverse
+from django.utils.html import format_html
+from .cache import versioned_value
+from .export import streaming_export
+from .faculty_map import all_faculties
+from .jobs import start_bulk_update
+from .models import Student, StudentBulkJob, Faculty
+from .pagination import EstimatedCountPaginator
+from .search import filter_students
+from .stats import estimated_row_count
+
+
+class FacultyListFilter(admin.RelatedFieldListFilter):
+    """Faculty filter whose choices come from the in-process faculty map."""
+    
+    def field_choices(self, field, request, model_admin):
+        faculties = sorted(all_faculties(), key=lambda faculty: faculty.name)
+        return [(faculty.pk, str(faculty)) for faculty in faculties]
+
+
+class CachedValuesListFilter(admin.AllValuesFieldListFilter):
+    """
+    "All values" filter that runs its DISTINCT query once per data version.
+    
+    The cached choices are dropped by the next Student or Faculty write.
+    """
+    
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        # The parent built a lazy DISTINCT queryset; replace it before it runs.
+        self.lookup_choices = versioned_value(
+            f'distinct:{model._meta.label_lower}:{field_path}',
+            lambda: list(self.lookup_choices),
+        )
 
 
 @admin.register(Faculty)
@@ -25,10 +60,11 @@ class FacultyAdmin(admin.ModelAdmin):
     list_filter = ('established_date',)
     search_fields = ('name', 'dean', 'description')
     ordering = ('name',)
+    prepopulated_fields = {'slug': ('name',)}
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('name', 'description')
+            'fields': ('name', 'slug', 'description')
         }),
         ('Administration', {
             'fields': ('dean', 'established_date'),
@@ -38,9 +74,10 @@ class FacultyAdmin(admin.ModelAdmin):
     
     def student_count(self, obj):
         """Display the number of active students in this faculty."""
-        return obj.students.filter(is_active=True).count()
+        return obj.active_student_count
     
     student_count.short_description = 'Active Students'
+    student_count.admin_order_field = 'active_student_count'
 
 
 @admin.register(Student)
@@ -53,6 +90,8 @@ class StudentAdmin(admin.ModelAdmin):
     - List filters and search
     - Readonly fields
     - Custom methods in admin
+    - Large-table mode: estimated counts, cached filter choices and an
+      autocomplete widget instead of a dropdown of every faculty
     """
     
     list_display = (
@@ -60,13 +99,20 @@ class StudentAdmin(admin.ModelAdmin):
         'enrollment_date', 'is_active'
     )
     list_filter = (
-        'faculty', 'is_active', 'enrollment_date', 'graduation_year'
+        ('faculty', FacultyListFilter),
+        'is_active',
+        'enrollment_date',
+        ('graduation_year', CachedValuesListFilter),
     )
+    list_select_related = ('faculty',)
+    autocomplete_fields = ('faculty',)
+    # The "(N total)" next to a filtered count is a second full COUNT(*).
+    show_full_result_count = False
     search_fields = (
         'first_name', 'last_name', 'email', 'student_id'
     )
     list_editable = ('is_active',)
-    ordering = ('last_name', 'first_name')
+    ordering = ('last_name', 'first_name', 'pk')
     
     fieldsets = (
         ('Personal Information', {
@@ -95,6 +141,21 @@ class StudentAdmin(admin.ModelAdmin):
     
     readonly_fields = ('created_at', 'updated_at')
     
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        """Switch to estimated counts once the table is large."""
+        estimate = estimated_row_count(Student, queryset.db)
+        if estimate < settings.STUDENT_ADMIN_ESTIMATE_ROWS:
+            return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+        return EstimatedCountPaginator(
+            queryset, per_page, orphans, allow_empty_first_page, estimate=estimate
+        )
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Use the full-text index instead of LIKE scans over search_fields."""
+        if not search_term.strip():
+            return queryset, False
+        return filter_students(queryset, search_term), False
+    
     def get_full_name(self, obj):
         """Display the student's full name in the admin list."""
         return obj.get_full_name()
@@ -103,22 +164,95 @@ class StudentAdmin(admin.ModelAdmin):
     get_full_name.admin_order_field = 'last_name'
     
     # Add some bulk actions
-    actions = ['mark_inactive', 'mark_active']
+    actions = ['mark_inactive', 'mark_active', 'export_csv', 'export_jsonl']
+    
+    def run_bulk_update(self, request, queryset, action, done_message):
+        """Update small selections at once, large ones in a background job."""
+        # Only "select all" takes exactly the rows the changelist filters match.
+        select_across = request.POST.get('select_across') == '1'
+        job, updated = start_bulk_update(
+            queryset, action, requested_by=request.user.get_username(),
+            changelist_query=request.GET.urlencode() if select_across else None,
+        )
+        if job is None:
+            self.message_user(request, f'{updated} students were successfully {done_message}.')
+            return
+        url = reverse('admin:person_studentbulkjob_change', args=[job.pk])
+        self.message_user(request, format_html(
+            'The selection is large, so it is being {} in the background: '
+            '<a href="{}">follow job #{}</a>.',
+            done_message, url, job.pk,
+        ))
     
     def mark_inactive(self, request, queryset):
         """Bulk action to mark students as inactive."""
-        updated = queryset.update(is_active=False)
-        self.message_user(
-            request, 
-            f'{updated} students were successfully marked as inactive.'
-        )
+        self.run_bulk_update(request, queryset, StudentBulkJob.Action.MARK_INACTIVE, 'marked as inactive')
     mark_inactive.short_description = 'Mark selected students as inactive'
     
     def mark_active(self, request, queryset):
         """Bulk action to mark students as active."""
-        updated = queryset.update(is_active=True)
-        self.message_user(
-            request, 
-            f'{updated} students were successfully marked as active.'
+        self.run_bulk_update(request, queryset, StudentBulkJob.Action.MARK_ACTIVE, 'marked as active')
+    mark_active.short_description = 'Mark selected students as active'
+    
+    def export_csv(self, request, queryset):
+        """Bulk action to download the selected students as CSV."""
+        return streaming_export(queryset, 'csv')
+    export_csv.short_description = 'Export selected students as CSV'
+    
+    def export_jsonl(self, request, queryset):
+        """Bulk action to download the selected students as JSON Lines."""
+        return streaming_export(queryset, 'jsonl')
+    export_jsonl.short_description = 'Export selected students as JSON Lines'
+
+
+@admin.register(StudentBulkJob)
+class StudentBulkJobAdmin(admin.ModelAdmin):
+    """
+    Read-only view of background bulk jobs, with cancellation.
+    
+    This demonstrates:
+    - A view-only ModelAdmin (no add or change)
+    - An admin action that signals a running worker, guarded by a
+      custom permission check
+    """
+    
+    list_display = (
+        '__str__', 'progress_display', 'rows_updated', 'requested_by',
+        'created_at', 'finished_at'
+    )
+    list_filter = ('status', 'action')
+    readonly_fields = (
+        'action', 'status', 'progress_display', 'rows_updated', 'first_pk',
+        'last_pk', 'next_pk', 'batch_size', 'changelist_query', 'cancel_requested',
+        'requested_by', 'created_at', 'started_at', 'finished_at', 'error'
+    )
+    exclude = ('selection',)
+    actions = ['cancel_jobs']
+    
+    def progress_display(self, obj):
+        """Progress through the primary key range."""
+        return f'{obj.progress}%'
+    
+    progress_display.short_description = 'Progress'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_cancel_permission(self, request):
+        """Cancelling stops a student update: it needs change rights, not view."""
+        return any(
+            request.user.has_perm(f'{opts.app_label}.{get_permission_codename("change", opts)}')
+            for opts in (Student._meta, StudentBulkJob._meta)
         )
-    mark_active.short_description = 'Mark selected students as active'
\ No newline at end of file
+    
+    def cancel_jobs(self, request, queryset):
+        """Ask queued and running jobs to stop after their current batch."""
+        cancelled = queryset.filter(
+            status__in=[StudentBulkJob.Status.QUEUED, StudentBulkJob.Status.RUNNING]
+        ).update(cancel_requested=True)
+        self.message_user(request, f'Cancellation requested for {cancelled} jobs.')
+    cancel_jobs.short_description = 'Cancel selected jobs'
+    cancel_jobs.allowed_permissions = ('cancel',)
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Enrollment Analytics - Django Learning Guide
+
+This module maintains the EnrollmentSummary table and builds the
+enrollment dashboard from it.
+It demonstrates summary tables kept current by signal receivers, so that
+reports never aggregate the Student table on a request.
+
+EnrollmentSummary holds one row per (faculty, cohort, graduation year,
+status) with the number of students in it. Its size depends on the
+number of faculties and years, not on the number of students, so the
+dashboard reads it whole in one query and folds it in Python.
+
+Writes come with the old and new values of the rows they touched (see
+person.signals): a save or delete moves one student, QuerySet.update()
+and the import command move counted groups of them. Each moves students
+between summary rows, -n on the old group and +n on the new one, so the
+cost follows the size of the write, not of the table. Only writes whose
+old values are unknown (an update to an expression, the save of an
+instance that was never loaded) replace their faculties' rows with a
+GROUP BY over those faculties' students.
+``manage.py rebuild_enrollment_summary`` rebuilds everything, to repair
+drift left by writes that bypass the ORM.
+"""
+
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.dispatch import receiver
+
+from .faculty_map import all_faculties
+from .models import EnrollmentSummary, Student
+from .signals import students_changed
+
+
+def refresh_enrollment_summary(faculty_ids=None, using=None):
+    """
+    Recompute the summary rows of the given faculties (all when None).
+
+    Returns the number of summary rows written.
+    """
+    students = Student.objects.using(using) if using else Student.objects.all()
+    summary = EnrollmentSummary.objects.using(using) if using else EnrollmentSummary.objects.all()
+    if faculty_ids is not None:
+        students = students.filter(faculty_id__in=faculty_ids)
+        summary = summary.filter(faculty_id__in=faculty_ids)
+    groups = (
+        students.with_cohort()
+        .order_by()
+        .values('faculty_id', 'cohort', 'graduation_year', 'is_active')
+        .annotate(students=Count('pk'))
+    )
+    with transaction.atomic(using=summary.db):
+        summary.delete()
+        rows = summary.bulk_create([EnrollmentSummary(**group) for group in groups])
+    return len(rows)
+
+
+SUMMARY_FIELDS = ('faculty_id', 'cohort', 'graduation_year', 'is_active')
+
+
+def summary_key(values):
+    """
+    The summary row a student counts in, from Student.tracked_values(),
+    as a tuple of SUMMARY_FIELDS.
+
+    None when the values do not name a row (deferred or unsaved fields).
+    """
+    enrolled = values['enrollment_date']
+    if values['faculty_id'] is None or values['is_active'] is None or not isinstance(enrolled, date):
+        return None
+    return (values['faculty_id'], enrolled.year, values['graduation_year'], values['is_active'])
+
+
+def apply_enrollment_deltas(changes, using=None):
+    """
+    Apply ``[(old, new, rows)]`` as sent by students_changed.
+
+    Returns False, leaving the summary alone, when a side does not name a
+    summary row; the caller then regroups instead.
+    """
+    summary = EnrollmentSummary.objects.using(using) if using else EnrollmentSummary.objects.all()
+    deltas = Counter()
+    for old, new, count in changes:
+        old_key = old and summary_key(old)
+        new_key = new and summary_key(new)
+        if (old and old_key is None) or (new and new_key is None):
+            return False
+        if old_key != new_key:
+            if old_key:
+                deltas[old_key] -= count
+            if new_key:
+                deltas[new_key] += count
+
+    with transaction.atomic(using=summary.db):
+        for key, delta in deltas.items():
+            rows = summary.filter(**dict(zip(SUMMARY_FIELDS, key)))
+            if delta > 0:
+                if not rows.update(students=F('students') + delta):
+                    summary.create(students=delta, **dict(zip(SUMMARY_FIELDS, key)))
+            elif delta < 0 and not rows.filter(students__lte=-delta).delete()[0]:
+                # Not the group's last students.
+                rows.update(students=F('students') + delta)
+    return True
+
+
+def _ratio(part, whole):
+    return round(100 * part / whole, 1) if whole else 0
+
+
+def enrollment_report():
+    """
+    Everything the dashboard shows, from a single query on the summary table.
+
+    Returns a dict with:
+    - ``cohorts``: the enrollment years, ascending
+    - ``faculties``: one dict per faculty with ``faculty``, ``per_cohort``
+      (counts aligned with ``cohorts``), ``total``, ``active`` and
+      ``active_ratio`` (percent)
+    - ``graduation``: ``(graduation_year, students)`` pairs, unknown year last
+    - ``total``, ``active``, ``inactive`` and ``active_ratio`` for everyone
+    """
+    per_cohort = defaultdict(lambda: defaultdict(int))
+    totals = defaultdict(lambda: [0, 0])  # faculty -> [total, active]
+    graduation = defaultdict(int)
+    cohorts = set()
+    rows = EnrollmentSummary.objects.values_list(
+        'faculty_id', 'cohort', 'graduation_year', 'is_active', 'students'
+    )
+    for faculty_id, cohort, graduation_year, is_active, students in rows:
+        cohorts.add(cohort)
+        per_cohort[faculty_id][cohort] += students
+        totals[faculty_id][0] += students
+        if is_active:
+            totals[faculty_id][1] += students
+        graduation[graduation_year] += students
+
+    cohorts = sorted(cohorts)
+    faculties = []
+    for faculty in sorted(all_faculties(), key=lambda faculty: faculty.name):
+        total, active = totals.get(faculty.pk, (0, 0))
+        faculties.append({
+            'faculty': faculty,
+            'per_cohort': [per_cohort[faculty.pk][cohort] for cohort in cohorts],
+            'total': total,
+            'active': active,
+            'active_ratio': _ratio(active, total),
+        })
+    total = sum(entry[0] for entry in totals.values())
+    active = sum(entry[1] for entry in totals.values())
+    return {
+        'cohorts': cohorts,
+        'faculties': faculties,
+        'graduation': sorted(graduation.items(), key=lambda item: (item[0] is None, item[0] or 0)),
+        'total': total,
+        'active': active,
+        'inactive': total - active,
+        'active_ratio': _ratio(active, total),
+    }
+
+
+@receiver(students_changed)
+def update_enrollment_summary(sender, faculty_ids, using, changes=None, **kwargs):
+    """Keep the summary current after every Student write."""
+    if changes is not None and apply_enrollment_deltas(changes, using=using):
+        return
+    refresh_enrollment_summary(faculty_ids, using=using)
\ No newline at end of file
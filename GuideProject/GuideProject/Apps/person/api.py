@@ -0,0 +1,264 @@
+"""
+Person API - Django Learning Guide
+
+This module contains a read-only JSON API for students and faculties.
+It demonstrates JsonResponse, field projection with QuerySet.values()
+and conditional GET with ETags.
+
+Endpoints (GET only):
+    api/students              ?fields= ?faculty=<slug> ?is_active= ?graduation_year=
+                              ?min_age= ?max_age= ?cohort= ?cursor= ?limit=
+    api/students/<id>         ?fields=
+    api/faculties             ?fields= ?cursor= ?limit=
+    api/faculties/<slug>      ?fields=
+
+Lists are keyset-paginated by id; ``next`` and ``previous`` are ready-made
+URLs. Every response carries an ETag built from ``max(updated_at)`` and the
+row count of the requested rows plus the query string. A client that sends
+it back in ``If-None-Match`` gets a 304 after that single aggregate query,
+without the rows being loaded or serialized again.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.views.decorators.http import require_safe
+
+from GuideProject.instrumentation import query_budget
+
+from .faculty_map import faculty_by_slug
+from .models import Faculty, Student
+from .pagination import InvalidCursor, KeysetPaginator
+
+# API field name -> ORM column. Contact details other than the email
+# (phone, address, date of birth) are deliberately not exposed.
+STUDENT_FIELDS = {
+    'id': 'id',
+    'student_id': 'student_id',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'email': 'email',
+    'faculty': 'faculty__slug',
+    'enrollment_date': 'enrollment_date',
+    'graduation_year': 'graduation_year',
+    'is_active': 'is_active',
+    'updated_at': 'updated_at',
+}
+FACULTY_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'slug': 'slug',
+    'description': 'description',
+    'dean': 'dean',
+    'established_date': 'established_date',
+    'total_student_count': 'total_student_count',
+    'active_student_count': 'active_student_count',
+    'updated_at': 'updated_at',
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_AGE = 150
+
+BOOLEANS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+class ApiError(Exception):
+    """A bad request, reported to the client as a JSON error."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def error_response(error):
+    return JsonResponse({'error': str(error)}, status=error.status)
+
+
+def requested_fields(request, fields):
+    """The API field names asked for with ``?fields=a,b`` (all by default)."""
+    value = request.GET.get('fields', '')
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if not names:
+        return list(fields)
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise ApiError(
+            f'Unknown field(s): {", ".join(unknown)}. '
+            f'Available: {", ".join(fields)}.'
+        )
+    return names
+
+
+def project(queryset, names, fields):
+    """values() restricted to the requested columns, plus id for cursors."""
+    columns = {fields[name] for name in names} | {'id'}
+    return queryset.values(*columns)
+
+
+def serialize(row, names, fields):
+    return {name: row[fields[name]] for name in names}
+
+
+def compute_etag(request, updated_at, count):
+    raw = f'{updated_at.isoformat() if updated_at else ""}|{count}|{request.get_full_path()}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def scope_etag(request, queryset):
+    """One aggregate query: newest ``updated_at`` and row count of the scope."""
+    stats = queryset.order_by().aggregate(latest=Max('updated_at'), count=Count('pk'))
+    return compute_etag(request, stats['latest'], stats['count'])
+
+
+def conditional_json(request, etag, build):
+    """
+    Answer 304 when the client's ETag still matches, otherwise the JSON.
+
+    ``build`` is only called when the payload is actually needed.
+    """
+    response = get_conditional_response(request, etag=quote_etag(etag))
+    if response is None:
+        response = JsonResponse(build())
+    response['ETag'] = quote_etag(etag)
+    # Clients may keep the payload but must revalidate it before use.
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def page_limit(request):
+    value = request.GET.get('limit', DEFAULT_LIMIT)
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ApiError('limit must be an integer.')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(f'limit must be between 1 and {MAX_LIMIT}.')
+    return limit
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def paginated_json(request, queryset, fields):
+    """The shared body of the list endpoints."""
+    names = requested_fields(request, fields)
+    limit = page_limit(request)
+    etag = scope_etag(request, queryset)
+
+    def build():
+        paginator = KeysetPaginator(project(queryset, names, fields), limit, ('id',), count_total=False)
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor as e:
+            raise ApiError(str(e))
+        return {
+            'results': [serialize(row, names, fields) for row in page],
+            'next': page_url(request, page.next_cursor),
+            'previous': page_url(request, page.previous_cursor),
+        }
+
+    return conditional_json(request, etag, build)
+
+
+def detail_json(request, queryset, fields, label):
+    """The shared body of the detail endpoints: a single query, then the ETag."""
+    names = requested_fields(request, fields)
+    columns = {fields[name] for name in names} | {'id', 'updated_at'}
+    row = queryset.values(*columns).first()
+    if row is None:
+        raise ApiError(f'No {label} found.', status=404)
+    etag = compute_etag(request, row['updated_at'], 1)
+    return conditional_json(request, etag, lambda: serialize(row, names, fields))
+
+
+def integer_param(request, name, low=1, high=9998):
+    """An optional integer query parameter within [low, high]."""
+    value = request.GET.get(name)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        raise ApiError(f'{name} must be an integer.')
+    if not low <= value <= high:
+        raise ApiError(f'{name} must be between {low} and {high}.')
+    return value
+
+
+def filtered_students(request):
+    """Students narrowed by the faculty, status, graduation year, cohort and age filters."""
+    queryset = Student.objects.all()
+
+    slug = request.GET.get('faculty')
+    if slug:
+        faculty = faculty_by_slug(slug)
+        if faculty is None:
+            return queryset.none()
+        queryset = queryset.filter(faculty_id=faculty.pk)
+
+    active = request.GET.get('is_active')
+    if active is not None:
+        if active.lower() not in BOOLEANS:
+            raise ApiError('is_active must be true or false.')
+        queryset = queryset.filter(is_active=BOOLEANS[active.lower()])
+
+    year = integer_param(request, 'graduation_year')
+    if year is not None:
+        queryset = queryset.filter(graduation_year=year)
+
+    cohort = integer_param(request, 'cohort')
+    if cohort is not None:
+        queryset = queryset.in_cohorts(cohort, cohort)
+
+    return queryset.aged(
+        integer_param(request, 'min_age', 0, MAX_AGE),
+        integer_param(request, 'max_age', 0, MAX_AGE),
+    )
+
+
+@require_safe
+@query_budget(3)
+def student_list(request):
+    """GET api/students"""
+    try:
+        return paginated_json(request, filtered_students(request), STUDENT_FIELDS)
+    except ApiError as e:
+        return error_response(e)
+
+
+@require_safe
+@query_budget(1)
+def student_detail(request, pk):
+    """GET api/students/<id>"""
+    try:
+        return detail_json(request, Student.objects.filter(pk=pk), STUDENT_FIELDS, 'student')
+    except ApiError as e:
+        return error_response(e)
+
+
+@require_safe
+@query_budget(2)
+def faculty_list(request):
+    """GET api/faculties"""
+    try:
+        return paginated_json(request, Faculty.objects.all(), FACULTY_FIELDS)
+    except ApiError as e:
+        return error_response(e)
+
+
+@require_safe
+@query_budget(1)
+def faculty_detail(request, slug):
+    """GET api/faculties/<slug>"""
+    try:
+        return detail_json(request, Faculty.objects.filter(slug=slug), FACULTY_FIELDS, 'faculty')
+    except ApiError as e:
+        return error_response(e)
\ No newline at end of file
@@ -16,8 +16,14 @@ class PersonConfig(AppConfig):
     - App configuration
     - Setting default primary key field type
     - App naming conventions
+    - Connecting signal receivers in ready()
+    - Registering system checks in ready()
     """
     
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'GuideProject.Apps.person'
-    verbose_name = 'Person Management'
\ No newline at end of file
+    verbose_name = 'Person Management'
+    
+    def ready(self):
+        """Import the modules that register signal receivers and checks."""
+        from . import analytics, cache, faculty_map, freshness, search, signals, stats  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Person Cache - Django Learning Guide
+
+This module caches rendered student and faculty pages.
+It demonstrates version-based ("generational") cache invalidation.
+
+Every cache key includes a data version number. Any write to Student or
+Faculty bumps the version once the transaction commits, which makes all
+older entries unreachable at once. Pages are therefore served from the
+cache until the data really changes, with no TTL-based staleness.
+
+The version lives in Django's cache, so it must be a cache shared by all
+worker processes (see CACHES in settings/prod.py).
+
+Page keys also carry the date: the student lists show ages, which change
+overnight without any write.
+"""
+
+import hashlib
+import time
+from datetime import date
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+from .signals import students_changed
+
+DATA_VERSION_KEY = 'person:data-version'
+REPLICA_VERSION_KEY = 'person:replica-version'
+
+# Entries never go stale; the timeout only bounds how long the
+# unreachable entries of old versions occupy the cache.
+PAGE_TIMEOUT = 60 * 60 * 24
+
+
+def get_data_version():
+    """Return the current data version, creating it on first use."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        # Start from the clock rather than 1 so that a version evicted from
+        # the cache can never come back as a number already used for pages.
+        cache.add(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+async def aget_data_version():
+    """Async get_data_version()."""
+    version = await cache.aget(DATA_VERSION_KEY)
+    if version is None:
+        await cache.aadd(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    """Invalidate every cached page by moving to a new data version."""
+    try:
+        return cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        # The key was evicted; get_data_version() will start a new one.
+        return get_data_version()
+
+
+def replica_is_current():
+    """
+    True when the read replica holds the data of the current version.
+
+    refresh_replica records the version it read before copying; any write
+    since then has moved the data version on. Reading only from a current
+    replica keeps stale rows out of the page cache, whose entries live for
+    as long as their version does.
+    """
+    replica_version = cache.get(REPLICA_VERSION_KEY)
+    return replica_version is not None and replica_version == get_data_version()
+
+
+def set_replica_version(version):
+    cache.set(REPLICA_VERSION_KEY, version, timeout=None)
+
+
+def versioned_value(name, compute, timeout=PAGE_TIMEOUT):
+    """Return ``compute()``, cached until the next Student or Faculty write."""
+    key = f'person:value:{get_data_version()}:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def page_cache_key(request, version):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'person:page:{version}:{date.today().isoformat()}:{path}'
+
+
+def versioned_cache_page(view_func):
+    """
+    Cache a view's rendered GET responses under the current data version.
+
+    This demonstrates:
+    - Writing a view decorator that supports sync and async views
+    - Caching only what is safe to share (successful, non-streaming GETs)
+    """
+
+    def cacheable(response):
+        return response.status_code == 200 and not response.streaming
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await view_func(request, *args, **kwargs)
+
+            request.data_version = await aget_data_version()
+            key = page_cache_key(request, request.data_version)
+            cached = await cache.aget(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = await view_func(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = await sync_to_async(response.render)()
+            if cacheable(response):
+                await cache.aset(key, (response.content, response['Content-Type']), PAGE_TIMEOUT)
+            return response
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view_func(request, *args, **kwargs)
+
+        # Read the version before the data so that a page rendered while a
+        # write commits is stored under the old, already-invalid version.
+        # Template fragments are keyed on it too (see context_processors).
+        request.data_version = get_data_version()
+        key = page_cache_key(request, request.data_version)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view_func(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        if cacheable(response):
+            cache.set(key, (response.content, response['Content-Type']), PAGE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def _bump_on_commit(using):
+    transaction.on_commit(bump_data_version, using=using)
+
+
+@receiver(students_changed)
+def students_written(sender, using, **kwargs):
+    _bump_on_commit(using)
+
+
+@receiver(post_save, sender='person.Faculty')
+@receiver(post_delete, sender='person.Faculty')
+def faculty_written(sender, using, **kwargs):
+    _bump_on_commit(using)
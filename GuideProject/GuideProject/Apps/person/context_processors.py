@@ -0,0 +1,30 @@
+"""
+Person Context Processors - Django Learning Guide
+
+This module adds the data version to every template context.
+It demonstrates context processors and lazy context values.
+
+Templates use it to key ``{% cache %}`` fragments that show students or
+faculties, so the fragments go stale exactly when the cached pages do:
+
+    {% cache 86400 faculty_directory data_version %} ... {% endcache %}
+"""
+
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_data_version
+
+
+def data_version(request):
+    """
+    ``data_version``: the version the page cache read for this request.
+
+    Views under versioned_cache_page() read it before loading their data,
+    and fragments must use that same version: a version read later could
+    already belong to a write that committed after the data was loaded.
+    Other pages read it lazily, only when a template uses it.
+    """
+    version = getattr(request, 'data_version', None)
+    if version is not None:
+        return {'data_version': version}
+    return {'data_version': SimpleLazyObject(get_data_version)}
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Faculty Map - Django Learning Guide
+
+This module resolves faculty URL values without touching the database.
+It demonstrates a small in-process cache kept coherent with a shared
+version number.
+
+The faculty table is small and read on almost every student page, so
+each process keeps all rows in memory, indexed by slug and by name.
+The map is tagged with the data version from ``person.cache``; every
+write to Student or Faculty bumps that version on commit (which also
+keeps the denormalized counters fresh), and any process that sees a new
+version reloads the map with a single query. Faculty saves in this
+process additionally drop the map at once.
+
+The returned Faculty objects are shared between requests: read them,
+never modify or save them.
+"""
+
+import threading
+
+from asgiref.sync import sync_to_async
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import aget_data_version, get_data_version
+from .models import Faculty
+
+_lock = threading.Lock()
+_state = None  # (version, by_slug, by_name)
+
+
+def _load(version):
+    global _state
+    by_slug, by_name = {}, {}
+    for faculty in Faculty.objects.all():
+        by_slug[faculty.slug] = faculty
+        by_name.setdefault(faculty.name, faculty)
+    with _lock:
+        _state = (version, by_slug, by_name)
+    return _state
+
+
+def _current():
+    # Read the version before loading rows, so a write that commits while
+    # loading leaves the map tagged with the old version and reloaded next time.
+    version = get_data_version()
+    state = _state
+    if state is None or state[0] != version:
+        state = _load(version)
+    return state
+
+
+async def _acurrent():
+    version = await aget_data_version()
+    state = _state
+    if state is None or state[0] != version:
+        state = await sync_to_async(_load)(version)
+    return state
+
+
+def faculty_by_slug(slug):
+    """Return the Faculty with this slug, or None."""
+    return _current()[1].get(slug)
+
+
+def faculty_by_name(name):
+    """Return the Faculty with this exact name, or None."""
+    return _current()[2].get(name)
+
+
+def all_faculties():
+    """Every Faculty, in no particular order."""
+    return list(_current()[1].values())
+
+
+async def afaculty_by_slug(slug):
+    """Async faculty_by_slug()."""
+    return (await _acurrent())[1].get(slug)
+
+
+async def afaculty_by_name(name):
+    """Async faculty_by_name()."""
+    return (await _acurrent())[2].get(name)
+
+
+def clear_faculty_map():
+    """Forget the map; the next lookup reloads it."""
+    global _state
+    with _lock:
+        _state = None
+
+
+@receiver(post_save, sender='person.Faculty')
+@receiver(post_delete, sender='person.Faculty')
+def faculty_written(sender, **kwargs):
+    clear_faculty_map()
\ No newline at end of file
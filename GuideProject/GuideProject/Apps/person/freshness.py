@@ -0,0 +1,191 @@
+"""
+Page Freshness - Django Learning Guide
+
+This module answers conditional GETs (If-None-Match / If-Modified-Since)
+for the student and faculty pages with 304 Not Modified.
+It demonstrates HTTP validators (ETag, Last-Modified) and why deletes
+need special care when freshness is derived from timestamps.
+
+A page shows either every faculty (scope ``None``) or one faculty. The
+freshness of a scope is made of:
+
+- the newest ``Student.updated_at`` in it (one index lookup),
+- the newest ``Faculty.updated_at`` in it (read from the faculty map),
+- a deletion clock: deleting rows leaves nothing behind to carry a new
+  ``updated_at``, so every delete stores the current time in the cache
+  for the affected faculty and for the "all" scope,
+- the start of today: the student lists show ages (``with_age()``), so
+  a page from yesterday may be out of date without any write.
+
+The fingerprint is cached under the data version (see person.cache), so
+between two writes it costs no query at all. The check runs before the
+page cache and the view, so an unchanged page is answered without
+fetching rows or rendering templates.
+"""
+
+import hashlib
+import time
+from datetime import date, datetime, timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone as django_timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .cache import PAGE_TIMEOUT, get_data_version
+from .faculty_map import all_faculties
+from .models import Student
+from .signals import students_changed
+
+ALL = 'all'
+
+
+def _scope_key(faculty):
+    return ALL if faculty is None else str(faculty.pk)
+
+
+def _deletion_key(scope):
+    return f'person:deleted:{scope}'
+
+
+def get_deletion_clock(scope):
+    """Time (ns) of the last delete in ``scope``; starts at "now" when missing."""
+    key = _deletion_key(scope)
+    stamp = cache.get(key)
+    if stamp is None:
+        # Like the data version: a clock that was evicted restarts at the
+        # current time, so it can only move Last-Modified forward.
+        cache.add(key, time.time_ns(), timeout=None)
+        stamp = cache.get(key)
+    return stamp
+
+
+def record_deletion(faculty_ids):
+    now = time.time_ns()
+    cache.set_many(
+        {_deletion_key(scope): now for scope in [ALL, *map(str, faculty_ids)]},
+        timeout=None,
+    )
+
+
+def fingerprint(faculty=None):
+    """
+    Return ``(last_modified, token)`` for a scope.
+
+    ``last_modified`` is an aware datetime, ``token`` a string that changes
+    whenever anything shown for the scope changes.
+    """
+    version = get_data_version()
+    today = date.today()
+    cache_key = f'person:fresh:{version}:{today.isoformat()}:{_scope_key(faculty)}'
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    students = Student.objects.order_by()
+    if faculty is None:
+        faculties = all_faculties()
+    else:
+        students = students.filter(faculty_id=faculty.pk)
+        faculties = [faculty]
+    stamps = [
+        students.aggregate(latest=Max('updated_at'))['latest'],
+        max((f.updated_at for f in faculties), default=None),
+        datetime.fromtimestamp(get_deletion_clock(_scope_key(faculty)) / 1e9, timezone.utc),
+        django_timezone.make_aware(datetime.combine(today, datetime.min.time())),
+    ]
+    last_modified = max(stamp for stamp in stamps if stamp is not None)
+    token = '|'.join(stamp.isoformat() if stamp else '' for stamp in stamps)
+    result = (last_modified, f'{len(faculties)}|{token}')
+    cache.set(cache_key, result, PAGE_TIMEOUT)
+    return result
+
+
+def _conditional(request, faculty):
+    """The 304 response (or None) and the validators for a 200."""
+    last_modified, token = fingerprint(faculty)
+    etag = '"{}"'.format(hashlib.md5(f'{token}|{request.get_full_path()}'.encode()).hexdigest())
+    last_modified = int(last_modified.timestamp())
+    return get_conditional_response(request, etag=etag, last_modified=last_modified), etag, last_modified
+
+
+def _add_validators(response, etag, last_modified):
+    if response.status_code in (200, 304) and not response.streaming:
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Browsers must ask again (and get a 304) rather than guess freshness.
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_page(scope=None):
+    """
+    Decorate a page view so unchanged pages are answered with 304.
+
+    ``scope(request, *args, **kwargs)`` returns the Faculty the page shows,
+    or None for pages about every faculty. It may raise LookupError when
+    the request does not name a known faculty; the view then runs as usual
+    (to redirect or 404). Put this outside versioned_cache_page().
+
+    This demonstrates:
+    - Conditional GET with ETag and Last-Modified
+    - Decorators that support sync and async views
+    """
+
+    def resolve(request, args, kwargs):
+        return scope(request, *args, **kwargs) if scope else None
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+                try:
+                    faculty = await sync_to_async(resolve)(request, args, kwargs)
+                except LookupError:
+                    return await view_func(request, *args, **kwargs)
+                not_modified, etag, last_modified = await sync_to_async(_conditional)(request, faculty)
+                if not_modified is not None:
+                    return _add_validators(not_modified, etag, last_modified)
+                response = await view_func(request, *args, **kwargs)
+                return _add_validators(response, etag, last_modified)
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            try:
+                faculty = resolve(request, args, kwargs)
+            except LookupError:
+                return view_func(request, *args, **kwargs)
+            not_modified, etag, last_modified = _conditional(request, faculty)
+            if not_modified is not None:
+                return _add_validators(not_modified, etag, last_modified)
+            response = view_func(request, *args, **kwargs)
+            return _add_validators(response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
+
+
+@receiver(students_changed)
+def students_deleted(sender, using, deleted_faculty_ids=(), **kwargs):
+    if deleted_faculty_ids:
+        ids = set(deleted_faculty_ids)
+        transaction.on_commit(lambda: record_deletion(ids), using=using)
+
+
+@receiver(post_delete, sender='person.Faculty')
+def faculty_deleted(sender, instance, using, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: record_deletion([pk]), using=using)
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Student Bulk Jobs - Django Learning Guide
+
+This module runs bulk admin actions on students in the background.
+It demonstrates batching long writes into short transactions and a
+thread pool worker that reports progress through the database.
+
+A single ``UPDATE`` over hundreds of thousands of rows holds SQLite's
+write lock until it finishes, so every other write (and the request that
+started it) waits. A job instead walks the primary key range of the
+selection in windows of BATCH_SIZE keys, each window in its own short
+transaction, pausing briefly between windows so other writers get the
+lock. The derived data (faculty counters, enrollment summary) follows each
+window as deltas of that window's rows, so a window costs the same
+however large the table is. Progress and cancellation live on the StudentBulkJob row, which the
+admin shows and updates.
+
+The job records its selection as runs of consecutive primary keys
+(``[[first, last], ...]``, plain JSON) taken when it is started, so a
+"select all" over a contiguous part of the table is stored in a few
+numbers. A selection scattered over the primary keys (a faculty filter
+over interleaved inserts) would need one run per student; past
+MAX_SELECTION_RUNS the job stores the admin changelist's query string
+instead, and the worker applies those filters again, as the requesting
+user, to each window.
+
+Jobs run on one worker thread per process (SQLite has a single writer
+anyway). A job left "running" by a server restart stays that way; it can
+be inspected in the admin and the action simply started again.
+"""
+
+import logging
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F, Max, Min
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+
+from .models import Student, StudentBulkJob
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+PAUSE_SECONDS = 0.01
+# Past this many runs, a selection is stored as its changelist filters.
+MAX_SELECTION_RUNS = 1000
+
+ACTION_VALUES = {
+    StudentBulkJob.Action.MARK_ACTIVE: {'is_active': True},
+    StudentBulkJob.Action.MARK_INACTIVE: {'is_active': False},
+}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='student-jobs')
+
+
+def start_bulk_update(queryset, action, requested_by='', batch_size=BATCH_SIZE, background=True,
+                      changelist_query=None):
+    """
+    Apply ``action`` to the students in ``queryset``.
+
+    Selections spanning fewer than ``batch_size`` primary keys are updated
+    at once and ``(None, rows)`` is returned. Larger ones become a
+    StudentBulkJob, submitted to the worker unless ``background`` is
+    false, and ``(job, None)`` is returned.
+
+    ``changelist_query`` is the query string of the admin changelist
+    ``queryset`` was selected from; the job keeps it instead of the
+    primary keys when those are too scattered.
+    """
+    bounds = queryset.order_by().aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return None, 0
+    if bounds['last'] - bounds['first'] < batch_size:
+        return None, queryset.update(**ACTION_VALUES[action])
+
+    runs = pk_runs(queryset, limit=MAX_SELECTION_RUNS if changelist_query is not None else None)
+    job = StudentBulkJob.objects.create(
+        action=action,
+        selection=runs or [],
+        changelist_query=changelist_query if runs is None else '',
+        first_pk=bounds['first'],
+        last_pk=bounds['last'],
+        next_pk=bounds['first'],
+        batch_size=batch_size,
+        requested_by=requested_by,
+    )
+    if background:
+        # Start only once the job row is visible to the worker's connection.
+        transaction.on_commit(lambda: _executor.submit(_run_in_worker, job.pk))
+    return job, None
+
+
+def pk_runs(queryset, limit=None):
+    """
+    The primary keys of ``queryset`` as sorted ``[first, last]`` runs, or
+    None as soon as there would be more than ``limit`` of them.
+    """
+    runs = []
+    for pk in queryset.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=BATCH_SIZE):
+        if runs and pk == runs[-1][1] + 1:
+            runs[-1][1] = pk
+        elif limit is not None and len(runs) == limit:
+            return None
+        else:
+            runs.append([pk, pk])
+    return runs
+
+
+def changelist_selection(query, username):
+    """
+    The students the admin changelist shows for ``query`` to ``username``:
+    its filters, search and permissions, as when the action was chosen.
+    """
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(query)
+    request.user = get_user_model()._default_manager.get_by_natural_key(username)
+    return admin.site._registry[Student].get_changelist_instance(request).queryset
+
+
+def pks_between(runs, low, high):
+    """The primary keys in ``runs`` from ``low`` up to, not including, ``high``."""
+    return [
+        pk
+        for first, last in runs if first < high and last >= low
+        for pk in range(max(first, low), min(last + 1, high))
+    ]
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    except Exception:
+        logger.exception('Student bulk job %s crashed', job_id)
+    finally:
+        connections.close_all()
+
+
+def run_job(job_id, pause=PAUSE_SECONDS):
+    """Run a queued job to completion, cancellation or failure."""
+    started = StudentBulkJob.objects.filter(
+        pk=job_id, status=StudentBulkJob.Status.QUEUED
+    ).update(status=StudentBulkJob.Status.RUNNING, started_at=timezone.now())
+    if not started:
+        return
+    job = StudentBulkJob.objects.get(pk=job_id)
+    jobs = StudentBulkJob.objects.filter(pk=job_id)
+
+    values = ACTION_VALUES[job.action]
+
+    status, error = StudentBulkJob.Status.DONE, ''
+    try:
+        filtered = None
+        if job.changelist_query:
+            filtered = changelist_selection(job.changelist_query, job.requested_by).order_by()
+        low = job.next_pk
+        while low <= job.last_pk:
+            if jobs.filter(cancel_requested=True).exists():
+                status = StudentBulkJob.Status.CANCELLED
+                break
+            high = low + job.batch_size
+            if filtered is None:
+                pks = pks_between(job.selection, low, high)
+            else:
+                pks = list(filtered.filter(pk__gte=low, pk__lt=high).values_list('pk', flat=True))
+            with transaction.atomic():
+                rows = Student.objects.filter(pk__in=pks).update(**values) if pks else 0
+                jobs.update(next_pk=high, rows_updated=F('rows_updated') + rows)
+            low = high
+            if pause:
+                time.sleep(pause)
+    except Exception:
+        status, error = StudentBulkJob.Status.FAILED, traceback.format_exc()
+        logger.exception('Student bulk job %s failed', job_id)
+    jobs.update(status=status, error=error, finished_at=timezone.now())
\ No newline at end of file
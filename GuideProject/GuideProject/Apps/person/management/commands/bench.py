@@ -0,0 +1,277 @@
+"""
+Benchmark - Django Learning Guide
+
+Management command that measures every GuideProject page on seeded data.
+It demonstrates test databases, the test client and database execute
+wrappers outside of the test runner.
+
+A throwaway test database is created and filled with a reproducible
+dataset, then every route in GuideProject/urls.py (plus the admin
+changelists) is requested repeatedly. Latency percentiles, SQL query
+count and SQL time per route are written as JSON with sorted keys so two
+runs can be diffed between commits.
+
+The run uses its own local memory caches in place of every configured
+alias (the template fragment cache too): ``--cold`` clears them and
+seeding bumps the data version, neither of which may reach a cache the
+servers share, such as the prod settings' Redis.
+
+Usage:
+    python manage.py bench
+    python manage.py bench --faculties 50 --students 100000 --requests 100
+    python manage.py bench --output bench-main.json --cold
+    python manage.py bench --render --settings=GuideProject.settings.prod
+"""
+
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import date, timedelta
+
+import django
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from GuideProject.Apps.person.analytics import refresh_enrollment_summary
+from GuideProject.Apps.person.cache import bump_data_version
+from GuideProject.Apps.person.faculty_map import clear_faculty_map
+from GuideProject.Apps.person.models import Faculty, Student
+from GuideProject.Apps.person.pagination import encode_cursor
+from GuideProject.Apps.person.stats import refresh_faculty_counts
+
+FIRST_NAMES = [
+    'Sofia', 'Mateo', 'Valentina', 'Santiago', 'Isabella', 'Sebastian', 'Camila',
+    'Diego', 'Lucia', 'Daniel', 'Martina', 'Alejandro', 'Emma', 'Nicolas', 'Maria',
+    'Gabriel', 'Paula', 'Samuel', 'Andrea', 'David', 'Sara', 'Carlos', 'Elena',
+    'Juan', 'Ana', 'Luis', 'Carmen', 'Jorge', 'Laura', 'Pedro',
+]
+LAST_NAMES = [
+    'Garcia', 'Rodriguez', 'Martinez', 'Lopez', 'Gonzalez', 'Perez', 'Sanchez',
+    'Ramirez', 'Torres', 'Flores', 'Rivera', 'Gomez', 'Diaz', 'Cruz', 'Morales',
+    'Reyes', 'Gutierrez', 'Ortiz', 'Chavez', 'Ruiz', 'Jimenez', 'Mendoza',
+    'Vargas', 'Castillo', 'Romero', 'Herrera', 'Medina', 'Aguilar', 'Vega', 'Rojas',
+]
+# Surnames follow a long-tailed distribution: a few are very common.
+LAST_NAME_WEIGHTS = [1 / (rank + 1) for rank in range(len(LAST_NAMES))]
+
+
+class QueryTimer:
+    """Database execute wrapper that counts statements and sums their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def local_caches():
+    """Settings override giving every configured cache alias a private LocMemCache."""
+    return override_settings(CACHES={
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'bench-{alias}',
+        }
+        for alias in settings.CACHES
+    })
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway database and record latency and SQL cost for every route.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--faculties', type=int, default=20, help='Faculties to create (default: 20).')
+        parser.add_argument('--students', type=int, default=5000, help='Students to create (default: 5000).')
+        parser.add_argument('--requests', type=int, default=30, help='Timed requests per route (default: 30).')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per route (default: 2).')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset (default: 42).')
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request.')
+        parser.add_argument(
+            '--render', action='store_true',
+            help='Give every request a unique query string: whole-page caches miss, '
+                 'template fragment caches stay warm, so pages are rendered each time.',
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        if options['faculties'] < 1 or options['requests'] < 1:
+            raise CommandError('--faculties and --requests must be at least 1.')
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with local_caches():
+                self.seed(options['faculties'], options['students'], random.Random(options['seed']))
+                routes = self.measure(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'commit': self.git_commit(),
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'faculties': options['faculties'],
+                'students': options['students'],
+                'requests': options['requests'],
+                'cold_cache': options['cold'],
+                'render': options['render'],
+            },
+            'routes': routes,
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f'Wrote {options["output"]}')
+        else:
+            self.stdout.write(output)
+
+    def seed(self, faculty_count, student_count, rng):
+        """Create the dataset with bulk inserts."""
+        self.stderr.write(f'Seeding {faculty_count} faculties and {student_count} students...')
+        Faculty.objects.bulk_create(
+            Faculty(
+                name=f'Faculty of {LAST_NAMES[i % len(LAST_NAMES)]} Studies {i}',
+                slug=f'{LAST_NAMES[i % len(LAST_NAMES)].lower()}-studies-{i}',
+                dean=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                established_date=date(1900 + rng.randrange(120), 1, 1),
+            )
+            for i in range(faculty_count)
+        )
+        faculty_ids = list(Faculty.objects.values_list('pk', flat=True))
+        today = date.today()
+
+        batch = []
+        for i in range(student_count):
+            # Most students enroll in September, some in February.
+            year = today.year - rng.randrange(6)
+            enrolled = date(year, 9 if rng.random() < 0.8 else 2, 1 + rng.randrange(28))
+            batch.append(Student(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choices(LAST_NAMES, LAST_NAME_WEIGHTS)[0],
+                email=f'student{i}@university.example',
+                student_id=f'{year}{i:07d}',
+                faculty_id=rng.choice(faculty_ids),
+                enrollment_date=enrolled,
+                graduation_year=year + rng.choice((4, 5, 5, 6)),
+                date_of_birth=enrolled - timedelta(days=365 * rng.randint(17, 25) + rng.randrange(365)),
+                is_active=rng.random() < 0.85,
+            ))
+            if len(batch) == 2000:
+                Student.objects.bulk_create(batch)
+                batch = []
+        Student.objects.bulk_create(batch)
+        refresh_faculty_counts()
+        refresh_enrollment_summary()
+        # bulk_create() sends no signals: retire pages and faculty maps
+        # cached for an earlier dataset.
+        bump_data_version()
+        clear_faculty_map()
+
+        User = get_user_model()
+        User.objects.create_superuser('bench', 'bench@example.com', 'bench')
+
+    def routes(self):
+        """Yield ``(name, url)`` for every GuideProject route and admin changelist."""
+        sample = Faculty.objects.order_by('pk').first()
+        kwargs_by_name = {'faculty': sample.slug, 'slug': sample.slug}
+        student = Student.objects.order_by('pk').first()
+        if student is not None:
+            kwargs_by_name['pk'] = student.pk
+
+        def walk(patterns):
+            for entry in patterns:
+                if isinstance(entry, URLResolver):
+                    if entry.namespace == 'admin':
+                        continue
+                    yield from walk(entry.url_patterns)
+                elif isinstance(entry, URLPattern) and entry.name:
+                    converters = entry.pattern.converters
+                    if not set(converters) <= set(kwargs_by_name):
+                        self.stderr.write(f'Skipping {entry.name}: no sample value for {set(converters)}')
+                        continue
+                    kwargs = {key: kwargs_by_name[key] for key in converters}
+                    yield entry.name, reverse(entry.name, kwargs=kwargs)
+
+        yield from walk(get_resolver().url_patterns)
+        # Deep pages are where OFFSET paging used to hurt.
+        last_page = '?cursor=' + encode_cursor('p', None)
+        yield 'student_list (last page)', reverse('student_list') + last_page
+        yield 'student_search (q=gar)', reverse('student_search') + '?q=gar'
+        for model in admin.site._registry:
+            name = f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist'
+            yield name, reverse(name)
+
+    def measure(self, options):
+        client = Client()
+        client.login(username='bench', password='bench')
+        results = {}
+        for name, url in self.routes():
+            for _ in range(options['warmup']):
+                client.get(url)
+            timings, query_counts, sql_times = [], [], []
+            status = None
+            for i in range(options['requests']):
+                if options['cold']:
+                    for backend in caches.all():
+                        backend.clear()
+                request_url = url
+                if options['render'] and not name.startswith('admin:'):
+                    request_url += ('&' if '?' in url else '?') + f'bench={i}'
+                timer = QueryTimer()
+                with connection.execute_wrapper(timer):
+                    started = time.perf_counter()
+                    response = client.get(request_url)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    timings.append((time.perf_counter() - started) * 1000)
+                status = response.status_code
+                query_counts.append(timer.count)
+                sql_times.append(timer.seconds * 1000)
+            results[name] = {
+                'url': url,
+                'status': status,
+                'p50_ms': round(percentile(timings, 50), 3),
+                'p95_ms': round(percentile(timings, 95), 3),
+                'p99_ms': round(percentile(timings, 99), 3),
+                'queries': percentile(query_counts, 50),
+                'queries_max': max(query_counts),
+                'sql_ms': round(percentile(sql_times, 50), 3),
+            }
+            self.stderr.write(f'{name:45} {results[name]["p50_ms"]:8.2f} ms p50  {results[name]["queries"]:3} queries')
+        return results
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
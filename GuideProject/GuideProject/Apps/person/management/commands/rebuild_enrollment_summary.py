@@ -0,0 +1,44 @@
+"""
+Rebuild Enrollment Summary - Django Learning Guide
+
+Management command that recomputes the EnrollmentSummary table.
+It demonstrates rebuilding a summary table from its source in one transaction.
+
+The table is kept current by every Student write; run this after writes
+that bypass the ORM (raw SQL, restores) or to repair drift.
+
+Usage:
+    python manage.py rebuild_enrollment_summary
+    python manage.py rebuild_enrollment_summary --faculty engineering
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from GuideProject.Apps.person.analytics import refresh_enrollment_summary
+from GuideProject.Apps.person.models import Faculty
+
+
+class Command(BaseCommand):
+    help = 'Recompute the enrollment summary table from the Student table.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--faculty',
+            action='append',
+            metavar='SLUG',
+            help='Only rebuild this faculty (may be repeated).',
+        )
+    
+    def handle(self, *args, **options):
+        faculty_ids = None
+        if options['faculty']:
+            found = dict(
+                Faculty.objects.filter(slug__in=options['faculty']).values_list('slug', 'pk')
+            )
+            missing = sorted(set(options['faculty']) - set(found))
+            if missing:
+                raise CommandError(f'Unknown faculty: {", ".join(missing)}')
+            faculty_ids = list(found.values())
+        
+        rows = refresh_enrollment_summary(faculty_ids)
+        self.stdout.write(self.style.SUCCESS(f'{rows} summary rows written.'))
\ No newline at end of file
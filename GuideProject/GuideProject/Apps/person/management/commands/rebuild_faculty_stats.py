@@ -0,0 +1,54 @@
+"""
+Rebuild Faculty Statistics - Django Learning Guide
+
+Management command that repairs drift in the denormalized faculty counters.
+It demonstrates custom management commands and bulk repair queries.
+
+Usage:
+    python manage.py rebuild_faculty_stats
+    python manage.py rebuild_faculty_stats --dry-run
+    python manage.py rebuild_faculty_stats --all
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from GuideProject.Apps.person.stats import drifted_faculties, refresh_faculty_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-faculty student counters that drifted from the Student table.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the drifted faculties, do not write anything.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every faculty instead of only the drifted ones.',
+        )
+    
+    def handle(self, *args, **options):
+        drifted = list(drifted_faculties())
+        for faculty in drifted:
+            self.stdout.write(
+                f'{faculty.name}: total {faculty.total_student_count} -> {faculty.actual_total}, '
+                f'active {faculty.active_student_count} -> {faculty.actual_active}'
+            )
+        
+        if options['dry_run']:
+            self.stdout.write(f'{len(drifted)} faculties drifted (dry run, nothing written).')
+            return
+        
+        with transaction.atomic():
+            if options['all']:
+                updated = refresh_faculty_counts()
+            else:
+                updated = refresh_faculty_counts([f.pk for f in drifted]) if drifted else 0
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(drifted)} faculties drifted, {updated} rebuilt.'
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:56
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_student_counts(apps, schema_editor):
+    Faculty = apps.get_model('person', 'Faculty')
+    Student = apps.get_model('person', 'Student')
+
+    def student_count(**filters):
+        counts = (
+            Student.objects.filter(faculty=OuterRef('pk'), **filters)
+            .order_by().values('faculty').annotate(n=Count('pk')).values('n')
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    Faculty.objects.using(schema_editor.connection.alias).update(
+        total_student_count=student_count(),
+        active_student_count=student_count(is_active=True),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faculty',
+            name='active_student_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of active students in this faculty (maintained automatically)'),
+        ),
+        migrations.AddField(
+            model_name='faculty',
+            name='total_student_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of students in this faculty (maintained automatically)'),
+        ),
+        migrations.RunPython(populate_student_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:58
+
+from django.db import migrations
+
+# SQLite FTS5 index over person_student, kept in sync by triggers so that
+# bulk writes (QuerySet.update, bulk_create, raw SQL) are indexed too.
+# Django doesn't track these triggers: any later migration that makes SQLite
+# remake person_student drops them, and must recreate them (the CREATE
+# TRIGGER statements below, then the 'rebuild'). Check person.W001 warns
+# when they are missing.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE person_student_fts USING fts5(
+        first_name, last_name, email, student_id,
+        content='person_student', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    "INSERT INTO person_student_fts(person_student_fts) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER person_student_fts_ai AFTER INSERT ON person_student BEGIN
+        INSERT INTO person_student_fts(rowid, first_name, last_name, email, student_id)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.student_id);
+    END
+    """,
+    """
+    CREATE TRIGGER person_student_fts_ad AFTER DELETE ON person_student BEGIN
+        INSERT INTO person_student_fts(person_student_fts, rowid, first_name, last_name, email, student_id)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.student_id);
+    END
+    """,
+    """
+    CREATE TRIGGER person_student_fts_au
+    AFTER UPDATE OF first_name, last_name, email, student_id ON person_student BEGIN
+        INSERT INTO person_student_fts(person_student_fts, rowid, first_name, last_name, email, student_id)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.student_id);
+        INSERT INTO person_student_fts(rowid, first_name, last_name, email, student_id)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.student_id);
+    END
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS person_student_fts_au',
+    'DROP TRIGGER IF EXISTS person_student_fts_ad',
+    'DROP TRIGGER IF EXISTS person_student_fts_ai',
+    'DROP TABLE IF EXISTS person_student_fts',
+]
+
+
+def run_on_sqlite(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0002_faculty_student_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def populate_slugs(apps, schema_editor):
+    Faculty = apps.get_model('person', 'Faculty')
+    faculties = Faculty.objects.using(schema_editor.connection.alias)
+    taken = set()
+    for faculty in faculties.order_by('pk'):
+        base = slugify(faculty.name)[:110] or 'faculty'
+        slug, n = base, 2
+        while slug in taken:
+            slug, n = f'{base}-{n}', n + 1
+        taken.add(slug)
+        faculty.slug = slug
+        faculty.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0004_student_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faculty',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=120, null=True),
+        ),
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='faculty',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='URL name of the faculty (generated from the name when left blank)', max_length=120, unique=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0005_faculty_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faculty',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['updated_at'], name='student_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['faculty', 'updated_at'], name='student_faculty_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0006_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentBulkJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('mark_active', 'Mark active'), ('mark_inactive', 'Mark inactive')], max_length=20)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('cancelled', 'Cancelled'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('query', models.BinaryField(help_text='Pickled Query selecting the target students')),
+                ('first_pk', models.BigIntegerField()),
+                ('last_pk', models.BigIntegerField()),
+                ('next_pk', models.BigIntegerField()),
+                ('batch_size', models.PositiveIntegerField()),
+                ('rows_updated', models.PositiveIntegerField(default=0)),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('error', models.TextField(blank=True)),
+                ('requested_by', models.CharField(blank=True, max_length=150)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Student bulk job',
+                'verbose_name_plural': 'Student bulk jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+
+
+def populate_summary(apps, schema_editor):
+    Student = apps.get_model('person', 'Student')
+    EnrollmentSummary = apps.get_model('person', 'EnrollmentSummary')
+    db = schema_editor.connection.alias
+    groups = (
+        Student.objects.using(db)
+        .order_by()
+        .values('faculty_id', 'graduation_year', 'is_active', cohort=ExtractYear('enrollment_date'))
+        .annotate(students=Count('pk'))
+    )
+    EnrollmentSummary.objects.using(db).bulk_create(
+        (EnrollmentSummary(**group) for group in groups.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0008_birth_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort', models.PositiveSmallIntegerField(help_text='Year of enrollment')),
+                ('graduation_year', models.IntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField()),
+                ('students', models.PositiveIntegerField()),
+                ('faculty', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollment_summary', to='person.faculty')),
+            ],
+            options={
+                'verbose_name': 'Enrollment summary',
+                'verbose_name_plural': 'Enrollment summaries',
+                'constraints': [models.UniqueConstraint(fields=('faculty', 'cohort', 'graduation_year', 'is_active'), name='enrollment_summary_unique')],
+            },
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+def fail_unfinished_jobs(apps, schema_editor):
+    """Jobs queued before the change have no selection to run on."""
+    StudentBulkJob = apps.get_model('person', 'StudentBulkJob')
+    StudentBulkJob.objects.filter(status__in=['queued', 'running']).update(
+        status='failed',
+        error='The job was queued before an upgrade and has no selection; start the action again.',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0009_enrollmentsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentbulkjob',
+            name='selection',
+            field=models.JSONField(default=list, help_text='Selected student primary keys, as [first, last] runs'),
+        ),
+        migrations.RunPython(fail_unfinished_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='studentbulkjob',
+            name='query',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('person', '0010_studentbulkjob_selection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentbulkjob',
+            name='changelist_query',
+            field=models.TextField(blank=True, help_text='Admin changelist filters of the selection, applied again to each window when the primary keys are too scattered to store'),
+        ),
+    ]
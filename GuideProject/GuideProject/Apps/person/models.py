@@ -5,8 +5,15 @@ This module contains models for the Person/Student management system.
 It demonstrates Django model concepts, relationships, and best practices.
 """
 
-from django.db import models
+from datetime import date
+
+from django.db import models, transaction
+from django.db.models.functions import ExtractYear
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .signals import batch_student_changes, notify_students_changed
 
 
 class Faculty(models.Model):
@@ -17,12 +24,19 @@ class Faculty(models.Model):
     - Basic model fields
     - String representation (__str__ method)
     - Model metadata (Meta class)
+    - Slugs for readable, indexed URLs
     """
     
     name = models.CharField(
         max_length=100, 
         help_text="Name of the faculty/department"
     )
+    slug = models.SlugField(
+        max_length=120,
+        unique=True,
+        blank=True,
+        help_text="URL name of the faculty (generated from the name when left blank)"
+    )
     description = models.TextField(
         blank=True, 
         help_text="Description of the faculty"
@@ -38,6 +52,21 @@ class Faculty(models.Model):
         help_text="Name of the faculty dean"
     )
     
+    # Denormalized statistics, maintained by the person.stats module
+    total_student_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of students in this faculty (maintained automatically)"
+    )
+    active_student_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of active students in this faculty (maintained automatically)"
+    )
+    
+    # Also moved by person.stats when the counters are recomputed
+    updated_at = models.DateTimeField(auto_now=True)
+    
     class Meta:
         verbose_name = "Faculty"
         verbose_name_plural = "Faculties"
@@ -50,6 +79,164 @@ class Faculty(models.Model):
     def get_absolute_url(self):
         """Get the URL for this faculty."""
         return reverse('faculty_detail', kwargs={'pk': self.pk})
+    
+    def save(self, *args, **kwargs):
+        """Fill in a unique slug from the name when none was given."""
+        if not self.slug:
+            self.slug = unique_faculty_slug(self.name, exclude_pk=self.pk)
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        """Delete the faculty, announcing its cascaded students only once."""
+        with batch_student_changes(Student, using=kwargs.get('using') or self._state.db):
+            return super().delete(*args, **kwargs)
+
+
+def unique_faculty_slug(name, exclude_pk=None):
+    """Slugify ``name``, appending -2, -3, ... until no other faculty uses it."""
+    base = slugify(name)[:110] or 'faculty'
+    taken = set(
+        Faculty.objects.filter(slug__startswith=base)
+        .exclude(pk=exclude_pk)
+        .values_list('slug', flat=True)
+    )
+    slug, n = base, 2
+    while slug in taken:
+        slug, n = f'{base}-{n}', n + 1
+    return slug
+
+
+def years_before(day, years):
+    """``day`` moved back ``years`` years; 29 February becomes the 28th."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+class StudentQuerySet(models.QuerySet):
+    """
+    Custom QuerySet for Student.
+    
+    This demonstrates:
+    - Custom QuerySets exposed through as_manager()
+    - Keeping derived data in sync for bulk writes that skip model signals
+    - Derived values (age, cohort, years to graduation) computed by the database
+    
+    The ``with_*`` methods annotate a value the database computes, so it
+    can be filtered, ordered and grouped on without loading rows into
+    Python. The range filters do not filter on those annotations: they
+    translate the range into bounds on the stored column (date_of_birth,
+    enrollment_date, graduation_year), which the indexes can serve.
+    """
+    
+    def with_age(self, on=None):
+        """Annotate ``age``: whole years from date_of_birth to ``on`` (today)."""
+        on = on or date.today()
+        birthday_ahead = models.Q(date_of_birth__month__gt=on.month) | models.Q(
+            date_of_birth__month=on.month, date_of_birth__day__gt=on.day
+        )
+        return self.annotate(age=models.ExpressionWrapper(
+            on.year - ExtractYear('date_of_birth')
+            - models.Case(models.When(birthday_ahead, then=1), default=0),
+            output_field=models.IntegerField(),
+        ))
+    
+    def aged(self, min_age=None, max_age=None, on=None):
+        """Students whose age on ``on`` (today) is within the inclusive range."""
+        on = on or date.today()
+        queryset = self
+        if min_age is not None:
+            queryset = queryset.filter(date_of_birth__lte=years_before(on, min_age))
+        if max_age is not None:
+            queryset = queryset.filter(date_of_birth__gt=years_before(on, max_age + 1))
+        return queryset
+    
+    def with_cohort(self):
+        """Annotate ``cohort``: the year the student enrolled."""
+        return self.annotate(cohort=ExtractYear('enrollment_date'))
+    
+    def in_cohorts(self, first=None, last=None):
+        """Students who enrolled in the years ``first`` to ``last`` (inclusive)."""
+        queryset = self
+        if first is not None:
+            queryset = queryset.filter(enrollment_date__gte=date(first, 1, 1))
+        if last is not None:
+            queryset = queryset.filter(enrollment_date__lt=date(last + 1, 1, 1))
+        return queryset
+    
+    def with_years_to_graduation(self, on=None):
+        """Annotate ``years_to_graduation``: graduation_year minus the current year."""
+        year = (on or date.today()).year
+        return self.annotate(years_to_graduation=models.F('graduation_year') - year)
+    
+    def graduating_within(self, min_years=None, max_years=None, on=None):
+        """Students whose years to graduation are within the inclusive range."""
+        year = (on or date.today()).year
+        queryset = self
+        if min_years is not None:
+            queryset = queryset.filter(graduation_year__gte=year + min_years)
+        if max_years is not None:
+            queryset = queryset.filter(graduation_year__lte=year + max_years)
+        return queryset
+    
+    def update(self, **kwargs):
+        """
+        Run the bulk UPDATE and announce which rows moved where.
+        
+        The rows are counted per group of tracked values first (one GROUP
+        BY over the rows being updated), so the receivers can apply the
+        change as deltas. ``updated_at`` is set as save() would, since
+        ETags are built from it.
+        """
+        kwargs.setdefault('updated_at', timezone.now())
+        assigned = self._tracked_assignments(kwargs)
+        with transaction.atomic(using=self.db):
+            groups = list(
+                self.order_by().values(*self.model.TRACKED_FIELDS).annotate(rows=models.Count('pk'))
+            )
+            rows = super().update(**kwargs)
+            if rows:
+                faculty_ids = {group['faculty_id'] for group in groups}
+                if assigned is None:
+                    changes = None
+                else:
+                    faculty_ids.add(assigned.get('faculty_id'))
+                    changes = []
+                    for old in groups:
+                        count = old.pop('rows')
+                        changes.append((old, {**old, **assigned}, count))
+                notify_students_changed(self.model, faculty_ids, using=self.db, changes=changes)
+        return rows
+    
+    def _tracked_assignments(self, kwargs):
+        """
+        The tracked values update(**kwargs) sets, by attname.
+        
+        None when one of them is an expression, whose result per row is
+        only known to the database.
+        """
+        assigned = {}
+        for name, value in kwargs.items():
+            field = self.model._meta.get_field(name)
+            if field.attname not in self.model.TRACKED_FIELDS:
+                continue
+            if hasattr(value, 'resolve_expression'):
+                return None
+            if isinstance(value, models.Model):
+                value = value.pk
+            assigned[field.attname] = field.to_python(value)
+        return assigned
+    
+    update.alters_data = True
+    
+    def delete(self):
+        """Delete the rows, announcing the change once instead of per row."""
+        with batch_student_changes(self.model, using=self.db):
+            return super().delete()
+    
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Student(models.Model):
@@ -124,10 +311,55 @@ class Student(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = StudentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Student"
         verbose_name_plural = "Students"
         ordering = ['last_name', 'first_name']
+        # Indexes matched to the list views, keyset pagination (ordering
+        # + pk tie-breaker) and the admin list filters. The list views only
+        # show active students, so their indexes are partial (smaller, and
+        # usable because Django renders is_active=True as a bare condition).
+        indexes = [
+            models.Index(
+                fields=['last_name', 'first_name', 'id'],
+                condition=models.Q(is_active=True),
+                name='student_active_name_idx',
+            ),
+            models.Index(
+                fields=['faculty', 'last_name', 'first_name', 'id'],
+                condition=models.Q(is_active=True),
+                name='student_faculty_name_idx',
+            ),
+            models.Index(
+                fields=['last_name', 'first_name', 'id'],
+                name='student_name_idx',
+            ),
+            models.Index(fields=['enrollment_date'], name='student_enrollment_idx'),
+            models.Index(fields=['graduation_year'], name='student_graduation_idx'),
+            # Age ranges become date_of_birth ranges (StudentQuerySet.aged)
+            models.Index(fields=['date_of_birth'], name='student_birth_idx'),
+            models.Index(fields=['faculty', 'date_of_birth'], name='student_faculty_birth_idx'),
+            # max(updated_at) for ETags, overall and per faculty
+            models.Index(fields=['updated_at'], name='student_updated_idx'),
+            models.Index(fields=['faculty', 'updated_at'], name='student_faculty_updated_idx'),
+        ]
+    
+    # Columns the derived data depends on; their loaded values go out with
+    # the students_changed signal, so receivers can skip unchanged saves.
+    TRACKED_FIELDS = ('faculty_id', 'is_active', 'enrollment_date', 'graduation_year')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded tracked values, to tell what a later save changed."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance.tracked_values()
+        return instance
+    
+    def tracked_values(self):
+        """The current values of TRACKED_FIELDS (None for deferred ones)."""
+        return {name: self.__dict__.get(name) for name in self.TRACKED_FIELDS}
     
     def __str__(self):
         """String representation of the student."""
@@ -143,11 +375,125 @@ class Student(models.Model):
     
     @property
     def age(self):
-        """Calculate the student's age."""
+        """
+        The student's age, as annotated by StudentQuerySet.with_age().
+        
+        Falls back to computing it from date_of_birth for instances that
+        were not loaded through with_age(). To filter or group by age, use
+        the queryset methods instead of this property.
+        """
+        if '_age' in self.__dict__:
+            return self._age
         if self.date_of_birth:
-            from datetime import date
             today = date.today()
             return today.year - self.date_of_birth.year - (
                 (today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day)
             )
-        return None
\ No newline at end of file
+        return None
+    
+    @age.setter
+    def age(self, value):
+        # Receives the with_age() annotation when rows are loaded.
+        self._age = value
+
+
+class EnrollmentSummary(models.Model):
+    """
+    Student counts grouped by faculty, cohort, graduation year and status.
+    
+    This demonstrates:
+    - A summary ("materialized") table maintained by application code
+    - Keeping analytics reads independent of the size of the Student table
+    
+    person.analytics moves a single student from one row to another as it
+    is saved or deleted, and regroups whole faculties after bulk writes;
+    ``manage.py rebuild_enrollment_summary`` rebuilds the whole table.
+    """
+    
+    faculty = models.ForeignKey(
+        Faculty,
+        on_delete=models.CASCADE,
+        related_name='enrollment_summary'
+    )
+    cohort = models.PositiveSmallIntegerField(help_text="Year of enrollment")
+    graduation_year = models.IntegerField(null=True, blank=True)
+    is_active = models.BooleanField()
+    students = models.PositiveIntegerField()
+    
+    class Meta:
+        verbose_name = "Enrollment summary"
+        verbose_name_plural = "Enrollment summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['faculty', 'cohort', 'graduation_year', 'is_active'],
+                name='enrollment_summary_unique',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.faculty_id}/{self.cohort}/{self.graduation_year}: {self.students}"
+
+
+class StudentBulkJob(models.Model):
+    """
+    A bulk admin action on students, run in PK-range batches by person.jobs.
+    
+    This demonstrates:
+    - TextChoices for a status field
+    - A JSONField holding the selection as runs of primary keys, or the
+      changelist filters it came from
+    - A model used as a progress record shared by request and worker threads
+    """
+    
+    class Action(models.TextChoices):
+        MARK_ACTIVE = 'mark_active', 'Mark active'
+        MARK_INACTIVE = 'mark_inactive', 'Mark inactive'
+    
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        CANCELLED = 'cancelled', 'Cancelled'
+        FAILED = 'failed', 'Failed'
+    
+    action = models.CharField(max_length=20, choices=Action.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    selection = models.JSONField(
+        default=list,
+        help_text="Selected student primary keys, as [first, last] runs"
+    )
+    changelist_query = models.TextField(
+        blank=True,
+        help_text="Admin changelist filters of the selection, applied again to "
+                  "each window when the primary keys are too scattered to store"
+    )
+    
+    # Progress: the job walks first_pk..last_pk in windows of batch_size
+    first_pk = models.BigIntegerField()
+    last_pk = models.BigIntegerField()
+    next_pk = models.BigIntegerField()
+    batch_size = models.PositiveIntegerField()
+    rows_updated = models.PositiveIntegerField(default=0)
+    
+    cancel_requested = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    requested_by = models.CharField(max_length=150, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Student bulk job"
+        verbose_name_plural = "Student bulk jobs"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.get_action_display()} #{self.pk} ({self.get_status_display()})"
+    
+    @property
+    def progress(self):
+        """Share of the PK range already processed, as a percentage."""
+        span = self.last_pk - self.first_pk + 1
+        done = min(max(self.next_pk - self.first_pk, 0), span)
+        return round(100 * done / span, 1)
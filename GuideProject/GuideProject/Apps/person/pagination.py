@@ -0,0 +1,280 @@
+"""
+Keyset Pagination - Django Learning Guide
+
+This module contains a cursor-based paginator for large student tables.
+It demonstrates keyset ("seek") pagination as an alternative to OFFSET.
+
+OFFSET paging has to walk past every skipped row, so page 5,000 is far
+slower than page 1. Keyset paging remembers the sort key of the last row
+shown and asks the database for rows *after* it, which an index on the
+ordering columns answers directly. Every page therefore costs the same.
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(direction, key):
+    """Pack a direction ('n' or 'p') and a sort key into an opaque token."""
+    raw = json.dumps([direction, key], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Reverse encode_cursor(), raising InvalidCursor for malformed tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, key = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor('That cursor is not valid.')
+    if direction not in ('n', 'p') or not (key is None or isinstance(key, list)):
+        raise InvalidCursor('That cursor is not valid.')
+    return direction, key
+
+
+class KeysetPage:
+    """
+    One page of results, shaped like Django's Page where it matters.
+
+    Templates use ``has_next``/``has_previous`` and the ``next_cursor``/
+    ``previous_cursor`` tokens instead of page numbers.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return encode_cursor('n', self.paginator.key_for(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return encode_cursor('p', self.paginator.key_for(self.object_list[0]))
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by its ordering key instead of by OFFSET.
+
+    This demonstrates:
+    - Keyset pagination with a unique tie-breaker (the primary key)
+    - Building lexicographic "row after" filters with Q objects
+    - Optional total counts (``count_total=False`` skips COUNT(*))
+
+    The ordering fields must be non-null columns of the model itself, and
+    the last one must be unique (normally ``pk``).
+    """
+
+    def __init__(self, queryset, per_page, ordering, count_total=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count_total = count_total
+        self._count = None
+
+    @property
+    def count(self):
+        """Total number of rows, or None in no-count mode."""
+        if not self.count_total:
+            return None
+        if self._count is None:
+            self._count = self.queryset.count()
+        return self._count
+
+    @property
+    def first_cursor(self):
+        return encode_cursor('n', None)
+
+    @property
+    def last_cursor(self):
+        return encode_cursor('p', None)
+
+    def key_for(self, obj):
+        """The sort key of ``obj`` (a model instance or a values() dict) as a list."""
+        if isinstance(obj, dict):
+            return [obj[field] for field in self.ordering]
+        return [getattr(obj, field) for field in self.ordering]
+
+    def _clean_key(self, key):
+        """
+        Convert a decoded key to the ordering fields' Python types.
+
+        The token comes from the client, so a well-formed cursor may still
+        hold values of the wrong type; those must not reach the query.
+        """
+        if len(key) != len(self.ordering):
+            raise InvalidCursor('That cursor does not match this list.')
+        opts = self.queryset.model._meta
+        cleaned = []
+        for name, value in zip(self.ordering, key):
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+            try:
+                value = field.to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                value = None
+            if value is None:
+                raise InvalidCursor('That cursor does not match this list.')
+            cleaned.append(value)
+        return cleaned
+
+    def _seek(self, key, backwards):
+        """Q object matching the rows strictly after (or before) ``key``."""
+        key = self._clean_key(key)
+        lookup = 'lt' if backwards else 'gt'
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            equal = dict(zip(self.ordering[:i], key[:i]))
+            equal[f'{field}__{lookup}'] = key[i]
+            condition |= Q(**equal)
+        # The redundant bound on the leading column lets the database seek
+        # straight into the index range instead of filtering from the start.
+        return Q(**{f'{self.ordering[0]}__{lookup}e': key[0]}) & condition
+
+    async def acount(self):
+        """Async ``count``; the result is remembered for ``count``."""
+        if self.count_total and self._count is None:
+            self._count = await self.queryset.acount()
+        return self.count
+
+    def _page_query(self, cursor):
+        """The queryset for one page (plus one extra row), its key and direction."""
+        direction, key = decode_cursor(cursor) if cursor else ('n', None)
+        backwards = direction == 'p'
+
+        queryset = self.queryset
+        if key is not None:
+            queryset = queryset.filter(self._seek(key, backwards))
+        if backwards:
+            queryset = queryset.order_by(*(f'-{field}' for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        # One extra row tells us whether another page exists.
+        return queryset[:self.per_page + 1], key, backwards
+
+    def _make_page(self, rows, key, backwards):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            return KeysetPage(rows, self, has_next=key is not None, has_previous=has_more)
+        return KeysetPage(rows, self, has_next=has_more, has_previous=key is not None)
+
+    def page(self, cursor=None):
+        """Return the KeysetPage addressed by ``cursor`` (first page if None)."""
+        queryset, key, backwards = self._page_query(cursor)
+        return self._make_page(list(queryset), key, backwards)
+
+    async def apage(self, cursor=None):
+        """Async page(), streaming the rows with ``aiterator()``."""
+        queryset, key, backwards = self._page_query(cursor)
+        rows = [row async for row in queryset.aiterator()]
+        return self._make_page(rows, key, backwards)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Page-number paginator that never counts a whole large table.
+
+    This demonstrates:
+    - Overriding Paginator.count
+    - Trading exact totals for predictable cost
+
+    Without filters the count is ``estimate`` (from table statistics).
+    With filters at most ``count_limit`` rows are counted, so the last
+    reachable page is ``count_limit / per_page``.
+    """
+
+    count_limit = 10000
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, estimate=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        if self.estimate is not None and not self.object_list.query.where:
+            return self.estimate
+        return self.object_list[:self.count_limit].count()
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin that swaps OFFSET pagination for keyset pagination.
+
+    This demonstrates:
+    - Overriding ListView.paginate_queryset()
+    - Reading an opaque cursor from the query string
+    """
+
+    keyset_ordering = ('last_name', 'first_name', 'pk')
+    keyset_count_total = False
+    cursor_kwarg = 'cursor'
+
+    def get_keyset_paginator(self, queryset, page_size):
+        return KeysetPaginator(
+            queryset,
+            page_size,
+            self.keyset_ordering,
+            count_total=self.keyset_count_total,
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_keyset_paginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """Async paginate_queryset(), running the page and count queries together."""
+        paginator = self.get_keyset_paginator(queryset, page_size)
+        try:
+            page, _ = await asyncio.gather(
+                paginator.apage(self.request.GET.get(self.cursor_kwarg)),
+                paginator.acount(),
+            )
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
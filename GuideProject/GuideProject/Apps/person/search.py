@@ -0,0 +1,130 @@
+"""
+Student Search - Django Learning Guide
+
+This module contains the full-text search for students.
+It demonstrates using a database feature (SQLite FTS5) that the ORM
+does not model directly, through raw SQL kept in one place.
+
+The ``person_student_fts`` virtual table indexes first name, last name,
+email and student id. Triggers created in migration 0003 keep it in sync
+with ``person_student`` for every INSERT, UPDATE and DELETE, including
+bulk ``update()`` and ``bulk_create()`` which skip model signals.
+
+Migrations don't know about those triggers. An AlterField or RemoveField
+that SQLite can only apply by remaking ``person_student`` drops them
+without a word, and the index silently goes stale. Such a migration must
+recreate them afterwards (run migration 0003's trigger statements and a
+'rebuild'); the ``person.W001`` system check reports any that are missing.
+"""
+
+import re
+
+from django.core import checks
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Student
+
+FTS_TABLE = 'person_student_fts'
+FTS_TRIGGERS = ('person_student_fts_ai', 'person_student_fts_ad', 'person_student_fts_au')
+SEARCH_FIELDS = ('first_name', 'last_name', 'email', 'student_id')
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(text):
+    """
+    Turn user input into an FTS5 prefix query.
+
+    Every word becomes a quoted prefix term (``"ana"*``) and all terms must
+    match. Quoting means user input can never inject FTS5 syntax.
+    Returns an empty string when the input has no searchable words.
+    """
+    terms = _TERM_RE.findall(text or '')
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def _uses_fts(using):
+    return connections[using].vendor == 'sqlite'
+
+
+def filter_students(queryset, text):
+    """
+    Restrict ``queryset`` to students matching ``text``.
+
+    On SQLite the match is a subquery against the FTS index; other
+    databases fall back to case-insensitive prefix matching.
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not _uses_fts(queryset.db):
+        condition = Q()
+        for term in _TERM_RE.findall(text):
+            any_field = Q()
+            for field in SEARCH_FIELDS:
+                any_field |= Q(**{f'{field}__istartswith': term})
+            condition &= any_field
+        return queryset.filter(condition)
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,)
+    ))
+
+
+def search_students(text, limit=50, queryset=None):
+    """
+    Return up to ``limit`` students matching ``text``, best match first.
+
+    The FTS index returns the ranked ids; the rows are then loaded with a
+    single primary key lookup.
+    """
+    queryset = Student.objects.select_related('faculty') if queryset is None else queryset
+    match = build_match_query(text)
+    if not match:
+        return []
+    if not _uses_fts(queryset.db):
+        return list(filter_students(queryset, text)[:limit])
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT %s',
+            (match, limit),
+        )
+        ranked_ids = [row[0] for row in cursor.fetchall()]
+
+    students = queryset.order_by().in_bulk(ranked_ids)
+    return [students[pk] for pk in ranked_ids if pk in students]
+
+
+@checks.register(checks.Tags.database)
+def check_fts_triggers(app_configs=None, databases=None, **kwargs):
+    """
+    Warn when the FTS table exists but a sync trigger is gone.
+
+    Before migration 0003 there is neither, so a fresh database passes.
+    A warning rather than an error, so ``migrate`` can still apply the
+    migration that recreates them.
+    """
+    warnings = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name = %s "
+                "OR (type = 'trigger' AND tbl_name = %s)",
+                (FTS_TABLE, Student._meta.db_table),
+            )
+            names = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in FTS_TRIGGERS if name not in names]
+        if FTS_TABLE in names and missing:
+            warnings.append(checks.Warning(
+                f'The student search index on {alias!r} is missing its triggers: '
+                f'{", ".join(missing)}.',
+                hint='A migration remade person_student; recreate the triggers from '
+                     "migration 0003 and run a 'rebuild' of the FTS table.",
+                id='person.W001',
+            ))
+    return warnings
@@ -0,0 +1,104 @@
+"""
+Person Signals - Django Learning Guide
+
+This module turns every kind of Student write into a single custom signal.
+It demonstrates custom signals and how to cover writes that Django's
+model signals do not see (``QuerySet.update()`` and ``bulk_create()``).
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+# Sent with ``faculty_ids`` (set of Faculty pks whose students changed),
+# ``deleted_faculty_ids`` (the subset that lost students to a delete),
+# ``using`` (database alias) and ``changes`` after any Student write.
+# ``changes`` lists ``(old, new, rows)``: ``rows`` students went from the
+# ``old`` to the ``new`` values, each side mapping Student.TRACKED_FIELDS
+# to values (old is None for creates, new None for deletes). A single save
+# sends one entry with rows=1; QuerySet.update() and the import command
+# send one per group of rows sharing their values. It is None when the
+# old values are unknown (see StudentQuerySet.update()).
+students_changed = Signal()
+
+_batch = threading.local()
+
+
+def notify_students_changed(sender, faculty_ids, using=DEFAULT_DB_ALIAS, deleted=False,
+                            changes=None):
+    """
+    Announce that students belonging to ``faculty_ids`` were written
+    (or, with ``deleted=True``, deleted).
+
+    Inside ``batch_student_changes()`` the ids and changes are only
+    collected, and a single ``students_changed`` signal is sent when the
+    block exits.
+    """
+    faculty_ids = {pk for pk in faculty_ids if pk is not None}
+    if not faculty_ids:
+        return
+    deleted_ids = set(faculty_ids) if deleted else set()
+    pending = getattr(_batch, 'pending', None)
+    if pending is not None:
+        pending.update(faculty_ids)
+        _batch.deleted.update(deleted_ids)
+        if changes is None:
+            # One unknown write makes the whole batch unknown.
+            _batch.changes = None
+        elif _batch.changes is not None:
+            _batch.changes.extend(changes)
+        return
+    students_changed.send(
+        sender=sender, faculty_ids=faculty_ids, deleted_faculty_ids=deleted_ids, using=using,
+        changes=changes,
+    )
+
+
+@contextmanager
+def batch_student_changes(sender, using=DEFAULT_DB_ALIAS):
+    """
+    Collapse the per-row notifications of a bulk operation into one.
+
+    This demonstrates:
+    - Context managers for grouping side effects
+    - Thread-local state (each request thread batches independently)
+    """
+    if getattr(_batch, 'pending', None) is not None:
+        # Nested batch: the outermost block sends the signal.
+        yield
+        return
+    _batch.pending, _batch.deleted, _batch.changes = set(), set(), []
+    try:
+        yield
+        faculty_ids, deleted_ids, changes = _batch.pending, _batch.deleted, _batch.changes
+    finally:
+        _batch.pending = _batch.deleted = _batch.changes = None
+    if faculty_ids:
+        students_changed.send(
+            sender=sender, faculty_ids=faculty_ids, deleted_faculty_ids=deleted_ids, using=using,
+            changes=changes,
+        )
+
+
+@receiver(post_save, sender='person.Student')
+def student_saved(sender, instance, created, using, **kwargs):
+    """Relay a single Student save, including a move between faculties."""
+    old = None if created else getattr(instance, '_loaded_values', None)
+    new = instance.tracked_values()
+    instance._loaded_values = new
+    faculty_ids = {new['faculty_id'], old and old['faculty_id']}
+    # An instance saved without being loaded first: its old row is unknown.
+    changes = None if old is None and not created else [(old, new, 1)]
+    notify_students_changed(sender, faculty_ids, using=using, changes=changes)
+
+
+@receiver(post_delete, sender='person.Student')
+def student_deleted(sender, instance, using, **kwargs):
+    """Relay a single Student delete (also fired per row by cascades)."""
+    notify_students_changed(
+        sender, {instance.faculty_id}, using=using, deleted=True,
+        changes=[(instance.tracked_values(), None, 1)],
+    )
@@ -0,0 +1,159 @@
+"""
+Faculty Statistics - Django Learning Guide
+
+This module maintains the denormalized student counters stored on Faculty.
+It demonstrates denormalization, subquery updates and signal receivers.
+
+Pages read ``Faculty.total_student_count`` and
+``Faculty.active_student_count`` instead of running one COUNT query per
+faculty. ``students_changed`` says how many students each write moved
+between faculties and statuses, and the counters move by that much (a
+save that keeps the faculty and status leaves them alone), so a batch of
+a bulk job costs the same however many students the faculties hold. A
+write whose old values are unknown recounts its faculties, and
+``manage.py rebuild_faculty_stats`` repairs any drift in bulk.
+"""
+
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest, Now
+from django.dispatch import receiver
+
+from .models import Faculty, Student
+from .signals import students_changed
+
+
+def _student_count(**filters):
+    """Correlated subquery counting the students of the outer Faculty row."""
+    counts = (
+        Student.objects
+        .filter(faculty=OuterRef('pk'), **filters)
+        .order_by()
+        .values('faculty')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def refresh_faculty_counts(faculty_ids=None, using=None):
+    """
+    Recompute the counters for the given faculties (all when None).
+
+    This runs as a single UPDATE statement whatever the number of faculties.
+    """
+    faculties = Faculty.objects.using(using) if using else Faculty.objects.all()
+    if faculty_ids is not None:
+        faculties = faculties.filter(pk__in=faculty_ids)
+    return faculties.update(
+        total_student_count=_student_count(),
+        active_student_count=_student_count(is_active=True),
+        updated_at=Now(),
+    )
+
+
+def drifted_faculties():
+    """Faculties whose stored counters disagree with the Student table."""
+    return (
+        Faculty.objects
+        .annotate(
+            actual_total=Count('students'),
+            actual_active=Count('students', filter=Q(students__is_active=True)),
+        )
+        .exclude(
+            total_student_count=F('actual_total'),
+            active_student_count=F('actual_active'),
+        )
+    )
+
+
+def student_totals():
+    """Return ``{'total': ..., 'active': ...}`` for all students in one query."""
+    return Faculty.objects.aggregate(
+        total=Coalesce(Sum('total_student_count'), 0),
+        active=Coalesce(Sum('active_student_count'), 0),
+    )
+
+
+def estimated_row_count(model, using=DEFAULT_DB_ALIAS):
+    """
+    Approximate number of rows in ``model``'s table, without COUNT(*).
+
+    PostgreSQL and MySQL keep a row estimate in their table statistics.
+    SQLite keeps none that stays current (sqlite_stat1 is only as fresh as
+    the last ANALYZE), so there the highest primary key is used: a single
+    index lookup that is exact until rows are deleted, and an upper bound
+    after that.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor in ('postgresql', 'mysql'):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            else:
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s',
+                    [table],
+                )
+            row = cursor.fetchone()
+        # PostgreSQL reports -1 for a table that was never analyzed.
+        if row and row[0] is not None and row[0] >= 0:
+            return row[0]
+    return model._default_manager.using(using).aggregate(n=Max('pk'))['n'] or 0
+
+
+async def astudent_totals():
+    """Async student_totals()."""
+    return await Faculty.objects.aaggregate(
+        total=Coalesce(Sum('total_student_count'), 0),
+        active=Coalesce(Sum('active_student_count'), 0),
+    )
+
+
+def _counted_as(values):
+    return values and (values['faculty_id'], values['is_active'])
+
+
+def apply_faculty_deltas(changes, using=None):
+    """
+    Move the counters by ``[(old, new, rows)]`` as sent by students_changed.
+
+    Returns False, leaving the counters alone, when a side lacks the
+    faculty or status (deferred fields); the caller then recounts.
+    """
+    deltas = defaultdict(lambda: [0, 0])  # faculty -> [total, active]
+    for old, new, count in changes:
+        if _counted_as(old) == _counted_as(new):
+            continue
+        for values, sign in ((old, -count), (new, count)):
+            if not values:
+                continue
+            if None in _counted_as(values):
+                return False
+            deltas[values['faculty_id']][0] += sign
+            if values['is_active']:
+                deltas[values['faculty_id']][1] += sign
+
+    faculties = Faculty.objects.using(using) if using else Faculty.objects.all()
+    with transaction.atomic(using=faculties.db):
+        for faculty_id, (total, active) in deltas.items():
+            if total or active:
+                # Never below zero, even over counters that drifted.
+                faculties.filter(pk=faculty_id).update(
+                    total_student_count=Greatest(F('total_student_count') + total, 0),
+                    active_student_count=Greatest(F('active_student_count') + active, 0),
+                    updated_at=Now(),
+                )
+    return True
+
+
+@receiver(students_changed)
+def update_faculty_counts(sender, faculty_ids, using, changes=None, **kwargs):
+    """Keep the counters current after every Student write."""
+    if changes is not None and apply_faculty_deltas(changes, using=using):
+        return
+    refresh_faculty_counts(faculty_ids, using=using)
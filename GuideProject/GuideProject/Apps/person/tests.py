@@ -0,0 +1,1366 @@
+"""
+Person Tests - Django Learning Guide
+
+Behaviour, query-plan and query-budget regression tests for the person app.
+They demonstrate Django's TestCase, the test client and CaptureQueriesContext.
+
+Each test requests a page, captures every SELECT it sent against the
+``person_student`` table and runs ``EXPLAIN QUERY PLAN`` on it. A full
+table scan or a temporary B-tree for ORDER BY means an index no longer
+matches the view's access pattern, so the test fails. Walking an index
+in order is only accepted under a LIMIT, where it stops after one page.
+
+The budget tests run every page with QUERY_BUDGET_STRICT on, so a view
+that starts issuing one query per row raises QueryBudgetExceeded. The
+async views served by the ASGI profile must render the same pages
+within the same budgets.
+
+Run with:
+    python manage.py test GuideProject.Apps.person
+"""
+
+import csv
+import gzip
+import io
+import json
+import random
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.db.models import Count, F
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.templatetags.static import static
+from django.urls import reverse
+
+from GuideProject.assets import StaticAssetMiddleware
+from GuideProject.instrumentation import QueryBudgetExceeded, query_budget
+from GuideProject.routers import STICKY_COOKIE, copy_database, reading_from
+from GuideProject.templating import warm_templates
+
+from GuideProject.Apps.faculty import views as faculty_views
+
+from . import views
+from .analytics import refresh_enrollment_summary
+from .cache import get_data_version, replica_is_current, set_replica_version
+from .jobs import run_job, start_bulk_update
+from .management.commands.bench import Command as BenchCommand, local_caches, percentile
+from .models import EnrollmentSummary, Faculty, Student, StudentBulkJob
+from .pagination import KeysetPaginator, encode_cursor
+from .search import FTS_TRIGGERS, check_fts_triggers, search_students
+from .stats import refresh_faculty_counts
+
+STUDENT_TABLE = Student._meta.db_table
+
+
+def make_faculties(count):
+    """Create ``count`` faculties named Faculty 0, Faculty 1, ..."""
+    return [Faculty.objects.create(name=f'Faculty {i}') for i in range(count)]
+
+
+def make_students(count, faculties, **overrides):
+    """
+    Create ``count`` students, spread round-robin over ``faculties``.
+
+    Each keyword overrides a field: a plain value applies to every student,
+    a callable is called with the student's index.
+    """
+    students = []
+    for i in range(count):
+        fields = {
+            'first_name': f'First{i}',
+            'last_name': f'Last{i}',
+            'email': f'student{i}@example.com',
+            'student_id': f'ID{i:05d}',
+            'faculty': faculties[i % len(faculties)],
+            'enrollment_date': date(2022, 9, 1),
+        }
+        for name, value in overrides.items():
+            fields[name] = value(i) if callable(value) else value
+        students.append(Student.objects.create(**fields))
+    return students
+
+
+class FacultyCounterTests(TestCase):
+    """The stored faculty counters follow every kind of Student write."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(2)
+        make_students(6, cls.faculties, is_active=lambda i: i % 3 != 0)
+
+    def counters(self):
+        return list(
+            Faculty.objects.order_by('pk')
+            .values_list('total_student_count', 'active_student_count')
+        )
+
+    def expected(self):
+        return [
+            (f.students.count(), f.students.filter(is_active=True).count())
+            for f in Faculty.objects.order_by('pk')
+        ]
+
+    def assertCountersCorrect(self):
+        self.assertEqual(self.counters(), self.expected())
+
+    def test_create_move_toggle_and_delete(self):
+        self.assertEqual(self.counters(), [(3, 2), (3, 2)])
+        first, second = self.faculties
+
+        make_students(1, [first], email='new@example.com', student_id='NEW')
+        self.assertEqual(self.counters(), [(4, 3), (3, 2)])
+
+        student = first.students.filter(is_active=True).first()
+        student.faculty = second
+        student.save()
+        self.assertEqual(self.counters(), [(3, 2), (4, 3)])
+
+        student.is_active = False
+        student.save()
+        self.assertEqual(self.counters(), [(3, 2), (4, 2)])
+
+        student.delete()
+        self.assertCountersCorrect()
+
+    def test_queryset_update_and_delete(self):
+        Student.objects.filter(faculty=self.faculties[0]).update(is_active=False)
+        self.assertEqual(self.counters(), [(3, 0), (3, 2)])
+        Student.objects.filter(faculty=self.faculties[0]).update(faculty=self.faculties[1])
+        self.assertEqual(self.counters(), [(0, 0), (6, 2)])
+        Student.objects.filter(is_active=True).delete()
+        self.assertEqual(self.counters(), [(0, 0), (4, 0)])
+
+    def test_unrelated_save_skips_the_refresh(self):
+        student = Student.objects.first()
+        student.phone_number = '555-0100'
+        with CaptureQueriesContext(connection) as queries:
+            student.save()
+        self.assertFalse([q for q in queries if q['sql'].startswith('UPDATE "person_faculty"')])
+
+        # An instance that was never loaded may hide a change: refresh.
+        unloaded = Student(**{
+            f.attname: getattr(student, f.attname) for f in Student._meta.concrete_fields
+        })
+        unloaded.is_active = not student.is_active
+        unloaded.save()
+        self.assertCountersCorrect()
+
+    def test_rebuild_command_repairs_drift(self):
+        Faculty.objects.update(total_student_count=99, active_student_count=0)
+        out = StringIO()
+        call_command('rebuild_faculty_stats', '--dry-run', stdout=out)
+        self.assertIn('2 faculties drifted (dry run', out.getvalue())
+        self.assertEqual(self.counters(), [(99, 0), (99, 0)])
+
+        call_command('rebuild_faculty_stats', stdout=StringIO())
+        self.assertCountersCorrect()
+
+
+class KeysetCursorTests(TestCase):
+    """Cursors come from the client: any bad one is a 404, never a 500."""
+
+    @classmethod
+    def setUpTestData(cls):
+        make_students(3, make_faculties(1))
+
+    def test_tampered_cursors_are_not_found(self):
+        url = reverse('student_list')
+        for cursor in (
+            'not-base64!',
+            encode_cursor('x', None),
+            encode_cursor('n', ['a', 'b']),
+            encode_cursor('n', ['a', 'b', 'zz']),
+            encode_cursor('n', ['a', 'b', None]),
+            encode_cursor('p', ['a', 'b', [1]]),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404)
+
+        # A cursor with string digits still names a row.
+        response = self.client.get(url, {'cursor': encode_cursor('n', ['Last0', 'First0', '1'])})
+        self.assertEqual(response.status_code, 200)
+
+    def test_walks_cover_the_ordering_exactly(self):
+        # Ties on last_name and on (last_name, first_name) straddle page edges.
+        make_students(
+            11, [Faculty.objects.get()],
+            last_name=lambda i: ('Ames', 'Ames', 'Ames', 'Ames', 'Baker')[i % 5],
+            first_name=lambda i: ('Jo', 'Jo', 'Al')[i % 3],
+            email=lambda i: f'tied{i}@example.com', student_id=lambda i: f'TIE{i:03d}',
+        )
+        ordering = ('last_name', 'first_name', 'pk')
+        expected = list(Student.objects.order_by(*ordering).values_list('pk', flat=True))
+
+        for per_page in (1, 2, 3, 4, len(expected)):
+            with self.subTest(per_page=per_page):
+                paginator = KeysetPaginator(Student.objects.all(), per_page, ordering)
+
+                forward, page = [], paginator.page()
+                self.assertFalse(page.has_previous())
+                while True:
+                    forward.extend(student.pk for student in page)
+                    if not page.has_next():
+                        break
+                    page = paginator.page(page.next_cursor)
+                self.assertEqual(forward, expected)
+
+                backward, page = [], paginator.page(paginator.last_cursor)
+                self.assertFalse(page.has_next())
+                while True:
+                    backward[:0] = [student.pk for student in page]
+                    if not page.has_previous():
+                        break
+                    page = paginator.page(page.previous_cursor)
+                self.assertEqual(backward, expected)
+
+
+class ImportStudentsTests(TestCase):
+    """import_students upserts valid rows and reports every other one."""
+
+    HEADER = 'first_name,last_name,email,student_id,faculty,enrollment_date,is_active\n'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(name='Engineering')
+        make_students(1, [cls.faculty], first_name='Old', email='taken@example.com', student_id='S1')
+
+    def run_import(self, content, suffix='.csv', *args):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as f:
+            f.write(content)
+        self.addCleanup(Path(f.name).unlink)
+        out, err = StringIO(), StringIO()
+        call_command('import_students', f.name, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_upsert(self):
+        created_at = Student.objects.get(student_id='S1').created_at
+        out, err = self.run_import(
+            self.HEADER
+            + 'New,Name,taken@example.com,S1,engineering,2021-09-01,0\n'
+            + 'Ada,Lovelace,ada@example.com,S2,Engineering,2022-09-01,\n'
+        )
+        self.assertEqual(err, '')
+        self.assertIn('Imported 2 students, rejected 0 rows', out)
+        updated = Student.objects.get(student_id='S1')
+        self.assertEqual((updated.first_name, updated.is_active), ('New', False))
+        self.assertEqual(updated.created_at, created_at)
+        self.assertTrue(Student.objects.get(student_id='S2').is_active)
+        self.faculty.refresh_from_db()
+        self.assertEqual((self.faculty.total_student_count, self.faculty.active_student_count), (2, 1))
+
+    def test_batches_move_derived_data_by_their_rows(self):
+        other = Faculty.objects.create(name='Science')
+        with mock.patch('GuideProject.Apps.person.stats.refresh_faculty_counts') as recount, \
+                mock.patch('GuideProject.Apps.person.analytics.refresh_enrollment_summary') as regroup:
+            self.run_import(
+                self.HEADER
+                + 'Old,Name,taken@example.com,S1,Science,2021-09-01,0\n'
+                + 'Ada,Lovelace,ada@example.com,S2,Engineering,2022-09-01,\n'
+                + 'Alan,Turing,alan@example.com,S3,Science,2022-09-01,\n',
+                '.csv', '--batch-size', '2',
+            )
+        recount.assert_not_called()
+        regroup.assert_not_called()
+        counters = Faculty.objects.order_by('pk').values_list(
+            'total_student_count', 'active_student_count',
+        )
+        self.assertEqual(list(counters), [(1, 1), (2, 1)])
+        self.assertEqual(
+            set(EnrollmentSummary.objects.values_list('faculty', 'cohort', 'is_active', 'students')),
+            {(self.faculty.pk, 2022, True, 1), (other.pk, 2021, False, 1), (other.pk, 2022, True, 1)},
+        )
+
+    def test_quoted_newlines_on_standard_input(self):
+        content = self.HEADER + 'Ada,Lovelace,ada@example.com,S2,Engineering,2022-09-01,\n'
+        content = content.replace('Lovelace', '"Love\r\nlace"')
+        stdin = mock.Mock(buffer=io.BytesIO(content.encode()))
+        out, err = StringIO(), StringIO()
+        with mock.patch('sys.stdin', stdin):
+            call_command('import_students', '-', stdout=out, stderr=err)
+        self.assertIn('Imported 1 students', out.getvalue())
+        self.assertEqual(Student.objects.get(student_id='S2').last_name, 'Love\r\nlace')
+
+    def test_rejected_rows(self):
+        out, err = self.run_import(
+            '{"first_name": "Ada", "last_name": "L", "email": "ada@example.com",'
+            ' "student_id": "S2", "faculty": "Engineering", "enrollment_date": "2022-09-01"}\n'
+            'not json\n'
+            '[1, 2]\n'
+            '{"first_name": "No", "last_name": "Faculty", "email": "x@example.com",'
+            ' "student_id": "S3", "faculty": "Nowhere", "enrollment_date": "2022-09-01"}\n'
+            '{"first_name": "Bad", "last_name": "Date", "email": "y@example.com",'
+            ' "student_id": "S4", "faculty": "Engineering", "enrollment_date": "yesterday"}\n'
+            '{"first_name": "Missing", "email": "z@example.com"}\n',
+            '.jsonl',
+        )
+        self.assertIn('Imported 1 students, rejected 5 rows', out)
+        self.assertIn('line 2: invalid JSON', err)
+        self.assertIn('line 3: expected a JSON object', err)
+        self.assertIn("line 4: unknown faculty 'Nowhere'", err)
+        self.assertIn('line 5: enrollment_date:', err)
+        self.assertIn('line 6: last_name is required', err)
+        self.assertEqual(set(Student.objects.values_list('student_id', flat=True)), {'S1', 'S2'})
+
+    def test_email_conflicts(self):
+        out, err = self.run_import(
+            self.HEADER
+            + 'Other,Person,taken@example.com,S2,Engineering,2022-09-01,\n'
+            + 'Ada,Lovelace,ada@example.com,S3,Engineering,2022-09-01,\n'
+            + 'Ada,Twin,ada@example.com,S4,Engineering,2022-09-01,\n'
+        )
+        self.assertIn('Imported 1 students, rejected 2 rows', out)
+        self.assertIn('line 2: email taken@example.com already belongs to S1', err)
+        self.assertIn('line 4: email ada@example.com already belongs to S3', err)
+
+    def test_duplicate_student_ids_are_reported(self):
+        out, err = self.run_import(
+            self.HEADER
+            + 'First,Try,ada@example.com,S2,Engineering,2022-09-01,\n'
+            + 'Second,Try,ada@example.com,S2,Engineering,2022-09-01,\n',
+        )
+        self.assertIn('Imported 1 students, rejected 1 rows', out)
+        self.assertIn('line 2: duplicate student_id S2 in file (line 3 is used)', err)
+        self.assertEqual(Student.objects.get(student_id='S2').first_name, 'Second')
+
+
+class StudentExportTests(TestCase):
+    """Exports stream every selected student as CSV or JSON Lines."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(2)
+        make_students(6, cls.faculties, is_active=lambda i: i % 3 != 0, graduation_year=2026)
+        get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin')
+
+    def setUp(self):
+        self.client.login(username='admin', password='admin')
+
+    def export(self, **params):
+        response = self.client.get(reverse('student_export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode(), response
+
+    def test_csv(self):
+        content, response = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('filename="students.csv"', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row['student_id'] for row in rows], [f'ID{i:05d}' for i in range(6)])
+        self.assertEqual(rows[1]['faculty'], 'Faculty 1')
+        self.assertEqual(rows[1]['enrollment_date'], '2022-09-01')
+
+    def test_jsonl(self):
+        content, response = self.export(format='jsonl')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['graduation_year'], 2026)
+        self.assertIs(rows[0]['is_active'], False)
+        self.assertIsNone(rows[0]['date_of_birth'])
+
+    def test_faculty_and_active_filters(self):
+        content, _ = self.export(format='jsonl', faculty=self.faculties[0].slug)
+        self.assertEqual(
+            [json.loads(line)['student_id'] for line in content.splitlines()],
+            ['ID00000', 'ID00002', 'ID00004'],
+        )
+        content, _ = self.export(format='jsonl', faculty=self.faculties[0].slug, active='1')
+        self.assertEqual(
+            [json.loads(line)['student_id'] for line in content.splitlines()],
+            ['ID00002', 'ID00004'],
+        )
+        content, _ = self.export(active='0')
+        self.assertEqual(len(list(csv.DictReader(StringIO(content)))), 2)
+
+    def test_bad_format_and_anonymous_users(self):
+        self.assertEqual(self.client.get(reverse('student_export'), {'format': 'xml'}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('student_export')).status_code, 302)
+
+    def test_admin_action(self):
+        selected = Student.objects.filter(faculty=self.faculties[1]).values_list('pk', flat=True)
+        response = self.client.post(
+            reverse('admin:person_student_changelist'),
+            {'action': 'export_jsonl', '_selected_action': list(selected)},
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual({json.loads(line)['faculty'] for line in lines}, {'Faculty 1'})
+        self.assertEqual(len(lines), 3)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class StudentQueryPlanTests(TestCase):
+    """Every student query issued by the person views must be index-driven."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(3)
+        make_students(
+            45, cls.faculties,
+            first_name=lambda i: f'First{i % 7}',
+            last_name=lambda i: f'Last{i % 9}',
+            enrollment_date=lambda i: date(2020 + i % 4, 9, 1),
+            is_active=lambda i: i % 5 != 0,
+        )
+
+    def setUp(self):
+        # Cached pages would hide the queries under test.
+        cache.clear()
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexedPlans(self, queries, seek=False):
+        """Check the plan of every captured query that reads the student table."""
+        checked = 0
+        for query in queries:
+            sql = query['sql']
+            if f'"{STUDENT_TABLE}"' not in sql:
+                continue
+            plan = self.query_plan(sql)
+            details = '\n'.join(plan)
+            for line in plan:
+                if line.startswith(f'SCAN {STUDENT_TABLE}'):
+                    self.assertTrue(
+                        'INDEX' in line and 'LIMIT' in sql,
+                        f'Full scan of {STUDENT_TABLE}:\n{details}\n{sql}',
+                    )
+                self.assertNotIn('TEMP B-TREE', line, f'Sort without index:\n{details}\n{sql}')
+            if seek and 'LIMIT' in sql:
+                self.assertRegex(details, r'last_name[<>]', f'Keyset seek is not a range:\n{details}')
+            checked += 1
+        self.assertGreater(checked, 0, 'No student queries were captured')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, queries
+
+    def walk_pages(self, url):
+        """Follow next cursors to the end, checking every page and the way back."""
+        response, queries = self.get(url)
+        self.assertIndexedPlans(queries)
+        page = response.context['page_obj']
+        while page.has_next():
+            response, queries = self.get(f'{url}?cursor={page.next_cursor}')
+            self.assertIndexedPlans(queries, seek=True)
+            page = response.context['page_obj']
+
+        response, queries = self.get(f'{url}?cursor={page.paginator.last_cursor}')
+        self.assertIndexedPlans(queries)
+        page = response.context['page_obj']
+        self.assertTrue(page.has_previous())
+        response, queries = self.get(f'{url}?cursor={page.previous_cursor}')
+        self.assertIndexedPlans(queries, seek=True)
+
+    def test_student_list_pages(self):
+        self.walk_pages(reverse('student_list'))
+
+    def test_student_list_faculty_pages(self):
+        self.walk_pages(reverse('student_list_faculty', args=[self.faculties[1].slug]))
+
+    def test_student_search(self):
+        response, queries = self.get(reverse('student_search') + '?q=last1')
+        self.assertTrue(response.context['students'])
+        self.assertIndexedPlans(queries)
+
+    def test_faculty_counter_refresh(self):
+        with CaptureQueriesContext(connection) as queries:
+            refresh_faculty_counts([self.faculties[0].pk])
+        self.assertIndexedPlans(queries)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The search index is SQLite FTS5')
+class StudentSearchIndexTests(TestCase):
+    """The FTS triggers that migration 0003 creates outside Django's schema."""
+
+    def test_triggers_exist(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            triggers = {row[0] for row in cursor.fetchall()}
+        self.assertLessEqual(set(FTS_TRIGGERS), triggers)
+        self.assertEqual(check_fts_triggers(databases=['default']), [])
+
+        student = make_students(1, [Faculty.objects.create(name='Engineering')])[0]
+        Student.objects.filter(pk=student.pk).update(last_name='Lovelace')
+        self.assertEqual(search_students('lovel'), [student])
+
+    def test_check_reports_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_TRIGGERS[2]}')
+        warnings = check_fts_triggers(databases=['default'])
+        self.assertEqual([warning.id for warning in warnings], ['person.W001'])
+        self.assertIn(FTS_TRIGGERS[2], warnings[0].msg)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Pages must stay within their query budgets however many faculties exist."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(12)
+        make_students(36, cls.faculties)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_stay_within_budget(self):
+        urls = [
+            reverse('students'),
+            reverse('faculty'),
+            reverse('student_list'),
+            reverse('student_select_list'),
+            reverse('student_list_faculty', args=[self.faculties[0].slug]),
+            reverse('student_search') + '?q=last',
+            reverse('enrollment_analytics'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('db;dur=', response['Server-Timing'])
+
+    def test_faculty_name_urls_redirect_to_slug(self):
+        faculty = self.faculties[3]
+        response = self.client.get(reverse('student_list_faculty', args=[faculty.name]) + '?cursor=x')
+        self.assertRedirects(
+            response,
+            reverse('student_list_faculty', args=[faculty.slug]) + '?cursor=x',
+            status_code=301, fetch_redirect_response=False,
+        )
+        response = self.client.get(reverse('student_list_faculty', args=['no-such-faculty']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_faculty_resolution_runs_no_query(self):
+        url = reverse('student_list_faculty', args=[self.faculties[0].slug])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            # A new query string misses the page cache but not the faculty map.
+            self.client.get(url + '?ref=nav')
+        self.assertFalse([q for q in queries if 'FROM "person_faculty"' in q['sql']])
+
+    def test_budget_catches_per_row_queries(self):
+        @query_budget(2)
+        def per_faculty_counts(request):
+            for faculty in Faculty.objects.all():
+                faculty.students.count()
+
+        request = RequestFactory().get('/')
+        with self.assertRaises(QueryBudgetExceeded):
+            per_faculty_counts(request)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class AsyncViewTests(TestCase):
+    """The async views render exactly what their sync versions render."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(4)
+        make_students(
+            30, cls.faculties,
+            last_name=lambda i: f'Last{i % 13}',
+            is_active=lambda i: i % 6 != 0,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def assertSamePage(self, sync_view, async_view, path, **kwargs):
+        sync_response = await sync_to_async(sync_view)(RequestFactory().get(path), **kwargs)
+        await cache.aclear()
+        async_response = await async_view(AsyncRequestFactory().get(path), **kwargs)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+
+    async def test_async_views_match_sync_views(self):
+        slug = self.faculties[2].slug
+        cases = [
+            (views.students, views.students_async, reverse('students'), {}),
+            (faculty_views.faculty, faculty_views.faculty_async, reverse('faculty'), {}),
+            (views.ListViewStudents.as_view(), views.AsyncListViewStudents.as_view(),
+             reverse('student_list'), {}),
+            (views.ListViewFacultySelect.as_view(), views.AsyncListViewFacultySelect.as_view(),
+             reverse('student_select_list'), {}),
+            (views.ListViewStudentsByFaculty.as_view(), views.AsyncListViewStudentsByFaculty.as_view(),
+             reverse('student_list_faculty', args=[slug]), {'faculty': slug}),
+        ]
+        for sync_view, async_view, path, kwargs in cases:
+            with self.subTest(path=path):
+                await cache.aclear()
+                await self.assertSamePage(sync_view, async_view, path, **kwargs)
+
+    async def test_async_faculty_list_redirects_names(self):
+        faculty = self.faculties[1]
+        view = views.AsyncListViewStudentsByFaculty.as_view()
+        path = reverse('student_list_faculty', args=[faculty.name])
+        response = await view(AsyncRequestFactory().get(path), faculty=faculty.name)
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], reverse('student_list_faculty', args=[faculty.slug]))
+
+
+class BenchCommandTests(TestCase):
+    """The benchmark requests every route on the seeded data."""
+
+    def test_every_route_has_sample_arguments(self):
+        command = BenchCommand(stdout=StringIO(), stderr=StringIO())
+        command.seed(2, 20, random.Random(1))
+        routes = dict(command.routes())
+        self.assertNotIn('Skipping', command.stderr.getvalue())
+        for name in ('api_student_detail', 'api_faculty_detail', 'student_list_faculty'):
+            self.assertIn(name, routes)
+        student = Student.objects.order_by('pk').first()
+        self.assertEqual(routes['api_student_detail'], reverse('api_student_detail', args=[student.pk]))
+
+    def test_seed_is_reproducible(self):
+        command = BenchCommand(stdout=StringIO(), stderr=StringIO())
+        command.seed(3, 50, random.Random(7))
+        first = list(Student.objects.order_by('student_id').values_list('student_id', 'last_name', 'faculty__slug'))
+        self.assertEqual(len(first), 50)
+        self.assertEqual(sum(Faculty.objects.values_list('total_student_count', flat=True)), 50)
+        self.assertTrue(EnrollmentSummary.objects.exists())
+
+        Student.objects.all().delete()
+        Faculty.objects.all().delete()
+        get_user_model().objects.all().delete()
+        command.seed(3, 50, random.Random(7))
+        self.assertEqual(
+            list(Student.objects.order_by('student_id').values_list('student_id', 'last_name', 'faculty__slug')),
+            first,
+        )
+
+    def test_measure_reports_every_route(self):
+        command = BenchCommand(stdout=StringIO(), stderr=StringIO())
+        command.seed(2, 30, random.Random(1))
+        options = {'warmup': 0, 'requests': 3, 'cold': False, 'render': False}
+        results = command.measure(options)
+        self.assertEqual(set(results), {name for name, _ in command.routes()})
+        for name, result in results.items():
+            with self.subTest(route=name):
+                self.assertEqual(result['status'], 200, result['url'])
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+                self.assertLessEqual(result['queries'], result['queries_max'])
+
+    def test_runs_on_its_own_caches(self):
+        cache.set('shared', 'kept')
+        version = get_data_version()
+        command = BenchCommand(stdout=StringIO(), stderr=StringIO())
+        with local_caches():
+            command.seed(1, 5, random.Random(1))
+            command.measure({'warmup': 0, 'requests': 1, 'cold': True, 'render': False})
+        self.assertEqual(cache.get('shared'), 'kept')
+        self.assertEqual(get_data_version(), version)
+
+    def test_percentile(self):
+        samples = [5, 1, 4, 2, 3]
+        self.assertEqual(percentile(samples, 50), 3)
+        self.assertEqual(percentile(samples, 95), 5)
+        self.assertEqual(percentile([7], 99), 7)
+
+
+class TemplateCacheTests(TestCase):
+    """Template fragments are cached per data version; templates compile up front."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(name='Engineering')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_fragments_follow_the_data_version(self):
+        url = reverse('students')
+        self.assertContains(self.client.get(url), 'Engineering')
+
+        # A write that sends no signal leaves the data version alone, so a
+        # page cache miss (new query string) still reuses the fragment.
+        Faculty.objects.filter(pk=self.faculty.pk).update(name='Applied Engineering')
+        self.assertNotContains(self.client.get(url + '?ref=nav'), 'Applied Engineering')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.faculty.refresh_from_db()
+            self.faculty.save()
+        self.assertContains(self.client.get(url + '?ref=nav'), 'Applied Engineering')
+
+    def test_warm_templates_compiles_project_templates(self):
+        project_templates = list((settings.BASE_DIR.parent / 'templates').rglob('*.html'))
+        self.assertEqual(warm_templates(), len(project_templates))
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ApiTests(TestCase):
+    """JSON endpoints: projection, filters, cursor paging and ETag revalidation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(2)
+        make_students(
+            25, cls.faculties,
+            graduation_year=lambda i: 2026 + i % 3,
+            is_active=lambda i: i % 4 != 0,
+        )
+
+    def test_projection_filters_and_paging(self):
+        url = reverse('api_student_list')
+        params = {
+            'fields': 'student_id,faculty',
+            'faculty': self.faculties[0].slug,
+            'is_active': 'true',
+            'limit': 4,
+        }
+        expected = list(
+            Student.objects.filter(faculty=self.faculties[0], is_active=True)
+            .order_by('pk').values_list('student_id', flat=True)
+        )
+        seen = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            for row in data['results']:
+                self.assertEqual(set(row), {'student_id', 'faculty'})
+                self.assertEqual(row['faculty'], self.faculties[0].slug)
+                seen.append(row['student_id'])
+            if not data['next']:
+                break
+            response = self.client.get(data['next'])
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(url, {'graduation_year': 2027, 'fields': 'graduation_year'})
+        self.assertEqual({row['graduation_year'] for row in response.json()['results']}, {2027})
+
+    def test_bad_parameters(self):
+        url = reverse('api_student_list')
+        for params in (
+            {'fields': 'address'}, {'is_active': 'maybe'}, {'limit': 0}, {'cursor': '!'},
+            {'min_age': 'old'}, {'max_age': 1000}, {'cohort': 0},
+            {'cursor': encode_cursor('n', ['x'])}, {'cursor': encode_cursor('n', [None])},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+        missing = reverse('api_student_detail', args=[10 ** 6])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_etag_revalidation(self):
+        url = reverse('api_student_list') + '?limit=5'
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+
+        # Bulk updates move updated_at too, so the ETag changes.
+        Student.objects.filter(pk=Student.objects.order_by('pk').last().pk).update(is_active=False)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_faculty_endpoints(self):
+        faculty = self.faculties[1]
+        data = self.client.get(reverse('api_faculty_list'), {'fields': 'slug,active_student_count'}).json()
+        self.assertEqual([row['slug'] for row in data['results']], [f.slug for f in self.faculties])
+        response = self.client.get(reverse('api_faculty_detail', args=[faculty.slug]))
+        self.assertEqual(response.json()['name'], faculty.name)
+        response = self.client.get(
+            reverse('api_faculty_detail', args=[faculty.slug]), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+class ConditionalGetTests(TestCase):
+    """Unchanged pages are answered with 304; writes and deletes in scope change the ETag."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(2)
+        make_students(10, cls.faculties)
+
+    def setUp(self):
+        cache.clear()
+
+    def faculty_url(self, faculty):
+        return reverse('student_list_faculty', args=[faculty.slug])
+
+    def test_unchanged_page_is_not_modified(self):
+        for url in (reverse('students'), reverse('faculty'), reverse('student_list'),
+                    reverse('student_select_list'), self.faculty_url(self.faculties[0])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(len(queries), 0)
+                response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_writes_only_change_their_own_scope(self):
+        first, second = self.faculties
+        etags = {f.pk: self.client.get(self.faculty_url(f))['ETag'] for f in self.faculties}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student = second.students.first()
+            student.first_name = 'Renamed'
+            student.save()
+        response = self.client.get(self.faculty_url(first), HTTP_IF_NONE_MATCH=etags[first.pk])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.faculty_url(second), HTTP_IF_NONE_MATCH=etags[second.pk])
+        self.assertEqual(response.status_code, 200)
+
+    def test_pages_change_overnight(self):
+        # The student lists show ages, which move on without any write.
+        url = reverse('student_list')
+        response = self.client.get(url)
+
+        class Tomorrow(date):
+            @classmethod
+            def today(cls):
+                return date.today() + timedelta(days=1)
+
+        with mock.patch('GuideProject.Apps.person.freshness.date', Tomorrow), \
+                mock.patch('GuideProject.Apps.person.cache.date', Tomorrow):
+            revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(revalidated.status_code, 200)
+            self.assertNotEqual(revalidated['ETag'], response['ETag'])
+            revalidated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(revalidated.status_code, 200)
+
+    def test_deletes_change_the_etag(self):
+        url = self.faculty_url(self.faculties[0])
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.faculties[0].students.order_by('-updated_at').first().delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@override_settings(STUDENT_ADMIN_ESTIMATE_ROWS=0)
+class StudentAdminLargeTableTests(TestCase):
+    """In large-table mode the changelist never counts or scans the whole table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(3)
+        make_students(12, cls.faculties, graduation_year=lambda i: 2026 + i % 2)
+        get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin')
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(username='admin', password='admin')
+
+    def changelist(self, params=None):
+        url = reverse('admin:person_student_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in queries]
+
+    def test_counts_are_estimated_or_capped(self):
+        response, queries = self.changelist()
+        self.assertEqual(response.context['cl'].result_count, Student.objects.order_by('-pk')[0].pk)
+        counts = [sql for sql in queries if 'COUNT(' in sql and f'"{STUDENT_TABLE}"' in sql]
+        self.assertEqual(counts, [])
+
+        response, queries = self.changelist({'faculty__id__exact': self.faculties[0].pk})
+        self.assertEqual(response.context['cl'].result_count, 4)
+        counts = [sql for sql in queries if 'COUNT(' in sql and f'"{STUDENT_TABLE}"' in sql]
+        self.assertTrue(counts and all('LIMIT' in sql for sql in counts), counts)
+
+    def test_filter_choices_are_cached(self):
+        self.changelist()
+        _, queries = self.changelist()
+        self.assertFalse([sql for sql in queries if 'DISTINCT' in sql])
+        self.assertFalse([sql for sql in queries if 'FROM "person_faculty"' in sql])
+
+
+class StudentBulkJobTests(TestCase):
+    """Large bulk actions run window by window and can be cancelled."""
+
+    @classmethod
+    def setUpTestData(cls):
+        make_students(10, [Faculty.objects.create(name='Engineering')], graduation_year=2026)
+
+    def test_small_selections_update_at_once(self):
+        job, updated = start_bulk_update(
+            Student.objects.all(), StudentBulkJob.Action.MARK_INACTIVE, batch_size=100
+        )
+        self.assertIsNone(job)
+        self.assertEqual(updated, 10)
+        self.assertFalse(Student.objects.filter(is_active=True).exists())
+
+    def test_job_updates_selection_in_batches(self):
+        selection = Student.objects.filter(first_name__in=[f'First{i}' for i in range(0, 10, 2)])
+        job, _ = start_bulk_update(
+            selection, StudentBulkJob.Action.MARK_INACTIVE, batch_size=3, background=False
+        )
+        self.assertEqual(job.status, StudentBulkJob.Status.QUEUED)
+
+        with CaptureQueriesContext(connection) as queries:
+            run_job(job.pk, pause=0)
+        updates = [q['sql'] for q in queries if q['sql'].startswith(f'UPDATE "{STUDENT_TABLE}"')]
+        self.assertEqual(len(updates), 3)
+        # The counters move by each window's rows; nothing recounts a faculty.
+        self.assertFalse([
+            q for q in queries
+            if q['sql'].startswith('UPDATE "person_faculty"') and 'COUNT(' in q['sql']
+        ])
+        faculty = Faculty.objects.get()
+        self.assertEqual((faculty.total_student_count, faculty.active_student_count), (10, 5))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, StudentBulkJob.Status.DONE)
+        self.assertEqual(job.rows_updated, 5)
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(
+            set(Student.objects.filter(is_active=False).values_list('first_name', flat=True)),
+            {f'First{i}' for i in range(0, 10, 2)},
+        )
+
+    def test_cancelled_job_stops(self):
+        job, _ = start_bulk_update(
+            Student.objects.all(), StudentBulkJob.Action.MARK_INACTIVE, batch_size=3, background=False
+        )
+        StudentBulkJob.objects.filter(pk=job.pk).update(cancel_requested=True)
+        run_job(job.pk, pause=0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, StudentBulkJob.Status.CANCELLED)
+        self.assertEqual(job.rows_updated, 0)
+        self.assertEqual(Student.objects.filter(is_active=False).count(), 0)
+
+    def test_selection_is_stored_as_pk_runs(self):
+        pks = list(Student.objects.order_by('pk').values_list('pk', flat=True))
+        selection = Student.objects.exclude(pk__in=pks[3:5])
+        job, _ = start_bulk_update(
+            selection, StudentBulkJob.Action.MARK_INACTIVE, batch_size=3, background=False
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.selection, [[pks[0], pks[2]], [pks[5], pks[-1]]])
+        run_job(job.pk, pause=0)
+        self.assertEqual(
+            list(Student.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)),
+            pks[3:5],
+        )
+
+    def test_scattered_selection_is_stored_as_changelist_filters(self):
+        science = Faculty.objects.create(name='Science')
+        engineering = Faculty.objects.get(name='Engineering')
+        make_students(
+            6, [engineering, science],
+            first_name=lambda i: f'Mixed{i}', student_id=lambda i: f'MX{i:04d}',
+            email=lambda i: f'mixed{i}@example.com',
+        )
+        admin_user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin')
+        selection = Student.objects.filter(faculty=science)
+
+        with mock.patch('GuideProject.Apps.person.jobs.MAX_SELECTION_RUNS', 2):
+            job, _ = start_bulk_update(
+                selection, StudentBulkJob.Action.MARK_INACTIVE, requested_by=admin_user.username,
+                batch_size=3, background=False, changelist_query=f'faculty__id__exact={science.pk}',
+            )
+        job.refresh_from_db()
+        self.assertEqual(job.selection, [])
+        self.assertEqual(job.changelist_query, f'faculty__id__exact={science.pk}')
+
+        run_job(job.pk, pause=0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, StudentBulkJob.Status.DONE)
+        self.assertEqual(job.rows_updated, 3)
+        self.assertEqual(
+            set(Student.objects.filter(is_active=False).values_list('pk', flat=True)),
+            set(selection.values_list('pk', flat=True)),
+        )
+
+    def test_cancel_needs_change_permission(self):
+        job, _ = start_bulk_update(
+            Student.objects.all(), StudentBulkJob.Action.MARK_INACTIVE, batch_size=3, background=False
+        )
+        user = get_user_model().objects.create_user('viewer', password='viewer', is_staff=True)
+        user.user_permissions.add(Permission.objects.get(codename='view_studentbulkjob'))
+        self.client.login(username='viewer', password='viewer')
+        url = reverse('admin:person_studentbulkjob_changelist')
+        data = {'action': 'cancel_jobs', '_selected_action': [job.pk]}
+
+        self.client.post(url, data)
+        job.refresh_from_db()
+        self.assertFalse(job.cancel_requested)
+
+        user.user_permissions.add(Permission.objects.get(codename='change_student'))
+        self.client.post(url, data)
+        job.refresh_from_db()
+        self.assertTrue(job.cancel_requested)
+
+
+class StudentDerivedValuesTests(TestCase):
+    """Age, cohort and years to graduation are computed and filtered in SQL."""
+
+    TODAY = date(2024, 2, 29)
+    BIRTH_DATES = [
+        date(2006, 2, 28), date(2006, 3, 1), date(2004, 2, 29),
+        date(2003, 3, 1), date(2003, 2, 28), date(2001, 12, 31), date(2002, 1, 1), None,
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(2)
+        make_students(
+            len(cls.BIRTH_DATES), cls.faculties,
+            enrollment_date=lambda i: date(2020 + i % 3, 9, 1),
+            graduation_year=lambda i: 2024 + i % 4,
+            date_of_birth=lambda i: cls.BIRTH_DATES[i],
+        )
+
+    def python_age(self, born):
+        if born is None:
+            return None
+        return self.TODAY.year - born.year - (
+            (self.TODAY.month, self.TODAY.day) < (born.month, born.day)
+        )
+
+    def test_age_annotation_matches_python(self):
+        for student in Student.objects.with_age(self.TODAY):
+            self.assertEqual(student.age, self.python_age(student.date_of_birth), student.date_of_birth)
+
+    def test_age_range_filter(self):
+        for low, high in [(18, 21), (20, 20), (None, 19), (22, None)]:
+            expected = {
+                born for born in self.BIRTH_DATES
+                if born is not None
+                and (low is None or self.python_age(born) >= low)
+                and (high is None or self.python_age(born) <= high)
+            }
+            found = set(
+                Student.objects.aged(low, high, on=self.TODAY)
+                .values_list('date_of_birth', flat=True)
+            )
+            self.assertEqual(found, expected, (low, high))
+
+    @skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+    def test_age_range_uses_birth_date_index(self):
+        queryset = Student.objects.filter(faculty=self.faculties[0]).aged(18, 21, on=self.TODAY)
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('student_faculty_birth_idx', plan)
+
+    def test_grouping_runs_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            cohorts = dict(
+                Student.objects.with_cohort().order_by('cohort')
+                .values_list('cohort').annotate(students=Count('pk'))
+            )
+            ages = dict(
+                Student.objects.with_age(self.TODAY).filter(age__isnull=False)
+                .order_by('age').values_list('age').annotate(students=Count('pk'))
+            )
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(cohorts, {2020: 3, 2021: 3, 2022: 2})
+        expected = {}
+        for born in filter(None, self.BIRTH_DATES):
+            expected[self.python_age(born)] = expected.get(self.python_age(born), 0) + 1
+        self.assertEqual(ages, expected)
+
+    def test_cohort_and_graduation_filters(self):
+        self.assertEqual(
+            set(Student.objects.in_cohorts(2021, 2022).with_cohort().values_list('cohort', flat=True)),
+            {2021, 2022},
+        )
+        within = Student.objects.graduating_within(1, 2, on=self.TODAY).with_years_to_graduation(self.TODAY)
+        self.assertEqual(set(within.values_list('years_to_graduation', flat=True)), {1, 2})
+        self.assertEqual(within.count(), Student.objects.filter(graduation_year__in=[2025, 2026]).count())
+
+
+class EnrollmentSummaryTests(TestCase):
+    """The summary table follows every kind of Student write."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculties = make_faculties(3)
+        make_students(
+            18, cls.faculties,
+            enrollment_date=lambda i: date(2021 + i % 2, 9, 1),
+            graduation_year=lambda i: 2025 + i % 3 if i % 4 else None,
+            is_active=lambda i: i % 5 != 0,
+        )
+
+    def summary(self):
+        return sorted(
+            EnrollmentSummary.objects.filter(students__gt=0)
+            .values_list('faculty_id', 'cohort', 'graduation_year', 'is_active', 'students'),
+            key=str,
+        )
+
+    def expected(self):
+        groups = {}
+        for student in Student.objects.all():
+            key = (
+                student.faculty_id, student.enrollment_date.year,
+                student.graduation_year, student.is_active,
+            )
+            groups[key] = groups.get(key, 0) + 1
+        return sorted(((*key, count) for key, count in groups.items()), key=str)
+
+    def test_summary_follows_writes(self):
+        self.assertEqual(self.summary(), self.expected())
+
+        Student.objects.filter(faculty=self.faculties[0]).update(is_active=False)
+        self.assertEqual(self.summary(), self.expected())
+
+        student = Student.objects.filter(faculty=self.faculties[1]).first()
+        student.faculty = self.faculties[2]
+        student.graduation_year = 2030
+        student.save()
+        self.assertEqual(self.summary(), self.expected())
+
+        Student.objects.filter(enrollment_date__year=2021).delete()
+        self.assertEqual(self.summary(), self.expected())
+
+        self.faculties[2].delete()
+        self.assertEqual(self.summary(), self.expected())
+
+    def test_single_writes_apply_deltas(self):
+        summary_table = EnrollmentSummary._meta.db_table
+        student = Student.objects.filter(faculty=self.faculties[1], graduation_year__isnull=False).first()
+
+        def summary_queries(write):
+            with CaptureQueriesContext(connection) as queries:
+                write()
+            self.assertEqual(self.summary(), self.expected())
+            sql = [q['sql'] for q in queries if f'"{summary_table}"' in q['sql']]
+            self.assertFalse([q for q in sql if 'GROUP BY' in q or 'COUNT(' in q], sql)
+            return sql
+
+        student.phone_number = '555-0100'
+        self.assertEqual(summary_queries(student.save), [])
+
+        student.graduation_year = None
+        student.is_active = not student.is_active
+        self.assertTrue(summary_queries(student.save))
+
+        # A brand-new group gets a row; its last student takes it away.
+        student.enrollment_date = date(2030, 9, 1)
+        summary_queries(student.save)
+        self.assertTrue(EnrollmentSummary.objects.filter(cohort=2030, students=1).exists())
+        summary_queries(student.delete)
+        self.assertFalse(EnrollmentSummary.objects.filter(cohort=2030).exists())
+
+        summary_queries(lambda: make_students(
+            1, [self.faculties[0]], email='new@example.com', student_id='NEW'
+        ))
+
+    def test_bulk_writes_apply_deltas(self):
+        writes = [
+            lambda: Student.objects.filter(faculty=self.faculties[0]).update(is_active=False),
+            lambda: Student.objects.filter(faculty=self.faculties[1]).update(
+                faculty=self.faculties[2], graduation_year=2031,
+            ),
+            lambda: Student.objects.filter(enrollment_date__year=2021).delete(),
+        ]
+        for write in writes:
+            with mock.patch('GuideProject.Apps.person.analytics.refresh_enrollment_summary') as refresh:
+                write()
+            refresh.assert_not_called()
+            self.assertEqual(self.summary(), self.expected())
+
+        # Only the database knows what an expression gives: regroup.
+        Student.objects.update(graduation_year=F('graduation_year') + 1)
+        self.assertEqual(self.summary(), self.expected())
+
+    def test_rebuild_command(self):
+        before = self.summary()
+        EnrollmentSummary.objects.all().delete()
+        call_command('rebuild_enrollment_summary', '--faculty', self.faculties[0].slug, stdout=StringIO())
+        self.assertEqual(
+            self.summary(),
+            [row for row in before if row[0] == self.faculties[0].pk],
+        )
+        call_command('rebuild_enrollment_summary', stdout=StringIO())
+        self.assertEqual(self.summary(), before)
+
+    def test_dashboard_reads_only_the_summary(self):
+        cache.clear()
+        refresh_enrollment_summary()
+        url = reverse('enrollment_analytics')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            # A new query string misses the page cache.
+            response = self.client.get(url + '?ref=nav')
+        self.assertFalse([q for q in queries if f'FROM "{STUDENT_TABLE}"' in q['sql']])
+        self.assertEqual(response.context['total'], 18)
+        self.assertEqual(response.context['active'], 14)
+        self.assertEqual(response.context['cohorts'], [2021, 2022])
+        row = response.context['faculties'][0]
+        self.assertEqual(row['faculty'], self.faculties[0])
+        self.assertEqual(sum(row['per_cohort']), 6)
+        self.assertEqual(response.context['graduation'][-1], (None, 5))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite connection setup')
+class SQLiteConnectionTests(TestCase):
+    """Every connection gets the PRAGMAs configured in SQLITE_OPTIONS."""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        pragmas = settings.DATABASES['default']['OPTIONS']['pragmas']
+        self.assertEqual(self.pragma('cache_size'), pragmas['cache_size'])
+        self.assertEqual(self.pragma('temp_store'), 2)  # memory
+        self.assertEqual(self.pragma('synchronous'), 1)  # normal
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """Read-only views read the replica only when it is current and the client has not written."""
+
+    # The replica mirrors the test database through its own connection,
+    # which only sees committed rows: no TestCase transaction here.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.faculty = Faculty.objects.create(name='Science')
+        self.student = Student.objects.create(
+            first_name='Ada', last_name='Lovelace', email='ada@example.com',
+            student_id='ID00001', faculty=self.faculty, enrollment_date=date(2020, 9, 1),
+        )
+        cache.clear()
+
+    def replica_queries(self, url):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(replica)
+
+    def test_current_replica_serves_read_only_views(self):
+        set_replica_version(get_data_version())
+        for url in (reverse('student_list'), reverse('student_select_list'), reverse('faculty')):
+            with self.subTest(url=url):
+                self.assertGreater(self.replica_queries(url), 0)
+
+    def test_outdated_replica_is_not_used(self):
+        set_replica_version(get_data_version())
+        self.student.save()
+        self.assertFalse(replica_is_current())
+        self.assertEqual(self.replica_queries(reverse('student_list')), 0)
+
+    def test_post_pins_client_to_primary(self):
+        set_replica_version(get_data_version())
+        self.client.post(reverse('student_search'))
+        self.assertIn(STICKY_COOKIE, self.client.cookies)
+        self.assertEqual(self.replica_queries(reverse('student_list')), 0)
+
+    def test_other_views_and_writes_use_primary(self):
+        set_replica_version(get_data_version())
+        self.assertEqual(self.replica_queries(reverse('student_search') + '?q=Ada'), 0)
+        with reading_from('replica'):
+            student = Student.objects.get()
+            self.assertEqual(router.db_for_write(Student, instance=student), 'default')
+        self.assertEqual(student._state.db, 'replica')
+        # Outside the view, objects loaded from the replica read the primary.
+        self.assertEqual(router.db_for_read(Faculty, instance=student), 'default')
+
+    def test_refresh_replica_records_version(self):
+        with mock.patch(
+            'GuideProject.Apps.person.management.commands.refresh_replica.copy_database'
+        ) as copy:
+            call_command('refresh_replica', stdout=StringIO())
+        copy.assert_called_once_with(target='replica')
+        self.assertTrue(replica_is_current())
+
+    def test_copy_database_uses_backup_api(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'replica.sqlite3')
+            with mock.patch.dict(connections['replica'].settings_dict, NAME=path):
+                copy_database(target='replica')
+            with closing(sqlite3.connect(path)) as replica:
+                tables = {row[0] for row in replica.execute("SELECT name FROM sqlite_master")}
+        self.assertIn(STUDENT_TABLE, tables)
+
+
+class StaticAssetPipelineTests(SimpleTestCase):
+    """collectstatic writes hashed, precompressed files; the middleware serves them."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = Path(directory.name, 'static')
+        (source / 'css').mkdir(parents=True)
+        (source / 'css' / 'site.css').write_text('body { color: #333; }\n' * 100)
+        (source / 'tiny.css').write_text('p {}')
+        self.root = Path(directory.name, 'collected')
+        settings_override = override_settings(
+            STATIC_ROOT=self.root,
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STORAGES={
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'GuideProject.assets.CompressedManifestStaticFilesStorage'},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.hashed_url = static('css/site.css')
+        self.middleware = StaticAssetMiddleware(lambda request: HttpResponse('view'))
+
+    def get(self, url, **headers):
+        return self.middleware(RequestFactory().get(url, headers=headers))
+
+    def test_collectstatic_writes_compressed_variants(self):
+        self.assertRegex(self.hashed_url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        hashed = self.root / self.hashed_url.removeprefix('/static/')
+        self.assertEqual(
+            gzip.decompress((hashed.parent / (hashed.name + '.gz')).read_bytes()),
+            hashed.read_bytes(),
+        )
+        # Too small to be worth compressing.
+        self.assertFalse((self.root / 'tiny.css.gz').exists())
+
+    def test_serves_precompressed_variant_with_immutable_caching(self):
+        response = self.get(self.hashed_url, accept_encoding='gzip, deflate')
+        body = b''.join(response.streaming_content)
+        response.close()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(gzip.decompress(body).decode(), 'body { color: #333; }\n' * 100)
+
+        revalidated = self.get(self.hashed_url, accept_encoding='gzip', if_none_match=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_identity_and_plain_names(self):
+        response = self.get('/static/css/site.css', accept_encoding='gzip;q=0')
+        response.close()
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(int(response['Content-Length']), len('body { color: #333; }\n' * 100))
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.get('/static/missing.css').content, b'view')
+        self.assertEqual(self.get('/students').content, b'view')
@@ -1,11 +1,30 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+# The ASGI profile (settings/asgi.py) serves the async views.
+if settings.ASYNC_VIEWS:
+    students_view = views.students_async
+    list_views = (views.AsyncListViewStudents, views.AsyncListViewFacultySelect,
+                  views.AsyncListViewStudentsByFaculty)
+else:
+    students_view = views.students
+    list_views = (views.ListViewStudents, views.ListViewFacultySelect,
+                  views.ListViewStudentsByFaculty)
+student_list, student_select_list, student_list_faculty = (view.as_view() for view in list_views)
 
 urlpatterns = [
-    path('students', views.students, name='students'),
-    path('studentsList', views.ListViewStudents.as_view(), name='student_list'),
-    path('studentsFacultySelect', views.ListViewFacultySelect.as_view(), name='student_select_list'),
-    path('studentsFacultyList/<str:faculty>', views.ListViewStudentsByFaculty.as_view(),
+    path('students', students_view, name='students'),
+    path('studentsAnalytics', views.enrollment_analytics, name='enrollment_analytics'),
+    path('studentsSearch', views.student_search, name='student_search'),
+    path('studentsExport', views.student_export, name='student_export'),
+    path('studentsList', student_list, name='student_list'),
+    path('studentsFacultySelect', student_select_list, name='student_select_list'),
+    path('studentsFacultyList/<str:faculty>', student_list_faculty,
          name='student_list_faculty'),
+    path('api/students', api.student_list, name='api_student_list'),
+    path('api/students/<int:pk>', api.student_detail, name='api_student_detail'),
+    path('api/faculties', api.faculty_list, name='api_faculty_list'),
+    path('api/faculties/<slug:slug>', api.faculty_detail, name='api_faculty_detail'),
 
 ]
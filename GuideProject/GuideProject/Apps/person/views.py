@@ -5,12 +5,33 @@ This module contains views for student management.
 It demonstrates various Django view types and concepts.
 """
 
-from django.shortcuts import render, get_object_or_404
-from django.views.generic import ListView
+import asyncio
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponseBadRequest
+from django.shortcuts import redirect, render
+from django.template.response import TemplateResponse
+from django.utils.decorators import method_decorator
+from django.urls import reverse
+from django.views.generic import ListView, View
+from django.views.generic.base import ContextMixin
 from django.db.models import Q
 from .models import Student, Faculty
+from GuideProject.instrumentation import query_budget
+from GuideProject.routers import read_replica
+from .analytics import enrollment_report
+from .cache import versioned_cache_page
+from .export import EXPORT_FORMATS, streaming_export
+from .freshness import conditional_page
+from .faculty_map import afaculty_by_name, afaculty_by_slug, faculty_by_name, faculty_by_slug
+from .pagination import KeysetPaginationMixin
+from .search import search_students
+from .stats import astudent_totals, student_totals
 
 
+@conditional_page()
+@versioned_cache_page
+@query_budget(3)
 def students(request):
     """
     Function-based view for students overview.
@@ -19,22 +40,119 @@ def students(request):
     - Function-based views (FBV)
     - Basic template rendering
     - Context data passing
+    - Reading denormalized counters instead of counting rows
+    - Caching the rendered page until students or faculties change
+    - 304 Not Modified for unchanged pages (person.freshness)
     """
-    total_students = Student.objects.count()
-    active_students = Student.objects.filter(is_active=True).count()
+    totals = student_totals()
     faculties = Faculty.objects.all()
     
     context = {
         'page_title': 'Students Overview',
-        'total_students': total_students,
-        'active_students': active_students,
+        'total_students': totals['total'],
+        'active_students': totals['active'],
         'faculties': faculties,
     }
     
     return render(request, 'person/students.html', context)
 
 
-class ListViewStudents(ListView):
+@conditional_page()
+@versioned_cache_page
+@query_budget(3)
+async def students_async(request):
+    """
+    Async version of students(), routed when ``settings.ASYNC_VIEWS`` is on.
+    
+    This demonstrates:
+    - Async function-based views
+    - The async ORM (aaggregate, aiterator)
+    - Starting independent queries together with asyncio.gather()
+    - Returning a TemplateResponse, rendered outside the event loop
+    """
+    async def load_faculties():
+        return [faculty async for faculty in Faculty.objects.aiterator()]
+    
+    totals, faculties = await asyncio.gather(astudent_totals(), load_faculties())
+    
+    context = {
+        'page_title': 'Students Overview',
+        'total_students': totals['total'],
+        'active_students': totals['active'],
+        'faculties': faculties,
+    }
+    
+    return TemplateResponse(request, 'person/students.html', context)
+
+
+@conditional_page()
+@versioned_cache_page
+@query_budget(2)
+def enrollment_analytics(request):
+    """
+    Enrollment dashboard: students per faculty and year, graduation years
+    and active/inactive ratios.
+    
+    This demonstrates:
+    - Reading a summary table instead of aggregating Student per request
+    - One query for the whole report (plus the faculty map when it reloads)
+    """
+    context = enrollment_report()
+    context['page_title'] = 'Enrollment Analytics'
+    return render(request, 'person/enrollment_analytics.html', context)
+
+
+@query_budget(2)
+def student_search(request):
+    """
+    Ranked prefix search over students.
+    
+    This demonstrates:
+    - Reading query string parameters (request.GET)
+    - Delegating to a search module backed by SQLite FTS5
+    """
+    query = request.GET.get('q', '').strip()
+    results = search_students(query, limit=50) if query else []
+    
+    context = {
+        'page_title': 'Search Students',
+        'query': query,
+        'students': results,
+    }
+    
+    return render(request, 'person/student_search.html', context)
+
+
+@staff_member_required
+def student_export(request):
+    """
+    Download students as CSV or JSON Lines.
+    
+    This demonstrates:
+    - Streaming responses for large downloads
+    - Optional filtering from query string parameters
+    
+    Query parameters: format (csv or jsonl), faculty (faculty slug),
+    active (1 or 0).
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('format must be one of: ' + ', '.join(EXPORT_FORMATS))
+    
+    queryset = Student.objects.all()
+    if request.GET.get('faculty'):
+        queryset = queryset.filter(faculty__slug=request.GET['faculty'])
+    if request.GET.get('active') in ('0', '1'):
+        queryset = queryset.filter(is_active=request.GET['active'] == '1')
+    
+    return streaming_export(queryset, fmt)
+
+
+@method_decorator(read_replica, name='dispatch')
+@method_decorator(conditional_page(), name='dispatch')
+@method_decorator(versioned_cache_page, name='dispatch')
+@method_decorator(query_budget(2), name='dispatch')
+class ListViewStudents(KeysetPaginationMixin, ListView):
     """
     Class-based view for listing all students.
     
@@ -42,7 +160,7 @@ class ListViewStudents(ListView):
     - Class-based views (CBV)
     - ListView functionality
     - Template naming conventions
-    - Pagination (if needed)
+    - Keyset (cursor) pagination, so deep pages cost the same as page 1
     """
     
     model = Student
@@ -57,8 +175,9 @@ class ListViewStudents(ListView):
         This demonstrates:
         - QuerySet optimization with select_related
         - Filtering active students
+        - Ages computed by the database (StudentQuerySet.with_age)
         """
-        return Student.objects.select_related('faculty').filter(is_active=True)
+        return Student.objects.select_related('faculty').filter(is_active=True).with_age()
     
     def get_context_data(self, **kwargs):
         """
@@ -70,10 +189,14 @@ class ListViewStudents(ListView):
         """
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'All Students'
-        context['total_count'] = self.get_queryset().count()
+        context['total_count'] = student_totals()['active']
         return context
 
 
+@method_decorator(read_replica, name='dispatch')
+@method_decorator(conditional_page(), name='dispatch')
+@method_decorator(versioned_cache_page, name='dispatch')
+@method_decorator(query_budget(1), name='dispatch')
 class ListViewFacultySelect(ListView):
     """
     View for selecting faculty to filter students.
@@ -81,52 +204,172 @@ class ListViewFacultySelect(ListView):
     This demonstrates:
     - Custom ListView behavior
     - Template context customization
+    - Denormalized counters (Faculty.active_student_count) instead of N+1 counts
     """
     
     model = Faculty
-    template_name = 'person/faculty_select.html'
+    template_name = 'person/student_select_list.html'
     context_object_name = 'faculties'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'Select Faculty'
-        
-        # Add student count for each faculty
-        for faculty in context['faculties']:
-            faculty.student_count = faculty.students.filter(is_active=True).count()
-        
         return context
 
 
-class ListViewStudentsByFaculty(ListView):
+def faculty_scope(request, faculty):
+    """Freshness scope of a faculty page; unknown slugs fall through to the view."""
+    found = faculty_by_slug(faculty)
+    if found is None:
+        raise LookupError(faculty)
+    return found
+
+
+@method_decorator(read_replica, name='dispatch')
+@method_decorator(conditional_page(faculty_scope), name='dispatch')
+@method_decorator(versioned_cache_page, name='dispatch')
+@method_decorator(query_budget(2), name='dispatch')
+class ListViewStudentsByFaculty(KeysetPaginationMixin, ListView):
     """
     View for listing students filtered by faculty.
     
     This demonstrates:
-    - URL parameter handling
+    - URL parameter handling with slugs
+    - Permanent redirects from old URLs
     - Dynamic queryset filtering
-    - Error handling with get_object_or_404
+    - Resolving the faculty from an in-process map, without a query
+    - Keyset (cursor) pagination
     """
     
     model = Student
-    template_name = 'person/students_by_faculty.html'
+    template_name = 'person/student_list_faculty.html'
     context_object_name = 'students'
     paginate_by = 10
     
+    def get(self, request, *args, **kwargs):
+        """
+        Resolve the faculty once per request.
+        
+        URLs used to carry the faculty name; those still work but are
+        redirected permanently to the slug URL.
+        """
+        value = self.kwargs['faculty']
+        self.faculty = faculty_by_slug(value)
+        if self.faculty is None:
+            return self.redirect_to_slug(faculty_by_name(value))
+        return super().get(request, *args, **kwargs)
+    
+    def redirect_to_slug(self, faculty):
+        """Permanent redirect from a name URL, or 404 for an unknown faculty."""
+        if faculty is None:
+            raise Http404('No faculty matches the given query.')
+        url = reverse('student_list_faculty', args=[faculty.slug])
+        if self.request.META.get('QUERY_STRING'):
+            url += '?' + self.request.META['QUERY_STRING']
+        return redirect(url, permanent=True)
+    
     def get_queryset(self):
         """
-        Filter students by faculty from URL parameter.
+        Filter students by the faculty resolved in get().
         """
-        faculty_name = self.kwargs['faculty']
-        self.faculty = get_object_or_404(Faculty, name=faculty_name)
         return Student.objects.filter(
             faculty=self.faculty,
             is_active=True
-        ).select_related('faculty')
+        ).select_related('faculty').with_age()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = f'Students in {self.faculty.name}'
         context['faculty'] = self.faculty
-        context['total_count'] = self.get_queryset().count()
-        return context
\ No newline at end of file
+        context['total_count'] = self.faculty.active_student_count
+        return context
+
+
+class AsyncListMixin:
+    """
+    Async GET handler for the ListViews above.
+    
+    This demonstrates:
+    - Class-based views with ``async def`` handlers
+    - Running the page query and the extra context queries together
+    
+    Subclasses re-apply the view decorators, because the ones on the
+    synchronous parent wrap its synchronous dispatch().
+    """
+    
+    async def dispatch(self, request, *args, **kwargs):
+        return await View.dispatch(self, request, *args, **kwargs)
+    
+    async def aget_extra_context(self):
+        """Extra template context; may run queries with the async ORM."""
+        return {}
+    
+    async def alist_queryset(self, queryset):
+        rows = [obj async for obj in queryset.aiterator()]
+        return None, None, rows, False
+    
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        page_size = self.get_paginate_by(self.object_list)
+        if page_size:
+            listing = self.apaginate_queryset(self.object_list, page_size)
+        else:
+            listing = self.alist_queryset(self.object_list)
+        (paginator, page, rows, is_paginated), extra = await asyncio.gather(
+            listing, self.aget_extra_context()
+        )
+        context = ContextMixin.get_context_data(
+            self,
+            paginator=paginator,
+            page_obj=page,
+            is_paginated=is_paginated,
+            object_list=rows,
+            **{self.get_context_object_name(rows): rows},
+            **extra,
+        )
+        return self.render_to_response(context)
+
+
+@method_decorator(read_replica, name='dispatch')
+@method_decorator(conditional_page(), name='dispatch')
+@method_decorator(versioned_cache_page, name='dispatch')
+@method_decorator(query_budget(2), name='dispatch')
+class AsyncListViewStudents(AsyncListMixin, ListViewStudents):
+    """Async version of ListViewStudents."""
+    
+    async def aget_extra_context(self):
+        totals = await astudent_totals()
+        return {'page_title': 'All Students', 'total_count': totals['active']}
+
+
+@method_decorator(read_replica, name='dispatch')
+@method_decorator(conditional_page(), name='dispatch')
+@method_decorator(versioned_cache_page, name='dispatch')
+@method_decorator(query_budget(1), name='dispatch')
+class AsyncListViewFacultySelect(AsyncListMixin, ListViewFacultySelect):
+    """Async version of ListViewFacultySelect."""
+    
+    async def aget_extra_context(self):
+        return {'page_title': 'Select Faculty'}
+
+
+@method_decorator(read_replica, name='dispatch')
+@method_decorator(conditional_page(faculty_scope), name='dispatch')
+@method_decorator(versioned_cache_page, name='dispatch')
+@method_decorator(query_budget(2), name='dispatch')
+class AsyncListViewStudentsByFaculty(AsyncListMixin, ListViewStudentsByFaculty):
+    """Async version of ListViewStudentsByFaculty."""
+    
+    async def get(self, request, *args, **kwargs):
+        value = self.kwargs['faculty']
+        self.faculty = await afaculty_by_slug(value)
+        if self.faculty is None:
+            return self.redirect_to_slug(await afaculty_by_name(value))
+        return await super().get(request, *args, **kwargs)
+    
+    async def aget_extra_context(self):
+        return {
+            'page_title': f'Students in {self.faculty.name}',
+            'faculty': self.faculty,
+            'total_count': self.faculty.active_student_count,
+        }
\ No newline at end of file
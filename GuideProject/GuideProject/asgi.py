@@ -2,6 +2,7 @@
 ASGI config for GuideProject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The default settings are the ASGI deployment profile (settings/asgi.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -9,8 +10,14 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'GuideProject.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'GuideProject.settings.asgi')
 
 application = get_asgi_application()
+
+# Compile the templates now rather than during the first requests.
+if settings.TEMPLATE_WARMUP:
+    from GuideProject.templating import warm_templates
+    warm_templates()
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Static Asset Pipeline - Django Learning Guide
+
+This module collects, compresses and serves the static files.
+It demonstrates custom staticfiles storages, content negotiation and
+HTTP caching of immutable files.
+
+- CompressedManifestStaticFilesStorage (STORAGES in settings/prod.py)
+  is Django's ManifestStaticFilesStorage: ``collectstatic`` copies every
+  file under a content-hashed name (``css/person.3f2a1c.css``) and
+  ``{% static %}`` links to that name. It then writes a gzip variant
+  (``.gz``) next to each compressible file, and a brotli one (``.br``)
+  when the ``brotli`` package is installed. Compression happens once,
+  at deploy time, at the highest level.
+- StaticAssetMiddleware serves STATIC_ROOT. It indexes the files when
+  the worker starts, picks the smallest variant the client accepts
+  (``Accept-Encoding``) and answers revalidations with 304. A hashed name
+  changes whenever its content does, so hashed files are sent with
+  ``Cache-Control: immutable`` and a one-year max-age: browsers never ask
+  for them again. Files referenced by their plain name get a short
+  max-age and an ETag.
+
+Nothing is compressed while serving a request.
+"""
+
+import gzip
+import json
+import mimetypes
+import os
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+# Formats that are already compressed gain nothing from another pass.
+INCOMPRESSIBLE = frozenset({
+    '.avif', '.br', '.gif', '.gz', '.jpeg', '.jpg', '.mp3', '.mp4', '.png',
+    '.webm', '.webp', '.woff', '.woff2', '.zip',
+})
+# Smaller files fit in a packet either way.
+MIN_COMPRESS_SIZE = 256
+# A variant is only kept when it saves at least 5%.
+MAX_COMPRESS_RATIO = 0.95
+
+# Preferred first.
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MUTABLE_CACHE_CONTROL = 'public, max-age=60'
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+def _gzip(data):
+    # mtime=0 keeps the output identical from one collectstatic to the next.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_file(path):
+    """
+    Write the ``.br`` and ``.gz`` variants of ``path`` that are worth it.
+
+    Variants newer than the file are kept, so running collectstatic again
+    only compresses what changed. Returns the paths written.
+    """
+    path = Path(path)
+    if path.suffix.lower() in INCOMPRESSIBLE or path.stat().st_size < MIN_COMPRESS_SIZE:
+        return []
+    compressors = {'.gz': _gzip}
+    if brotli is not None:
+        compressors['.br'] = _brotli
+    data = None
+    written = []
+    for suffix, compressor in compressors.items():
+        variant = path.with_name(path.name + suffix)
+        if variant.exists() and variant.stat().st_mtime >= path.stat().st_mtime:
+            continue
+        if data is None:
+            data = path.read_bytes()
+        compressed = compressor(data)
+        if len(compressed) <= len(data) * MAX_COMPRESS_RATIO:
+            variant.write_bytes(compressed)
+            written.append(variant)
+        elif variant.exists():
+            variant.unlink()
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Hashed file names plus precompressed variants.
+
+    This demonstrates:
+    - Extending a storage's post_process() step of collectstatic
+    - Linking files missing from the manifest by their plain name, so a
+      template that names an absent file shows a broken image instead
+      of failing with a server error
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # The hashed copies are what {% static %} links to; the originals
+        # stay reachable under their plain names.
+        for name in {*paths, *self.hashed_files.values()}:
+            if self.exists(name):
+                compress_file(self.path(name))
+
+
+def accepted_encodings(header):
+    """The content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticAsset:
+    """One file under STATIC_ROOT and its precompressed variants."""
+
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        stat = path.stat()
+        self.size = stat.st_size
+        self.last_modified = http_date(stat.st_mtime)
+        self.etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+        self.content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        self.variants = {}
+        for encoding, suffix in ENCODINGS.items():
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                self.variants[encoding] = (variant, variant.stat().st_size)
+
+    def negotiate(self, accept_encoding):
+        """Return ``(encoding, path, size)`` of the best variant accepted."""
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, (path, size) in self.variants.items():
+            if encoding in accepted or '*' in accepted:
+                return encoding, path, size
+        return None, self.path, self.size
+
+
+def index_static_root(root, prefix):
+    """Map the URL path of every file under ``root`` to its StaticAsset."""
+    root = Path(root)
+    manifest = root / ManifestStaticFilesStorage.manifest_name
+    hashed = set()
+    if manifest.is_file():
+        hashed = set(json.loads(manifest.read_text()).get('paths', {}).values())
+    assets = {}
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = Path(directory, filename)
+            name = path.relative_to(root).as_posix()
+            if path.suffix in ('.br', '.gz') and path.with_suffix('').is_file():
+                continue
+            if path == manifest:
+                continue
+            assets[prefix + name] = StaticAsset(path, immutable=name in hashed)
+    return assets
+
+
+class StaticAssetMiddleware:
+    """
+    Serve collected static files with precompressed variants.
+
+    This demonstrates:
+    - Content negotiation on Accept-Encoding (with ``Vary``)
+    - Far-future caching for content-hashed URLs
+    - Opting out with MiddlewareNotUsed when there is nothing to serve
+
+    Listed first in MIDDLEWARE, so a static request never reaches
+    sessions, auth or the URL resolver. Under runserver with DEBUG on
+    nothing is collected yet and the staticfiles app serves the files.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        url = urlsplit(settings.STATIC_URL or '')
+        root = settings.STATIC_ROOT
+        if url.netloc or not root or not os.path.isdir(root):
+            # Served from another host, or not collected.
+            raise MiddlewareNotUsed
+        self.prefix = url.path
+        self.assets = index_static_root(root, self.prefix)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve(request) or await self.get_response(request)
+
+    def serve(self, request):
+        """The response for a static file, or None for other requests."""
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(self.prefix):
+            return None
+        asset = self.assets.get(request.path_info)
+        if asset is None:
+            return None
+
+        encoding, path, size = asset.negotiate(request.headers.get('Accept-Encoding', ''))
+        etag = f'"{asset.etag}-{encoding}"' if encoding else f'"{asset.etag}"'
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            response = HttpResponseNotModified()
+        elif request.method == 'HEAD':
+            response = HttpResponse(content_type=asset.content_type)
+            response['Content-Length'] = size
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+            # FileResponse names the file it sends, which may be the .gz.
+            response.headers.pop('Content-Disposition', None)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if asset.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response['ETag'] = etag
+        response['Last-Modified'] = asset.last_modified
+        response['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL if asset.immutable else MUTABLE_CACHE_CONTROL
+        )
+        return response
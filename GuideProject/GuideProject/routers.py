@@ -0,0 +1,198 @@
+"""
+Read Replica Routing - Django Learning Guide
+
+This module sends the queries of read-only views to a replica database.
+It demonstrates database routers, context variables and read-your-writes
+consistency.
+
+- ReplicaRouter (listed in ``settings.DATABASE_ROUTERS``) sends writes to
+  ``default`` and reads to the replica alias named by
+  ``settings.REPLICA_DATABASE``, but only while a read_replica() view
+  runs. Everything else (admin, forms, sessions, auth) keeps reading the
+  primary.
+- read_replica() marks a view as read-only. It only uses the replica for
+  safe methods, when the client has not written recently and when the
+  ``settings.REPLICA_FRESHNESS_CHECK`` callable says the replica is
+  current enough; otherwise the view reads the primary as before.
+- ReplicaStickinessMiddleware gives read-your-writes: after a POST (a
+  form, an admin save) the client gets a short-lived cookie that pins its
+  reads to the primary for ``settings.REPLICA_STICKY_SECONDS``.
+- copy_database() refreshes a SQLite replica with SQLite's online backup
+  API (see the refresh_replica management command).
+
+The "use the replica" flag lives in a context variable, so it is private
+to the request: concurrent threads and coroutines never see each other's
+flag, and asgiref copies it to the sync thread that runs ORM code for
+async views.
+"""
+
+import sqlite3
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.module_loading import import_string
+
+STICKY_COOKIE = 'read_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica = ContextVar('replica_alias', default=None)
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is none."""
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+class ReplicaRouter:
+    """
+    Route reads to the replica inside read_replica() views.
+
+    Reads outside them, and every write, go to ``default`` explicitly:
+    returning None would let Django fall back to the database an instance
+    was loaded from, and objects loaded from the replica could then be
+    saved to it or used for later reads.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema with the data, from the backup.
+        return db != replica_alias()
+
+
+@contextmanager
+def reading_from(alias):
+    """Route this context's reads to ``alias`` (None: the primary)."""
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def is_pinned(request):
+    """True when the client wrote recently and must read the primary."""
+    return STICKY_COOKIE in request.COOKIES
+
+
+def _replica_for(request):
+    """The alias this request may read from, without checking freshness."""
+    if request.method not in SAFE_METHODS or is_pinned(request):
+        return None
+    return replica_alias()
+
+
+def replica_is_fresh():
+    """Run ``settings.REPLICA_FRESHNESS_CHECK``; without one, trust the replica."""
+    check = getattr(settings, 'REPLICA_FRESHNESS_CHECK', None)
+    return import_string(check)() if check else True
+
+
+def read_replica(view_func):
+    """
+    Let a read-only view read from the replica.
+
+    This demonstrates:
+    - Request-scoped routing state with a ContextVar
+    - A view decorator that supports sync and async views
+
+    Put it above conditional_page() and versioned_cache_page() so their
+    queries use the replica too.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            alias = _replica_for(request)
+            if alias and not await sync_to_async(replica_is_fresh)():
+                alias = None
+            with reading_from(alias):
+                return await view_func(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        alias = _replica_for(request)
+        if alias and not replica_is_fresh():
+            alias = None
+        with reading_from(alias):
+            return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pin a client's reads to the primary for a while after it writes.
+
+    This demonstrates:
+    - Read-your-writes consistency with a short-lived cookie
+    - Middleware that runs natively under both WSGI and ASGI
+
+    Any non-safe request (forms, admin saves and deletes) sets the cookie;
+    read_replica() views ignore the replica while it is present. The
+    window must be longer than the replica may lag behind the primary.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS and replica_alias():
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+def copy_database(source=DEFAULT_DB_ALIAS, target=None):
+    """
+    Copy the ``source`` SQLite database over the ``target`` one.
+
+    SQLite's backup API reads a consistent snapshot of the source while
+    it keeps accepting writes, and replaces the target in one transaction:
+    readers of the target see either the old copy or the new one. The
+    target is opened directly, since its Django connections are read-only.
+    """
+    target = target or replica_alias()
+    if target is None:
+        raise ValueError('No replica database is configured.')
+    for alias in (source, target):
+        if connections[alias].vendor != 'sqlite':
+            raise ValueError(f'Database {alias!r} is not SQLite.')
+    path = str(connections[target].settings_dict['NAME'])
+
+    primary = connections[source]
+    primary.ensure_connection()
+    with closing(sqlite3.connect(path)) as replica:
+        primary.connection.backup(replica)
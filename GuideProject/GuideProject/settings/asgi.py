@@ -0,0 +1,24 @@
+"""
+ASGI deployment profile.
+
+Production settings with the async views switched on. Run under an ASGI
+server with one event loop per worker process, for example:
+
+    gunicorn GuideProject.asgi:application -k uvicorn.workers.UvicornWorker -w 4
+
+A request only occupies a thread while it runs ORM or cache code, which
+Django executes on a per-request sync thread; waiting on slow clients
+costs nothing but a coroutine. The async views start their independent
+queries together with asyncio.gather(), so they reach that thread
+back-to-back without blocking the event loop.
+"""
+
+from .prod import *
+
+ASYNC_VIEWS = True
+
+# Persistent connections belong to the thread that opened them, and ASGI
+# requests do not reuse threads, so they would only pile up. Use pooling
+# on the database side instead.
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = 0
\ No newline at end of file
@@ -24,6 +24,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'GuideProject.assets.StaticAssetMiddleware',
+    'GuideProject.instrumentation.SQLInstrumentationMiddleware',
+    'GuideProject.routers.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,6 +38,68 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'GuideProject.urls'
 
+# Views decorated with query_budget() log a warning when they run more SQL
+# statements than allowed; when strict (as in the tests) they raise instead.
+QUERY_BUDGET_STRICT = False
+
+# Route the overview and list pages to their async views. Only worth it
+# under an ASGI server; settings/asgi.py turns it on.
+ASYNC_VIEWS = False
+
+# The Student admin stops counting rows exactly (see StudentAdmin.get_paginator)
+# once the table holds about this many.
+STUDENT_ADMIN_ESTIMATE_ROWS = 100_000
+
+# SQLite connection setup, applied by the GuideProject.sqlite_backend engine
+# to every new connection (see DATABASES in local.py and prod.py).
+SQLITE_OPTIONS = {
+    # Seconds to wait for a lock before failing with "database is locked".
+    'timeout': 20,
+    # Take the write lock at BEGIN, so a transaction that reads before it
+    # writes waits for the lock (busy timeout) instead of failing.
+    'transaction_mode': 'IMMEDIATE',
+    'pragmas': {
+        # Readers no longer block the writer, nor the writer the readers.
+        'journal_mode': 'wal',
+        # With WAL, fsync at checkpoints only; a power loss may drop the
+        # last commits but never corrupts the database.
+        'synchronous': 'normal',
+        'mmap_size': 256 * 1024 * 1024,
+        # Negative means KiB: a 64 MiB page cache per connection.
+        'cache_size': -64 * 1024,
+        'temp_store': 'memory',
+    },
+}
+
+# Keep connections (and their setup) for a minute; check them before reuse.
+DB_CONN_MAX_AGE = 60
+
+# The read replica is a copy of the database file, refreshed by
+# ``manage.py refresh_replica``. Its connections refuse to write.
+SQLITE_REPLICA_OPTIONS = {
+    'timeout': 20,
+    'pragmas': {
+        'query_only': 1,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'memory',
+    },
+}
+
+# Views decorated with read_replica() (the student lists and the faculty
+# page) read from this database alias when it exists, see routers.py.
+DATABASE_ROUTERS = ['GuideProject.routers.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+# Only while it holds the current data version, so that the page cache
+# never stores pages rendered from an outdated copy.
+REPLICA_FRESHNESS_CHECK = 'GuideProject.Apps.person.cache.replica_is_current'
+# After a POST (forms, admin saves) the client reads the primary this long.
+REPLICA_STICKY_SECONDS = 30
+
+# Compile the project templates when the WSGI/ASGI application starts
+# (see GuideProject/templating.py). settings/prod.py turns it on.
+TEMPLATE_WARMUP = False
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -46,12 +111,24 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'GuideProject.Apps.person.context_processors.data_version',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'GuideProject.wsgi.application'
+ASGI_APPLICATION = 'GuideProject.asgi.application'
+
+# Cache
+# Local memory is private to each process, which is fine for runserver.
+# settings/prod.py switches to a cache shared by all workers, because the
+# page cache invalidation in person/cache.py relies on a shared version.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -83,8 +160,10 @@ USE_TZ = True
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 STATIC_URL = 'static/'
-STATICFILES_DIRS = (os.path.join('static'),)
+STATICFILES_DIRS = (BASE_DIR.parent / 'static',)
 STATIC_DIR = (
     os.path.join(BASE_DIR, 'static'),
 )
-STATIC_ROOT = BASE_DIR / ''
+# collectstatic copies every static file here; StaticAssetMiddleware
+# (GuideProject/assets.py) serves them once it exists.
+STATIC_ROOT = BASE_DIR.parent / 'staticfiles'
@@ -12,9 +12,21 @@ ALLOWED_HOSTS = []
 # Local Database - Using SQLite for easier development
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'GuideProject.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    'replica': {
+        'ENGINE': 'GuideProject.sqlite_backend',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+        'OPTIONS': SQLITE_REPLICA_OPTIONS,
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # The tests read the replica through the test database.
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
 # Default primary key
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from .base import *
 
@@ -7,7 +8,50 @@ ALLOWED_HOSTS = []
 # Local Database
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'GuideProject.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    'replica': {
+        'ENGINE': 'GuideProject.sqlite_backend',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+        'OPTIONS': SQLITE_REPLICA_OPTIONS,
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # The tests read the replica through the test database.
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# Shared cache (atomic incr is required for the page cache data version)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
     }
-}
\ No newline at end of file
+}
+
+# collectstatic stores content-hashed copies with gzip (and, with the
+# brotli package, brotli) variants; StaticAssetMiddleware serves them
+# with far-future caching. See GuideProject/assets.py.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'GuideProject.assets.CompressedManifestStaticFilesStorage'},
+}
+
+# Templates are read and compiled once per process and kept in memory.
+# Django already does this by default; being explicit keeps it that way
+# whatever DEBUG and the loader defaults are. Changed templates need a
+# restart.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Compile the project templates before the first request.
+TEMPLATE_WARMUP = True
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+SQLite Backend - Django Learning Guide
+
+This module is Django's SQLite backend plus connection-time PRAGMAs.
+It demonstrates custom database backends and tuning SQLite for a web server.
+
+Select it with ``'ENGINE': 'GuideProject.sqlite_backend'`` and put the
+PRAGMAs in ``OPTIONS['pragmas']`` (see SQLITE_OPTIONS in settings/base.py).
+They run, in order, on every new connection; everything else in OPTIONS
+goes to Django's backend as usual (``timeout`` is the busy timeout in
+seconds, ``transaction_mode`` the kind of BEGIN).
+
+PersonalBlog uses this module too (see its own sqlite_backend), adding
+``transaction_mode`` for the Django 4 it runs on.
+
+With CONN_MAX_AGE the connection, and so the setup, is reused across
+requests; CONN_HEALTH_CHECKS replaces a broken one before it is used.
+"""
+
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite connections configured from ``OPTIONS['pragmas']``.
+    
+    This demonstrates:
+    - Extending a built-in database backend
+    - A connection-setup hook that runs once per connection, not per query
+    """
+    
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        for name in self.pragmas:
+            if not PRAGMA_NAME.match(name):
+                raise ImproperlyConfigured(f'Invalid SQLite PRAGMA name: {name!r}')
+        return params
+    
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
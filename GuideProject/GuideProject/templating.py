@@ -0,0 +1,48 @@
+"""
+Template Warm-up - Django Learning Guide
+
+This module compiles the project's templates when a worker starts.
+It demonstrates the cached template loader and startup hooks in
+wsgi.py / asgi.py.
+
+With the cached loader (see TEMPLATES in settings/prod.py) each template
+is read from disk and compiled once per process, on first use. Called at
+startup when ``settings.TEMPLATE_WARMUP`` is true, warm_templates() does
+that for every template in the project's template directories, so the
+first requests of a fresh worker do not pay for it. Only the DIRS are
+walked; the admin's many app templates still compile on first use.
+"""
+
+import logging
+import time
+from pathlib import Path
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger('GuideProject.templates')
+
+
+def warm_templates():
+    """Compile every ``.html`` template under the DIRS of the Django engines."""
+    started = time.perf_counter()
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.engine.dirs:
+            root = Path(directory)
+            for path in sorted(root.rglob('*.html')):
+                name = path.relative_to(root).as_posix()
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError:
+                    # Report it, but let the worker start; the page that
+                    # uses the template will fail with the same error.
+                    logger.exception('Template %s does not compile', name)
+                else:
+                    compiled += 1
+    logger.info(
+        'Compiled %d templates in %.1f ms', compiled, (time.perf_counter() - started) * 1000
+    )
+    return compiled
\ No newline at end of file
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'GuideProject.settings')
 
 application = get_wsgi_application()
+
+# Compile the templates now rather than during the first requests.
+if settings.TEMPLATE_WARMUP:
+    from GuideProject.templating import warm_templates
+    warm_templates()
\ No newline at end of file
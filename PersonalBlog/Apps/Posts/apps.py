@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PostsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Apps.Posts'
+
+    def ready(self):
+        # Registers the receivers that invalidate the cached posts pages.
+        from . import cache  # noqa: F401
@@ -0,0 +1,140 @@
+"""
+Rendered posts pages, cached until a post is written.
+
+Every key carries the posts version. Saving or deleting a post (makepost,
+the admin) stores a new version once the transaction commits, which
+makes every cached page unreachable at once; the next reader renders
+the page again. Between writes, readers get the stored HTML without a
+query or a render.
+
+A version is a fresh clock value rather than an increment, so two
+writers can never end up on the same number, and the cache needs no
+atomic incr. It must be shared by all worker processes (see CACHES in
+settings.py). Writes that bypass the model signals (QuerySet.update(),
+raw SQL) must call bump_posts_version() themselves.
+
+Being a clock value, the version also gives the feeds their ETag and
+Last-Modified, so a polling feed reader is answered without a query.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Posts
+
+POSTS_VERSION_KEY = 'posts:version'
+REPLICA_VERSION_KEY = 'posts:replica-version'
+
+# Pages never go stale; this only bounds how long the pages of old
+# versions occupy the cache.
+PAGE_TIMEOUT = 60 * 60 * 24
+
+
+def get_posts_version():
+    version = cache.get(POSTS_VERSION_KEY)
+    if version is None:
+        cache.add(POSTS_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(POSTS_VERSION_KEY)
+    return version
+
+
+def bump_posts_version():
+    cache.set(POSTS_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def replica_is_current():
+    """
+    True when the read replica holds the posts of the current version
+    (REPLICA_FRESHNESS_CHECK in settings.py).
+
+    refresh_replica records the version it copied. Reading an older copy
+    would store its pages under the new version.
+    """
+    replica_version = cache.get(REPLICA_VERSION_KEY)
+    return replica_version is not None and replica_version == get_posts_version()
+
+
+def set_replica_version(version):
+    cache.set(REPLICA_VERSION_KEY, version, timeout=None)
+
+
+def cache_posts_page(view_func):
+    """Serve a view's GET responses from the cache until the next post write."""
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view_func(request, *args, **kwargs)
+
+        # Read before the posts: a page rendered while a write commits is
+        # stored under the version that write replaces.
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = f'posts:page:{get_posts_version()}:{path}'
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, (response.content, response['Content-Type']), PAGE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def cache_feed(view_func):
+    """
+    Like cache_posts_page, for a feed polled by readers: the posts version
+    is its validator, so If-None-Match / If-Modified-Since get a 304 before
+    the cache is even asked for the body.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+
+        version = get_posts_version()
+        etag = f'"{version:x}"'
+        # Rounded up to the second, so it is never older than the write.
+        last_modified = -(-version // 10**9)
+        validators = {
+            'ETag': etag,
+            'Last-Modified': http_date(last_modified),
+            'Cache-Control': 'no-cache',
+        }
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            # The feeds link to absolute URLs, so the host is part of the key.
+            url = hashlib.md5(request.build_absolute_uri(request.path).encode()).hexdigest()
+            key = f'posts:feed:{version}:{url}'
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(key, (response.content, response['Content-Type']), PAGE_TIMEOUT)
+        for header, value in validators.items():
+            response[header] = value
+        return response
+
+    return wrapper
+
+
+@receiver(post_save, sender=Posts)
+@receiver(post_delete, sender=Posts)
+def posts_written(sender, using, **kwargs):
+    transaction.on_commit(bump_posts_version, using=using)
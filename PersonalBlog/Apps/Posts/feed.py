@@ -0,0 +1,74 @@
+"""
+Newest-first posts feed for PersonalBlog.
+
+Pages are addressed by the (date, id) of a post instead of an OFFSET:
+``?before=<cursor>`` lists the posts older than that one, ``?after=``
+the newer ones. The posts_date_id_idx index answers both with a seek, so
+every page costs one query for a page of rows, however many posts the
+blog holds.
+"""
+
+from datetime import date
+
+from django.db.models import Q
+
+PAGE_SIZE = 10
+
+
+class InvalidCursor(ValueError):
+    """A ``before``/``after`` value that does not name a post."""
+
+
+def encode_cursor(post):
+    return f'{post.date.isoformat()}.{post.id}'
+
+
+def decode_cursor(token):
+    day, _, post_id = token.partition('.')
+    try:
+        return date.fromisoformat(day), int(post_id)
+    except ValueError:
+        raise InvalidCursor(f'Invalid cursor: {token!r}')
+
+
+class FeedPage:
+    """The posts of one page and the cursors of its neighbours."""
+
+    def __init__(self, posts, has_older, has_newer):
+        self.posts = posts
+        self.older = encode_cursor(posts[-1]) if posts and has_older else None
+        self.newer = encode_cursor(posts[0]) if posts and has_newer else None
+
+    def __iter__(self):
+        return iter(self.posts)
+
+    def __len__(self):
+        return len(self.posts)
+
+
+def feed_page(queryset, before=None, after=None, per_page=PAGE_SIZE):
+    """
+    One page of ``queryset``, newest first.
+
+    Without a cursor it is the first page. One extra row is fetched to
+    tell whether there is a page beyond this one.
+    """
+    if after:
+        day, post_id = decode_cursor(after)
+        rows = list(
+            queryset.filter(Q(date__gt=day) | Q(date=day, id__gt=post_id), date__gte=day)
+            .order_by('date', 'id')[:per_page + 1]
+        )
+        has_newer = len(rows) > per_page
+        rows = rows[:per_page]
+        rows.reverse()
+        # The post the cursor names is older than all of them.
+        return FeedPage(rows, has_older=True, has_newer=has_newer)
+
+    queryset = queryset.newest_first()
+    if before:
+        day, post_id = decode_cursor(before)
+        # The plain bound on date lets SQLite seek into the index.
+        queryset = queryset.filter(Q(date__lt=day) | Q(date=day, id__lt=post_id), date__lte=day)
+    rows = list(queryset[:per_page + 1])
+    return FeedPage(rows[:per_page], has_older=len(rows) > per_page, has_newer=bool(before))
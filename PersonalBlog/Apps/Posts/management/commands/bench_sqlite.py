@@ -0,0 +1,209 @@
+"""
+SQLite concurrency benchmark for PersonalBlog.
+
+Measures how many times per second reader processes can load the posts
+page, first alone and then while writer processes keep creating posts
+through ``makepost`` and the admin. Separate processes, like the workers
+of a production server, contend for SQLite's locks rather than for
+Python's GIL. It runs once with Django's default SQLite setup and once
+with SQLITE_OPTIONS from settings.py, each on a fresh database file in a
+temporary directory (the project database is never touched).
+
+Page latency also depends on how many CPU cores the processes share;
+the SQL time of the reads shows the time spent waiting on the writers.
+
+Usage:
+    python manage.py bench_sqlite
+    python manage.py bench_sqlite --seconds 10 --readers 4 --writers 2
+"""
+
+import json
+import math
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from Apps.Posts.models import Posts
+from PersonalBlog.instrumentation import record_queries
+
+# Both profiles use the project backend; without pragmas or a transaction
+# mode it behaves exactly like django.db.backends.sqlite3.
+PROFILES = {
+    'default': {'OPTIONS': {}, 'CONN_MAX_AGE': 0},
+    'tuned': {'OPTIONS': settings.SQLITE_OPTIONS, 'CONN_MAX_AGE': 60},
+}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile (0 for no samples)."""
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+class Command(BaseCommand):
+    help = 'Compare posts page throughput under concurrent writes, default vs tuned SQLite.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5, help='Length of each phase (default: 5).')
+        parser.add_argument('--readers', type=int, default=4, help='Reader processes (default: 4).')
+        parser.add_argument('--writers', type=int, default=2, help='Writer processes (default: 2).')
+        parser.add_argument('--posts', type=int, default=100, help='Posts to seed (default: 100).')
+        parser.add_argument(
+            '--write-pause', type=float, default=0.02,
+            help='Seconds each writer waits between writes (default: 0.02).',
+        )
+        parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='Only run this profile (may be repeated).')
+        parser.add_argument('--dir', help='Directory for the database files (default: system temp).')
+
+    def handle(self, *args, **options):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('This benchmark needs the fork start method (Linux, macOS).')
+        if options['readers'] < 1 or options['seconds'] <= 0:
+            raise CommandError('--readers must be at least 1 and --seconds positive.')
+        db = connections.settings['default']
+        if not db['ENGINE'].endswith('sqlite_backend'):
+            raise CommandError('The default database must use PersonalBlog.sqlite_backend.')
+
+        original = {key: db[key] for key in ('NAME', 'OPTIONS', 'CONN_MAX_AGE')}
+        setup_test_environment()
+        # Measure the primary alone, whatever state the replica file is in,
+        # and render every page instead of serving it from the page cache.
+        primary_only = override_settings(
+            REPLICA_DATABASE=None,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        )
+        primary_only.enable()
+        report = {}
+        try:
+            for name in options['profile'] or sorted(PROFILES):
+                with tempfile.TemporaryDirectory(dir=options['dir']) as directory:
+                    connections.close_all()
+                    # Content type ids are cached per process; each database has its own.
+                    ContentType.objects.clear_cache()
+                    db.update(PROFILES[name], NAME=str(Path(directory) / 'bench.sqlite3'))
+                    self.seed(options['posts'])
+                    report[name] = {
+                        'reads only': self.phase(options, writers=0),
+                        'reads + writes': self.phase(options, writers=options['writers']),
+                    }
+                    connections.close_all()
+        finally:
+            db.update(original)
+            primary_only.disable()
+            teardown_test_environment()
+
+        for name, phases in report.items():
+            for phase, result in phases.items():
+                self.stderr.write(
+                    f'{name:8} {phase:15} {result["reads_per_second"]:8.1f} reads/s  '
+                    f'p95 {result["read_p95_ms"]:7.2f} ms  '
+                    f'SQL p99 {result["read_sql_p99_ms"]:7.2f} ms  '
+                    f'{result["writes_per_second"]:7.1f} writes/s  '
+                    f'{result["errors"]} errors'
+                )
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+
+    def seed(self, count):
+        call_command('migrate', verbosity=0)
+        Posts.objects.bulk_create(
+            Posts(title=f'Post {i}', description='Lorem ipsum dolor sit amet. ' * 20)
+            for i in range(count)
+        )
+        get_user_model().objects.create_superuser('bench', 'bench@example.com', 'bench')
+
+    def phase(self, options, writers):
+        """Run the readers (and writers) for --seconds; return their numbers."""
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        deadline = time.monotonic() + options['seconds']
+        user_id = get_user_model().objects.get(username='bench').pk
+        # Children must open their own connections.
+        connections.close_all()
+        workers = [
+            context.Process(target=read_posts, args=(deadline, results))
+            for _ in range(options['readers'])
+        ]
+        workers += [
+            context.Process(target=write_posts, args=(i, user_id, deadline, options['write_pause'], results))
+            for i in range(writers)
+        ]
+        for worker in workers:
+            worker.start()
+        reads, writes, errors = [], 0, 0
+        for _ in workers:
+            kind, samples, failed = results.get()
+            if kind == 'read':
+                reads += samples
+            else:
+                writes += samples
+            errors += failed
+        for worker in workers:
+            worker.join()
+
+        latencies = [latency for latency, _ in reads]
+        # Time inside SQLite, which includes waiting for locks.
+        sql_times = [sql for _, sql in reads]
+        return {
+            'reads_per_second': round(len(reads) / options['seconds'], 1),
+            'read_p50_ms': round(percentile(latencies, 50), 3),
+            'read_p95_ms': round(percentile(latencies, 95), 3),
+            'read_p99_ms': round(percentile(latencies, 99), 3),
+            'read_sql_p99_ms': round(percentile(sql_times, 99), 3),
+            'read_sql_max_ms': round(max(sql_times, default=0), 3),
+            'writes_per_second': round(writes / options['seconds'], 1),
+            'errors': errors,
+        }
+
+
+def read_posts(deadline, results):
+    """Reader process: load the posts page until the deadline."""
+    client = Client()
+    samples, errors = [], 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            with record_queries() as stats:
+                ok = client.get(reverse('posts')).status_code == 200
+        except DatabaseError:
+            ok = False
+        if ok:
+            samples.append(((time.perf_counter() - started) * 1000, stats.seconds * 1000))
+        else:
+            errors += 1
+    connections.close_all()
+    results.put(('read', samples, errors))
+
+
+def write_posts(number, user_id, deadline, pause, results):
+    """Writer process: create posts, alternating makepost and the admin."""
+    client = Client()
+    client.force_login(get_user_model().objects.get(pk=user_id))
+    written = errors = 0
+    while time.monotonic() < deadline:
+        url = reverse('makepost') if (written + errors) % 2 else reverse('admin:Posts_posts_add')
+        data = {'title': f'W{number}-{written}', 'description': 'Benchmark post', 'date': '2024-01-01'}
+        try:
+            ok = client.post(url, data).status_code in (200, 302)
+        except DatabaseError:
+            ok = False
+        if ok:
+            written += 1
+        else:
+            errors += 1
+        time.sleep(pause)
+    connections.close_all()
+    results.put(('write', written, errors))
\ No newline at end of file
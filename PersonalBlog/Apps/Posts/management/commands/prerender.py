@@ -0,0 +1,51 @@
+"""
+Render the blog's fixed pages, and optionally the newest posts pages, to
+static HTML files served by PrerenderedPageMiddleware (see prerender.py).
+
+Usage:
+    python manage.py prerender
+    python manage.py prerender --posts 3
+    python manage.py prerender --posts 3 --watch
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Apps.Posts.cache import get_posts_version
+from Apps.Posts.prerender import build, newest_template_mtime
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the fixed pages (and the newest posts pages) to static HTML.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=0, metavar='PAGES',
+                            help='Also render this many posts pages, newest first (default: 0).')
+        parser.add_argument('--watch', action='store_true',
+                            help='Keep running and rebuild when a post or a template changes.')
+        parser.add_argument('--interval', type=float, default=2, metavar='SECONDS',
+                            help='How often --watch checks for changes (default: 2).')
+
+    def handle(self, *args, **options):
+        if options['posts'] < 0 or options['interval'] <= 0:
+            raise CommandError('--posts must not be negative and --interval must be positive.')
+
+        manifest = self.build(options['posts'])
+        while options['watch']:
+            time.sleep(options['interval'])
+            posts_changed = options['posts'] and get_posts_version() != manifest['posts_version']
+            if posts_changed or newest_template_mtime() > manifest['templates_mtime']:
+                manifest = self.build(options['posts'])
+
+    def build(self, posts_pages):
+        started = time.perf_counter()
+        try:
+            manifest = build(posts_pages)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(
+            f'Rendered {len(manifest["pages"])} pages in '
+            f'{(time.perf_counter() - started) * 1000:.1f} ms.'
+        )
+        return manifest
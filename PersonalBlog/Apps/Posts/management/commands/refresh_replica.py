@@ -0,0 +1,49 @@
+"""
+Copy the blog database to the read replica (``settings.REPLICA_DATABASE``).
+
+The posts version read before the copy is recorded once it is done. The
+posts page only reads the replica while that version is current, so a
+post written since sends it back to the primary until the next refresh.
+Run it from cron, or keep it running with --interval.
+
+Usage:
+    python manage.py refresh_replica
+    python manage.py refresh_replica --interval 10
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Apps.Posts.cache import get_posts_version, set_replica_version
+from PersonalBlog.routers import copy_database, replica_alias
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary database to the read replica.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, metavar='SECONDS',
+                            help='Keep refreshing, waiting this long between copies.')
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('settings.REPLICA_DATABASE does not name a database.')
+        if options['interval'] is not None and options['interval'] <= 0:
+            raise CommandError('--interval must be positive.')
+
+        while True:
+            started = time.perf_counter()
+            version = get_posts_version()
+            try:
+                copy_database(target=alias)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            set_replica_version(version)
+            self.stdout.write(
+                f'Copied the database to {alias!r} in {(time.perf_counter() - started) * 1000:.1f} ms.'
+            )
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
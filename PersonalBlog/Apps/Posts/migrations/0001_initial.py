@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:42
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Posts',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('title', models.CharField(default='No Title', max_length=20)),
+                ('description', models.TextField(default='Description not available', max_length=5000)),
+                ('date', models.DateField(default=datetime.date.today, verbose_name='Date')),
+            ],
+        ),
+    ]
@@ -1,6 +1,23 @@
 from django.db import models
+from django.db.models.functions import Substr
 from datetime import date
 
+# Characters of the description shown in the posts list.
+EXCERPT_LENGTH = 300
+
+
+class PostsQuerySet(models.QuerySet):
+    def newest_first(self):
+        # The id breaks ties between posts of the same day.
+        return self.order_by('-date', '-id')
+
+    def summaries(self):
+        """Posts for a list: the full description stays in the database."""
+        # One character more than shown, so the template knows to add "…".
+        return self.defer('description').annotate(
+            excerpt=Substr('description', 1, EXCERPT_LENGTH + 1),
+        )
+
 
 # Create your models here.
 class Posts(models.Model):
@@ -9,9 +26,13 @@ class Posts(models.Model):
     description = models.TextField(max_length=5000, default='Description not available')
     date = models.DateField("Date", default=date.today)
 
+    objects = PostsQuerySet.as_manager()
 
-    def get_all_posts(self):
-        return list(Posts.objects.all())
+    class Meta:
+        indexes = [
+            # Serves every page of the newest-first feed (see feed.py).
+            models.Index(fields=['-date', '-id'], name='posts_date_id_idx'),
+        ]
 
 
     def make_post(self, newtitle, newdescription):
@@ -0,0 +1,222 @@
+"""
+Pre-rendered pages for PersonalBlog.
+
+index, history, education and hobbies render a template without any
+data, and the newest posts pages only change when a post is written.
+``manage.py prerender`` renders them once to HTML files under
+``settings.PRERENDER_ROOT``, next to their ``.gz`` (and ``.br``)
+variants, and records each page's ETag in ``manifest.json``.
+
+PrerenderedPageMiddleware serves those files from memory, after the
+other middleware (so the security headers are added) but ahead of the
+URL resolver, the view and the templates. It reloads them
+when the manifest changes and skips posts pages built from an older
+posts version (see cache.py); those go to the view until the next
+build. ``prerender --watch`` rebuilds when a post is written or a
+template changes; run it after collectstatic too, since the pages embed
+the hashed static URLs.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified, QueryDict
+from django.urls import resolve, reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from PersonalBlog.assets import ENCODINGS, accepted_encodings, compress_file
+
+from .cache import get_posts_version
+from .feed import feed_page
+from .models import Posts
+
+# URL names of the pages that never depend on data.
+FIXED_PAGES = ('index', 'history', 'education', 'hobbies')
+
+MANIFEST_NAME = 'manifest.json'
+
+# Browsers revalidate, and get a 304 as long as the page is unchanged.
+CACHE_CONTROL = 'no-cache'
+
+
+def newest_template_mtime():
+    """The modification time of the most recently changed project template."""
+    newest = 0.0
+    for engine in settings.TEMPLATES:
+        for directory in engine.get('DIRS', []):
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    return newest
+
+
+def posts_page_urls(pages):
+    """The URLs of the ``pages`` newest posts pages."""
+    urls = []
+    cursor = None
+    queryset = Posts.objects.summaries()
+    for _ in range(pages):
+        urls.append(reverse('posts') + (f'?before={cursor}' if cursor else ''))
+        cursor = feed_page(queryset, before=cursor).older
+        if cursor is None:
+            break
+    return urls
+
+
+def render_page(url):
+    """Render ``url`` through its view, as an anonymous GET would."""
+    path, _, query = url.partition('?')
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.GET = QueryDict(query)
+    request.META.update(REQUEST_METHOD='GET', QUERY_STRING=query)
+    request.user = AnonymousUser()
+    match = resolve(request.path_info)
+    response = match.func(request, *match.args, **match.kwargs)
+    if response.status_code != 200:
+        raise ValueError(f'{url} answered {response.status_code}')
+    return response.content, response['Content-Type']
+
+
+def build(posts_pages=0, root=None):
+    """
+    Render the fixed pages and the ``posts_pages`` newest posts pages.
+
+    Files are named after their content and the manifest is replaced
+    last, so a server reloading during a build reads either the old set
+    or the new one. Returns the manifest.
+    """
+    root = Path(root or settings.PRERENDER_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    # Read before rendering, like the page cache does.
+    posts_version = get_posts_version()
+    templates_mtime = newest_template_mtime()
+
+    pages = {}
+    urls = [(reverse(name), False) for name in FIXED_PAGES]
+    urls += [(url, True) for url in posts_page_urls(posts_pages)]
+    for url, is_posts_page in urls:
+        content, content_type = render_page(url)
+        digest = hashlib.md5(content).hexdigest()[:16]
+        filename = f'{digest}.html'
+        path = root / filename
+        if not path.exists():
+            path.write_bytes(content)
+            compress_file(path)
+        pages[url] = {
+            'file': filename,
+            'etag': digest,
+            'content_type': content_type,
+            'posts': is_posts_page,
+        }
+
+    manifest = {
+        'posts_version': posts_version,
+        'templates_mtime': templates_mtime,
+        'pages': pages,
+    }
+    partial = root / f'{MANIFEST_NAME}.tmp'
+    partial.write_text(json.dumps(manifest, indent=2))
+    os.replace(partial, root / MANIFEST_NAME)
+
+    # Files of earlier builds that no page uses any more.
+    keep = {page['file'] for page in pages.values()}
+    for path in root.glob('*.html*'):
+        if path.name.split('.html')[0] + '.html' not in keep:
+            path.unlink()
+    return manifest
+
+
+def read_manifest(root=None):
+    path = Path(root or settings.PRERENDER_ROOT) / MANIFEST_NAME
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+
+
+class PrerenderedPage:
+    """One pre-rendered page and its compressed variants, in memory."""
+
+    def __init__(self, root, entry, posts_version):
+        path = Path(root) / entry['file']
+        self.etag = entry['etag']
+        self.content_type = entry['content_type']
+        self.posts_version = posts_version if entry['posts'] else None
+        self.bodies = {None: path.read_bytes()}
+        for encoding, suffix in ENCODINGS.items():
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                self.bodies[encoding] = variant.read_bytes()
+
+    def respond(self, request):
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        encoding = next(
+            (name for name in self.bodies if name and (name in accepted or '*' in accepted)),
+            None,
+        )
+        etag = f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and etag in parse_etags(if_none_match):
+            response = HttpResponseNotModified()
+        else:
+            body = self.bodies[encoding]
+            response = HttpResponse(
+                b'' if request.method == 'HEAD' else body, content_type=self.content_type,
+            )
+            response['Content-Length'] = len(body)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if len(self.bodies) > 1:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response['ETag'] = etag
+        response['Cache-Control'] = CACHE_CONTROL
+        return response
+
+
+class PrerenderedPageMiddleware:
+    """
+    Answer GETs of pre-rendered pages from memory.
+
+    A stat() of the manifest per request picks up new builds without a
+    restart; until the first build it passes every request on.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.root = Path(settings.PRERENDER_ROOT)
+        self.loaded = None
+        self.pages = {}
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            page = self.current_pages().get(request.get_full_path())
+            if page is not None and (
+                page.posts_version is None or page.posts_version == get_posts_version()
+            ):
+                return page.respond(request)
+        return self.get_response(request)
+
+    def current_pages(self):
+        try:
+            stamp = (self.root / MANIFEST_NAME).stat().st_mtime_ns
+        except FileNotFoundError:
+            stamp = None
+        if stamp != self.loaded:
+            manifest = read_manifest(self.root) if stamp else None
+            pages = {}
+            if manifest:
+                for url, entry in manifest['pages'].items():
+                    try:
+                        pages[url] = PrerenderedPage(self.root, entry, manifest['posts_version'])
+                    except FileNotFoundError:
+                        # Replaced by a newer build since the manifest was read.
+                        continue
+            self.pages, self.loaded = pages, stamp
+        return self.pages
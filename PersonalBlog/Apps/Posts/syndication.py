@@ -0,0 +1,47 @@
+"""
+RSS and Atom feeds of the newest posts for PersonalBlog.
+
+Each feed is one query for the FEED_SIZE newest posts. The views wrap
+them in cache_feed (see cache.py), so a feed is rendered once per posts
+version and readers polling with If-None-Match or If-Modified-Since get
+a 304 until the next post is written.
+"""
+
+from datetime import datetime, time, timezone
+
+from django.contrib.syndication.views import Feed
+from django.template.defaultfilters import linebreaksbr
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+
+from .models import Posts
+
+FEED_SIZE = 20
+
+
+class LatestPostsFeed(Feed):
+    title = 'PersonalBlog'
+    link = reverse_lazy('posts')
+    description = 'The newest posts of PersonalBlog.'
+
+    def items(self):
+        return Posts.objects.newest_first()[:FEED_SIZE]
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        # As post.html shows it.
+        return linebreaksbr(post.description)
+
+    def item_link(self, post):
+        return reverse('post', args=[post.pk])
+
+    def item_pubdate(self, post):
+        # Posts carry a day only.
+        return datetime.combine(post.date, time.min, tzinfo=timezone.utc)
+
+
+class AtomPostsFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
@@ -1,3 +1,477 @@
-from django.test import TestCase
+"""
+Tests for the Posts app.
 
-# Create your tests here.
+The views run with QUERY_BUDGET_STRICT on, so a page that starts issuing
+one query per post fails here. The project cache (a directory shared by
+the servers) is replaced by a local memory cache.
+
+Run with:
+    python manage.py test Apps.Posts.tests
+"""
+
+import gzip
+import json
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from PersonalBlog.assets import StaticAssetMiddleware
+from PersonalBlog.instrumentation import QueryBudgetExceeded, query_budget
+from PersonalBlog.routers import STICKY_COOKIE, copy_database, reading_from
+from PersonalBlog.sqlite_backend.base import DatabaseWrapper
+
+from .cache import get_posts_version, replica_is_current, set_replica_version
+from .feed import PAGE_SIZE, encode_cursor
+from .models import EXCERPT_LENGTH, Posts
+from .prerender import FIXED_PAGES, MANIFEST_NAME
+from .syndication import FEED_SIZE
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_posts(count, **fields):
+    """Create ``count`` posts titled Post 0, Post 1, ..."""
+    return [Posts.objects.create(title=f'Post {i}', **fields) for i in range(count)]
+
+
+@override_settings(CACHES=LOCMEM_CACHES, QUERY_BUDGET_STRICT=True)
+class InstrumentationTests(TestCase):
+    """Every request reports its SQL; the views stay within their budgets."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.posts = make_posts(25)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_header(self):
+        with self.assertLogs('PersonalBlog.sql', 'INFO') as logs:
+            response = self.client.get(reverse('posts'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="1 queries", app;dur=[\d.]+$')
+        self.assertEqual(logs.records[0].sql_queries, 1)
+        self.assertEqual(logs.records[0].path, reverse('posts'))
+
+    def test_pages_stay_within_budget(self):
+        urls = [
+            reverse('posts'),
+            reverse('post', args=[self.posts[0].pk]),
+            reverse('posts-rss'),
+            reverse('posts-atom'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_budget_catches_per_row_queries(self):
+        @query_budget(1)
+        def per_post_queries(request):
+            for post in Posts.objects.all()[:3]:
+                Posts.objects.get(pk=post.pk)
+
+        request = RequestFactory().get('/')
+        with self.assertRaises(QueryBudgetExceeded):
+            per_post_queries(request)
+        with self.settings(QUERY_BUDGET_STRICT=False):
+            with self.assertLogs('PersonalBlog.sql', 'WARNING'):
+                per_post_queries(request)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite connection setup')
+class SQLiteConnectionTests(TestCase):
+    """Every connection gets the PRAGMAs configured in SQLITE_OPTIONS."""
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        pragmas = settings.DATABASES['default']['OPTIONS']['pragmas']
+        self.assertEqual(self.pragma('cache_size'), pragmas['cache_size'])
+        self.assertEqual(self.pragma('temp_store'), 2)  # memory
+        self.assertEqual(self.pragma('synchronous'), 1)  # normal
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_rejects_invalid_pragma_names(self):
+        settings_dict = {
+            **connection.settings_dict,
+            'OPTIONS': {'pragmas': {'cache_size = 0; DROP TABLE x; --': 1}},
+        }
+        with self.assertRaises(ImproperlyConfigured):
+            DatabaseWrapper(settings_dict, alias='invalid').get_connection_params()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, QUERY_BUDGET_STRICT=True)
+class ReplicaRoutingTests(TransactionTestCase):
+    """The posts pages read the replica only when it is current and the client has not written."""
+
+    # The replica mirrors the test database through its own connection,
+    # which only sees committed rows: no TestCase transaction here.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.post = Posts.objects.create(title='Hello', description='First post')
+
+    def replica_queries(self, url):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(replica)
+
+    def test_current_replica_serves_read_only_views(self):
+        set_replica_version(get_posts_version())
+        urls = [
+            reverse('posts'),
+            reverse('post', args=[self.post.pk]),
+            reverse('posts-rss'),
+            reverse('posts-atom'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.replica_queries(url), 1)
+
+    def test_outdated_replica_is_not_used(self):
+        set_replica_version(get_posts_version())
+        self.post.save()
+        self.assertFalse(replica_is_current())
+        self.assertEqual(self.replica_queries(reverse('posts')), 0)
+
+    @override_settings(REPLICA_FRESHNESS_CHECK=None)
+    def test_replica_is_trusted_without_a_freshness_check(self):
+        self.assertEqual(self.replica_queries(reverse('posts')), 1)
+
+    def test_post_pins_client_to_primary(self):
+        self.client.post(reverse('makepost'), {'title': 'Second', 'description': 'Another post'})
+        self.assertIn(STICKY_COOKIE, self.client.cookies)
+        set_replica_version(get_posts_version())
+        self.assertEqual(self.replica_queries(reverse('posts')), 0)
+
+    def test_writes_use_primary(self):
+        with reading_from('replica'):
+            post = Posts.objects.get()
+            self.assertEqual(router.db_for_write(Posts, instance=post), 'default')
+        self.assertEqual(post._state.db, 'replica')
+        # Outside a read_replica() view, reads go to the primary.
+        self.assertEqual(router.db_for_read(Posts, instance=post), 'default')
+
+    def test_refresh_replica_records_version(self):
+        with mock.patch('Apps.Posts.management.commands.refresh_replica.copy_database') as copy:
+            call_command('refresh_replica', stdout=StringIO())
+        copy.assert_called_once_with(target='replica')
+        self.assertTrue(replica_is_current())
+
+    def test_copy_database_uses_backup_api(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'replica.sqlite3')
+            with mock.patch.dict(connections['replica'].settings_dict, NAME=path):
+                copy_database(target='replica')
+            with closing(sqlite3.connect(path)) as replica:
+                titles = [row[0] for row in replica.execute(f'SELECT title FROM {Posts._meta.db_table}')]
+        self.assertEqual(titles, ['Hello'])
+
+
+class StaticAssetPipelineTests(SimpleTestCase):
+    """collectstatic writes hashed, precompressed files; the middleware serves them."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = Path(directory.name, 'static')
+        (source / 'css').mkdir(parents=True)
+        (source / 'css' / 'site.css').write_text('body { color: #333; }\n' * 100)
+        (source / 'tiny.css').write_text('p {}')
+        self.root = Path(directory.name, 'collected')
+        settings_override = override_settings(
+            STATIC_ROOT=self.root,
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.hashed_url = static('css/site.css')
+        self.middleware = StaticAssetMiddleware(lambda request: HttpResponse('view'))
+
+    def get(self, url, **meta):
+        return self.middleware(RequestFactory().get(url, **meta))
+
+    def test_collectstatic_writes_compressed_variants(self):
+        self.assertRegex(self.hashed_url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        hashed = self.root / self.hashed_url[len('/static/'):]
+        self.assertEqual(
+            gzip.decompress((hashed.parent / (hashed.name + '.gz')).read_bytes()),
+            hashed.read_bytes(),
+        )
+        # Too small to be worth compressing.
+        self.assertFalse((self.root / 'tiny.css.gz').exists())
+
+    def test_serves_precompressed_variant_with_immutable_caching(self):
+        response = self.get(self.hashed_url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        body = b''.join(response.streaming_content)
+        response.close()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(gzip.decompress(body).decode(), 'body { color: #333; }\n' * 100)
+
+        revalidated = self.get(
+            self.hashed_url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_identity_and_plain_names(self):
+        response = self.get('/static/css/site.css', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        response.close()
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(int(response['Content-Length']), len('body { color: #333; }\n' * 100))
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.get('/static/missing.css').content, b'view')
+        self.assertEqual(self.get('/posts').content, b'view')
+
+    def test_missing_images_keep_their_plain_name(self):
+        # Linked from the templates, not shipped with the project.
+        self.assertEqual(static('img/missing.png'), '/static/img/missing.png')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, QUERY_BUDGET_STRICT=True)
+class PostsFeedTests(TestCase):
+    """The posts pages walk the posts newest first, one indexed query per page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Three posts a day, so pages split days and the id breaks ties.
+        make_posts(25)
+        for post in Posts.objects.all():
+            Posts.objects.filter(pk=post.pk).update(date=date(2024, 1, 1) + timedelta(days=post.pk // 3))
+        cls.newest_first = list(Posts.objects.order_by('-date', '-id'))
+
+    def setUp(self):
+        cache.clear()
+
+    def page(self, query=''):
+        response = self.client.get(reverse('posts') + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context['page']
+
+    def test_walks_every_post_once(self):
+        page = self.page()
+        self.assertIsNone(page.newer)
+        seen = list(page.posts)
+        while page.older:
+            page = self.page(f'?before={page.older}')
+            self.assertIsNotNone(page.newer)
+            seen += page.posts
+        self.assertEqual([post.pk for post in seen], [post.pk for post in self.newest_first])
+
+    def test_newer_returns_to_previous_page(self):
+        first = self.page()
+        second = self.page(f'?before={first.older}')
+        back = self.page(f'?after={second.newer}')
+        self.assertEqual(back.posts, first.posts)
+        self.assertIsNone(back.newer)
+        self.assertEqual(len(back), PAGE_SIZE)
+
+    def test_invalid_cursors_are_not_found(self):
+        for query in ('?before=yesterday', '?after=2024-13-01.1', '?before=2024-01-01.x'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(reverse('posts') + query).status_code, 404)
+
+    def test_page_beyond_the_posts_starts_over(self):
+        response = self.client.get(reverse('posts') + f'?before={encode_cursor(self.newest_first[-1])}')
+        self.assertRedirects(response, reverse('posts'))
+
+    def test_list_shows_excerpts(self):
+        Posts.objects.create(title='Long', description='x' * (EXCERPT_LENGTH + 50))
+        response = self.client.get(reverse('posts'))
+        self.assertContains(response, 'x' * (EXCERPT_LENGTH - 1) + '…')
+        self.assertNotContains(response, 'x' * EXCERPT_LENGTH)
+
+    def test_post_page(self):
+        post = Posts.objects.create(title='Long', description='x' * (EXCERPT_LENGTH + 50))
+        self.assertContains(self.client.get(reverse('post', args=[post.pk])), 'x' * (EXCERPT_LENGTH + 50))
+        self.assertEqual(self.client.get(reverse('post', args=[post.pk + 1])).status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, QUERY_BUDGET_STRICT=True)
+class PostsPageCacheTests(TestCase):
+    """Posts pages are rendered once per posts version; writes end them on commit."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = Posts.objects.create(title='Hello', description='First post')
+
+    def setUp(self):
+        cache.clear()
+
+    def assertServedFromCache(self, url):
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            return self.client.get(url)
+
+    def test_second_request_runs_no_query(self):
+        response = self.assertServedFromCache(reverse('posts'))
+        self.assertContains(response, 'Hello')
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+
+    def test_save_ends_cached_pages_on_commit(self):
+        self.assertServedFromCache(reverse('posts'))
+        version = get_posts_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Posts.objects.create(title='Second', description='Another post')
+            # Until the write commits, readers keep the cached pages.
+            self.assertEqual(get_posts_version(), version)
+        self.assertNotEqual(get_posts_version(), version)
+        self.assertContains(self.client.get(reverse('posts')), 'Second')
+
+    def test_delete_ends_cached_pages(self):
+        self.assertServedFromCache(reverse('posts'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertNotContains(self.client.get(reverse('posts')), 'Hello')
+
+    def test_redirects_are_not_cached(self):
+        url = reverse('posts') + '?before=2000-01-01.1'
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.assertRedirects(self.client.get(url), reverse('posts'), fetch_redirect_response=False)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, QUERY_BUDGET_STRICT=True)
+class PrerenderTests(TestCase):
+    """Pre-rendered pages are served from memory until a post is written."""
+
+    @classmethod
+    def setUpTestData(cls):
+        make_posts(PAGE_SIZE + 5, description='Lorem ipsum dolor sit amet. ' * 20)
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        settings_override = override_settings(PRERENDER_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('prerender', '--posts', '3', stdout=StringIO())
+        self.manifest = json.loads((self.root / MANIFEST_NAME).read_text())
+
+    def test_build_writes_pages_and_variants(self):
+        # Two posts pages hold every post, so there is no third.
+        self.assertEqual(len(self.manifest['pages']), len(FIXED_PAGES) + 2)
+        for url, entry in self.manifest['pages'].items():
+            with self.subTest(url=url):
+                page = self.root / entry['file']
+                self.assertEqual(
+                    gzip.decompress((self.root / (entry['file'] + '.gz')).read_bytes()),
+                    page.read_bytes(),
+                )
+
+    def test_serves_pages_without_the_view(self):
+        for url in self.manifest['pages']:
+            with self.subTest(url=url), self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.templates, [])
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_pages_get_the_security_headers(self):
+        response = self.client.get(reverse('index'))
+        self.assertEqual(response.templates, [])
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertEqual(response['Referrer-Policy'], 'same-origin')
+
+    def test_revalidation_gets_not_modified(self):
+        response = self.client.get(reverse('history'))
+        revalidated = self.client.get(reverse('history'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_post_write_sends_posts_pages_to_the_view(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Posts.objects.create(title='Newest', description='Written after the build')
+        response = self.client.get(reverse('posts'))
+        self.assertContains(response, 'Newest')
+        self.assertNotEqual(response.templates, [])
+        # The fixed pages do not depend on the posts.
+        self.assertEqual(self.client.get(reverse('index')).templates, [])
+
+    def test_rebuild_removes_unused_files(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Posts.objects.create(title='Newest', description='Written after the build')
+        call_command('prerender', '--posts', '3', stdout=StringIO())
+        manifest = json.loads((self.root / MANIFEST_NAME).read_text())
+        used = {entry['file'] for entry in manifest['pages'].values()}
+        self.assertEqual({path.name.split('.html')[0] + '.html' for path in self.root.glob('*.html*')}, used)
+        self.assertNotEqual(manifest['pages'][reverse('posts')], self.manifest['pages'][reverse('posts')])
+
+
+@override_settings(CACHES=LOCMEM_CACHES, QUERY_BUDGET_STRICT=True)
+class SyndicationFeedTests(TestCase):
+    """The feeds list the newest posts; pollers get a 304 until a post is written."""
+
+    @classmethod
+    def setUpTestData(cls):
+        make_posts(FEED_SIZE + 5)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_list_the_newest_posts(self):
+        newest = Posts.objects.newest_first()[0]
+        for name, item in (('posts-rss', b'<item>'), ('posts-atom', b'<entry>')):
+            with self.subTest(feed=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content.count(item), FEED_SIZE)
+                self.assertContains(response, f'http://testserver{reverse("post", args=[newest.pk])}')
+                self.assertEqual(response['Cache-Control'], 'no-cache')
+
+    def test_conditional_requests_get_not_modified(self):
+        response = self.client.get(reverse('posts-rss'))
+        with self.assertNumQueries(0):
+            by_etag = self.client.get(reverse('posts-rss'), HTTP_IF_NONE_MATCH=response['ETag'])
+            by_date = self.client.get(
+                reverse('posts-rss'), HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+            )
+            cached = self.client.get(reverse('posts-rss'))
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_date.status_code, 304)
+        self.assertEqual(cached.content, response.content)
+
+    def test_write_changes_the_validators(self):
+        response = self.client.get(reverse('posts-atom'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Posts.objects.create(title='Newest', description='Another post')
+        changed = self.client.get(reverse('posts-atom'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+        self.assertContains(changed, 'Newest')
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'blog.example.com'])
+    def test_cached_feed_keeps_its_host(self):
+        self.client.get(reverse('posts-rss'))
+        response = self.client.get(reverse('posts-rss'), HTTP_HOST='blog.example.com')
+        self.assertContains(response, 'http://blog.example.com/')
+        self.assertNotContains(response, 'http://testserver/')
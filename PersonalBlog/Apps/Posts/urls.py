@@ -7,5 +7,8 @@ urlpatterns = [
     path('education', views.education, name='education'),
     path('hobbies', views.hobbies, name='hobbies'),
     path('posts', views.posts, name='posts'),
+    path('posts/<int:pk>', views.post, name='post'),
+    path('posts/rss', views.rss_feed, name='posts-rss'),
+    path('posts/atom', views.atom_feed, name='posts-atom'),
     path('makepost', views.makepost, name='makepost'),
 ]
\ No newline at end of file
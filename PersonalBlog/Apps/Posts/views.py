@@ -1,5 +1,11 @@
-from django.shortcuts import render
-from .models import Posts
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect, render
+from PersonalBlog.instrumentation import query_budget
+from PersonalBlog.routers import read_replica
+from .cache import cache_feed, cache_posts_page
+from .feed import InvalidCursor, feed_page
+from .models import EXCERPT_LENGTH, Posts
+from .syndication import AtomPostsFeed, LatestPostsFeed
 
 pt = Posts()
 
@@ -21,12 +27,43 @@ def education(request):
     return render(request, 'education.html')
 
 
+@read_replica
+@cache_posts_page
+@query_budget(1)
 def posts(request):
-    post_list = pt.get_all_posts()
-    context = {'posts': post_list}
+    before = request.GET.get('before')
+    after = request.GET.get('after')
+    try:
+        page = feed_page(Posts.objects.summaries(), before=before, after=after)
+    except InvalidCursor as e:
+        raise Http404(str(e))
+    if not page.posts and (before or after):
+        # Nothing left on that side (posts were deleted): start over.
+        return redirect('posts')
+    context = {'page': page, 'posts': page.posts, 'excerpt_length': EXCERPT_LENGTH}
     return render(request, 'posts.html', context)
 
 
+@read_replica
+@query_budget(1)
+def post(request, pk):
+    return render(request, 'post.html', {'post': get_object_or_404(Posts, pk=pk)})
+
+
+@read_replica
+@cache_feed
+@query_budget(1)
+def rss_feed(request):
+    return LatestPostsFeed()(request)
+
+
+@read_replica
+@cache_feed
+@query_budget(1)
+def atom_feed(request):
+    return AtomPostsFeed()(request)
+
+
 def makepost(request):
     if request.method == 'POST':
         title = request.POST.get('title')
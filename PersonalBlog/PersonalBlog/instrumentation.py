@@ -0,0 +1,132 @@
+"""
+SQL instrumentation for PersonalBlog.
+
+- SQLInstrumentationMiddleware counts the statements of every request,
+  sums their time, remembers the slowest one, sends the numbers to the
+  browser in a ``Server-Timing`` header and logs them to the
+  ``PersonalBlog.sql`` logger.
+- query_budget() caps the number of statements a single view may run.
+  Going over budget logs a warning, or raises QueryBudgetExceeded when
+  ``settings.QUERY_BUDGET_STRICT`` is true (as the tests set it), so an
+  N+1 loop fails the test suite the moment it is introduced.
+"""
+
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('PersonalBlog.sql')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more SQL statements than its budget allows."""
+
+
+class QueryStats:
+    """Execute wrapper that records count, total time and slowest statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_sql = None
+        self.slowest_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            if elapsed >= self.slowest_seconds:
+                self.slowest_seconds = elapsed
+                self.slowest_sql = sql
+
+
+@contextmanager
+def record_queries():
+    """Record the statements run on every database alias inside the block."""
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
+
+
+class SQLInstrumentationMiddleware:
+    """Report SQL count and time for each request (Server-Timing header and log)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with record_queries() as stats:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        sql_ms = stats.seconds * 1000
+
+        timing = (
+            f'db;dur={sql_ms:.2f};desc="{stats.count} queries", '
+            f'app;dur={total_ms:.2f}'
+        )
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+
+        logger.info(
+            '%s %s %s: %d queries in %.2f ms (request %.2f ms)',
+            request.method, request.path, response.status_code,
+            stats.count, sql_ms, total_ms,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'sql_queries': stats.count,
+                'sql_ms': round(sql_ms, 3),
+                'request_ms': round(total_ms, 3),
+                'slowest_sql': stats.slowest_sql,
+                'slowest_sql_ms': round(stats.slowest_seconds * 1000, 3),
+            },
+        )
+        return response
+
+
+def query_budget(max_queries):
+    """
+    Decorate a view so it may run at most ``max_queries`` statements.
+
+    Template responses are rendered inside the budget, so queries made
+    from templates (the usual home of N+1 loops) are counted too.
+    For class-based views use ``method_decorator(query_budget(n), name='dispatch')``.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            with record_queries() as stats:
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response = response.render()
+            if stats.count > max_queries:
+                message = (
+                    f'{view_func.__qualname__} ran {stats.count} queries '
+                    f'(budget {max_queries}) for {request.path}'
+                )
+                if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message, extra={
+                    'path': request.path,
+                    'sql_queries': stats.count,
+                    'query_budget': max_queries,
+                })
+            return response
+
+        return wrapper
+
+    return decorator
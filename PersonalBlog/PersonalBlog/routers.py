@@ -0,0 +1,133 @@
+"""
+Read replica routing for PersonalBlog.
+
+- ReplicaRouter (``settings.DATABASE_ROUTERS``) sends writes to
+  ``default`` and, while a read_replica() view runs, reads to the alias
+  named by ``settings.REPLICA_DATABASE``. Everything else (admin, forms,
+  sessions, auth) keeps reading the primary.
+- read_replica() marks a view as read-only. It uses the replica for safe
+  methods, unless the client wrote recently or the
+  ``settings.REPLICA_FRESHNESS_CHECK`` callable says the replica is behind
+  (the blog checks that it holds the current posts version).
+- ReplicaStickinessMiddleware gives read-your-writes: after a POST
+  (makepost, an admin save) the client gets a cookie that pins its reads
+  to the primary for ``settings.REPLICA_STICKY_SECONDS``. Keep it longer
+  than the replica may lag, so it has caught up when the cookie ends.
+- copy_database() refreshes the SQLite replica with SQLite's online
+  backup API (``manage.py refresh_replica``).
+
+The flag lives in a context variable, so it is private to each request.
+"""
+
+import sqlite3
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.module_loading import import_string
+
+STICKY_COOKIE = 'read_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica = ContextVar('replica_alias', default=None)
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is none."""
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+class ReplicaRouter:
+    """
+    Route reads to the replica inside read_replica() views.
+
+    Other reads and every write go to ``default`` explicitly; returning
+    None would let Django use the database an instance came from.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema with the data, from the backup.
+        return db != replica_alias()
+
+
+@contextmanager
+def reading_from(alias):
+    """Route this context's reads to ``alias`` (None: the primary)."""
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def replica_is_fresh():
+    """Run ``settings.REPLICA_FRESHNESS_CHECK``; without one, trust the replica."""
+    check = getattr(settings, 'REPLICA_FRESHNESS_CHECK', None)
+    return import_string(check)() if check else True
+
+
+def read_replica(view_func):
+    """Let a read-only view read from the replica."""
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        alias = replica_alias()
+        if (request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES
+                or alias is None or not replica_is_fresh()):
+            alias = None
+        with reading_from(alias):
+            return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaStickinessMiddleware:
+    """Pin a client's reads to the primary for a while after it writes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and replica_alias():
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+def copy_database(source=DEFAULT_DB_ALIAS, target=None):
+    """
+    Copy the ``source`` SQLite database over the ``target`` one.
+
+    The backup API copies a consistent snapshot and replaces the target in
+    one transaction, so its readers see the old copy or the new one.
+    """
+    target = target or replica_alias()
+    if target is None:
+        raise ValueError('No replica database is configured.')
+    for alias in (source, target):
+        if connections[alias].vendor != 'sqlite':
+            raise ValueError(f'Database {alias!r} is not SQLite.')
+    path = str(connections[target].settings_dict['NAME'])
+
+    primary = connections[source]
+    primary.ensure_connection()
+    with closing(sqlite3.connect(path)) as replica:
+        primary.connection.backup(replica)
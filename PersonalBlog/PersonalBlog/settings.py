@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 import os
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,6 +41,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'PersonalBlog.assets.StaticAssetMiddleware',
+    'PersonalBlog.instrumentation.SQLInstrumentationMiddleware',
+    'PersonalBlog.routers.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -46,10 +51,16 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so its pages get the security headers like any other page.
+    'Apps.Posts.prerender.PrerenderedPageMiddleware',
 ]
 
 ROOT_URLCONF = 'PersonalBlog.urls'
 
+# Views decorated with query_budget() log a warning when they run more SQL
+# statements than allowed; when strict (as in the tests) they raise instead.
+QUERY_BUDGET_STRICT = False
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -71,10 +82,76 @@ WSGI_APPLICATION = 'PersonalBlog.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+# Applied to every new connection by PersonalBlog.sqlite_backend.
+SQLITE_OPTIONS = {
+    # Seconds to wait for a lock before failing with "database is locked".
+    'timeout': 20,
+    # Take the write lock at BEGIN, so a transaction that reads before it
+    # writes waits for the lock (busy timeout) instead of failing.
+    'transaction_mode': 'IMMEDIATE',
+    'pragmas': {
+        # Readers no longer block the writer, nor the writer the readers.
+        'journal_mode': 'wal',
+        # With WAL, fsync at checkpoints only; a power loss may drop the
+        # last commits but never corrupts the database.
+        'synchronous': 'normal',
+        'mmap_size': 256 * 1024 * 1024,
+        # Negative means KiB: a 64 MiB page cache per connection.
+        'cache_size': -64 * 1024,
+        'temp_store': 'memory',
+    },
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'PersonalBlog.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+        # Keep connections (and their setup) for a minute; check them
+        # before reuse (Django 4.1+).
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    # A copy of the database refreshed by ``manage.py refresh_replica``;
+    # the posts page reads it (see PersonalBlog/routers.py).
+    'replica': {
+        'ENGINE': 'PersonalBlog.sqlite_backend',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                # Its connections refuse to write.
+                'query_only': 1,
+                'mmap_size': 256 * 1024 * 1024,
+                'cache_size': -64 * 1024,
+                'temp_store': 'memory',
+            },
+        },
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['PersonalBlog.routers.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+# The posts page only reads a replica that holds the current posts
+# version, so the page cache never stores an outdated copy.
+REPLICA_FRESHNESS_CHECK = 'Apps.Posts.cache.replica_is_current'
+# A client that posted reads the primary for this long.
+REPLICA_STICKY_SECONDS = 30
+
+# Written by ``manage.py prerender``, served by PrerenderedPageMiddleware.
+PRERENDER_ROOT = BASE_DIR / 'prerendered'
+
+# Shared by all worker processes on the host, which the posts page cache
+# needs (see Apps/Posts/cache.py): a write in one process must end the
+# cached pages of all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
     }
 }
 
@@ -115,4 +192,15 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 STATIC_DIR = (
     os.path.join(BASE_DIR, 'static'),
 )
-STATIC_ROOT = BASE_DIR / ''
+# collectstatic copies the files here under content-hashed names, with
+# precompressed variants; StaticAssetMiddleware serves them from there
+# (see PersonalBlog/assets.py).
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATIC_STORAGE = 'PersonalBlog.assets.CompressedManifestStaticFilesStorage'
+if django.VERSION >= (4, 2):
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': STATIC_STORAGE},
+    }
+else:
+    STATICFILES_STORAGE = STATIC_STORAGE
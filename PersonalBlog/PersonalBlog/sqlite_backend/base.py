@@ -0,0 +1,39 @@
+"""
+SQLite backend for PersonalBlog.
+
+It is GuideProject's backend (GuideProject/GuideProject/sqlite_backend),
+shared by both projects: Django's SQLite backend plus the PRAGMAs of
+``OPTIONS['pragmas']`` on every new connection (see SQLITE_OPTIONS in
+settings.py). This module only adds ``OPTIONS['transaction_mode']``, the
+kind of BEGIN, which Django knows from 5.1 and the blog's Django 4 does
+not (``IMMEDIATE`` takes the write lock up front, so a transaction that
+reads before writing waits for the lock instead of failing with
+"database is locked").
+"""
+
+import sys
+from pathlib import Path
+
+# GuideProject's project directory sits next to this one in the repository.
+sys.path.append(str(Path(__file__).resolve().parents[3] / 'GuideProject'))
+
+from GuideProject.sqlite_backend import base  # noqa: E402
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """GuideProject's SQLite connections, with ``transaction_mode`` before Django 5.1."""
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Django < 5.1 would pass transaction_mode on to sqlite3.connect().
+        mode = params.pop('transaction_mode', None)
+        if mode:
+            self.transaction_mode = mode.upper()
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        mode = getattr(self, 'transaction_mode', None)
+        if mode:
+            self.cursor().execute(f'BEGIN {mode}')
+        else:
+            super()._start_transaction_under_autocommit()